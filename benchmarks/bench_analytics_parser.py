@@ -0,0 +1,80 @@
+"""Compare l'ancien parseur analytics (lignes objet + pd.to_numeric) au parseur typé et au décodeur incrémental
+
+Usage: python benchmarks/bench_analytics_parser.py [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import gc
+import json
+import time
+
+import pandas as pd
+
+from synthetic import analytics_body, analytics_grid
+
+import main
+
+
+def legacy_parse(response):
+    """Ancien _parse_visualization_data: DataFrame d'objets puis conversion colonne par colonne"""
+    rows = response['rows']
+    column_names = [h.get('name') or h.get('column') for h in response['headers']]
+    df = pd.DataFrame(rows, columns=column_names[:len(rows[0])])
+    for col in df.columns:
+        # Équivalent de pd.to_numeric(errors='ignore'), retiré des versions récentes de pandas
+        try:
+            df[col] = pd.to_numeric(df[col])
+        except (ValueError, TypeError):
+            pass
+    return df
+
+
+def typed_parse(response):
+    return main.build_analytics_frame(response['headers'], response['rows'],
+                                      response['metaData']['items'])
+
+
+def streaming_parse(body, chunk_size=main.STREAM_CHUNK_SIZE):
+    decoder = main.StreamingAnalyticsDecoder()
+    for start in range(0, len(body), chunk_size):
+        decoder.feed(body[start:start + chunk_size])
+    return decoder.close()['frame']
+
+
+def best_of(repeat, function, *args):
+    timings, result = [], None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        started = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    response = analytics_grid(args.rows)
+    body = analytics_body(response)
+    print(f"{args.rows:,} lignes, corps JSON de {len(body) / 1e6:.1f} Mo\n")
+
+    cases = [
+        ("ancien parseur (grille déjà décodée)", legacy_parse, response),
+        ("parseur typé (grille déjà décodée)", typed_parse, response),
+        ("json.loads + ancien parseur", lambda b: legacy_parse(json.loads(b)), body),
+        ("json.loads + parseur typé", lambda b: typed_parse(json.loads(b)), body),
+        ("décodeur incrémental (octets)", streaming_parse, body),
+    ]
+    print(f"{'Chemin':<40}{'Temps (s)':>12}{'DataFrame (Mo)':>18}")
+    for label, function, argument in cases:
+        seconds, frame = best_of(args.repeat, function, argument)
+        size = frame.memory_usage(deep=True).sum() / 1e6
+        print(f"{label:<40}{seconds:>12.3f}{size:>18.1f}")
+        del frame
+
+
+if __name__ == '__main__':
+    main_benchmark()
@@ -0,0 +1,47 @@
+"""Compare taille et temps d'écriture des exports Parquet/Feather aux exports CSV/Excel
+
+Usage: python benchmarks/bench_exports.py [--rows 200000] [--repeat 3]
+"""
+import argparse
+import gc
+import time
+
+from synthetic import analytics_grid
+
+import main
+
+
+def best_of(repeat, function, *args):
+    timings, payload = [], None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        payload = function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), payload
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    response = analytics_grid(args.rows)
+    frame = main.build_analytics_frame(response['headers'], response['rows'], response['metaData']['items'])
+    del response
+    print(f"{len(frame):,} lignes, DataFrame de {frame.memory_usage(deep=True).sum() / 1e6:.1f} Mo\n")
+
+    print(f"{'Format':<12}{'Écriture (s)':>14}{'Taille (Mo)':>14}{'vs CSV':>10}")
+    csv_size = None
+    for export_format in main.EXPORT_FORMATS:
+        seconds, payload = best_of(args.repeat, main.serialize_export, frame, export_format)
+        csv_size = csv_size or len(payload)
+        print(f"{export_format:<12}{seconds:>14.3f}{len(payload) / 1e6:>14.2f}{len(payload) / csv_size:>9.0%}")
+
+    if not main.PYARROW_AVAILABLE:
+        print("\npyarrow n'est pas installé: formats Parquet et Feather non mesurés")
+
+
+if __name__ == '__main__':
+    main_benchmark()
@@ -0,0 +1,39 @@
+"""Grilles analytics DHIS2 synthétiques pour les benchmarks"""
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEADERS = [
+    {'name': 'dx', 'column': 'Données', 'valueType': 'TEXT', 'meta': True},
+    {'name': 'pe', 'column': 'Période', 'valueType': 'TEXT', 'meta': True},
+    {'name': 'ou', 'column': 'Unité d\'organisation', 'valueType': 'TEXT', 'meta': True},
+    {'name': 'value', 'column': 'Valeur', 'valueType': 'NUMBER', 'meta': False},
+]
+
+
+def analytics_grid(n_rows, n_indicators=40, n_periods=36, n_org_units=2000, seed=0):
+    """Réponse analytics (headers, metaData, rows) de n_rows lignes, valeurs en chaînes comme DHIS2"""
+    rng = np.random.default_rng(seed)
+    dx = np.array([f'dx{i:04d}AbCdE' for i in range(n_indicators)], dtype=object)
+    pe = np.array([f'{2021 + i // 12}{i % 12 + 1:02d}' for i in range(n_periods)], dtype=object)
+    ou = np.array([f'ou{i:05d}XyZwV' for i in range(n_org_units)], dtype=object)
+    values = np.round(rng.gamma(2.0, 150.0, n_rows), 1).astype(str)
+
+    columns = [dx[rng.integers(0, n_indicators, n_rows)], pe[rng.integers(0, n_periods, n_rows)],
+               ou[rng.integers(0, n_org_units, n_rows)], values]
+    rows = [list(row) for row in zip(*columns)]
+
+    items = {uid: {'name': f'Indicateur {i}'} for i, uid in enumerate(dx)}
+    items.update({uid: {'name': f'Formation sanitaire {i}'} for i, uid in enumerate(ou)})
+    items.update({uid: {'name': uid} for uid in pe})
+    return {'headers': HEADERS, 'metaData': {'items': items}, 'rows': rows,
+            'width': len(HEADERS), 'height': n_rows}
+
+
+def analytics_body(response):
+    """Corps JSON encodé de la réponse, tel que reçu du serveur"""
+    return json.dumps(response, separators=(',', ':')).encode('utf-8')
@@ -3,11 +3,185 @@ import requests
 import pandas as pd
 import numpy as np
 import json
+import asyncio
+import contextlib
+import copy
+import contextvars
 from datetime import datetime
 import io
+import os
+import sys
+import math
 import time
+import pickle
+import sqlite3
+import tempfile
+import re
+import codecs
+import bisect
+import hashlib
+import hmac
+import random
+import threading
+import unicodedata
+import weakref
+import zipfile
+from collections import Counter, OrderedDict, namedtuple
 import plotly.express as px
 import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from urllib3.util.request import ACCEPT_ENCODING as URLLIB3_ACCEPT_ENCODING
+
+
+# Moteur statistique NumPy, utilisé en remplacement de scipy.stats
+def regularized_incomplete_beta(a, b, x):
+    """Fonction bêta incomplète régularisée I_x(a, b) (fraction continue de Lentz)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    # La fraction continue converge rapidement pour x < (a + 1) / (a + b + 2)
+    if x > (a + 1.0) / (a + b + 2.0):
+        return 1.0 - regularized_incomplete_beta(b, a, 1.0 - x)
+
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    tiny, eps = 1e-300, 1e-15
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 100000):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < eps:
+            break
+    return math.exp(log_front) * fraction / a
+
+
+def regularized_upper_gamma(a, x):
+    """Fonction gamma incomplète supérieure régularisée Q(a, x)"""
+    if x <= 0.0:
+        return 1.0
+    log_front = a * math.log(x) - x - math.lgamma(a)
+    tiny, eps = 1e-300, 1e-15
+    if x < a + 1.0:
+        # Série de P(a, x), puis Q = 1 - P
+        term = total = 1.0 / a
+        n = a
+        for _ in range(100000):
+            n += 1.0
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * eps:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_front))
+
+    # Fraction continue de Q(a, x)
+    b = x + 1.0 - a
+    c, d = 1.0 / tiny, 1.0 / b
+    fraction = d
+    for i in range(1, 100000):
+        numerator = -i * (i - a)
+        b += 2.0
+        d = numerator * d + b
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = b + numerator / c
+        c = c if abs(c) > tiny else tiny
+        fraction *= c * d
+        if abs(c * d - 1.0) < eps:
+            break
+    return math.exp(log_front) * fraction
+
+
+LinregressResult = namedtuple('LinregressResult',
+                              ['slope', 'intercept', 'rvalue', 'pvalue', 'stderr', 'intercept_stderr'])
+F_onewayResult = namedtuple('F_onewayResult', ['statistic', 'pvalue'])
+
+
+class NumpyStats:
+    """Sous-ensemble de scipy.stats calculé avec NumPy (utilisé lorsque scipy est absent)"""
+
+    class t:
+        @staticmethod
+        def sf(value, df):
+            """P(T > value) pour une loi de Student à df degrés de liberté"""
+            tail = 0.5 * regularized_incomplete_beta(df / 2.0, 0.5, df / (df + value * value))
+            return tail if value >= 0 else 1.0 - tail
+
+    class f:
+        @staticmethod
+        def sf(value, dfn, dfd):
+            """P(F > value) pour une loi de Fisher (dfn, dfd)"""
+            if value <= 0:
+                return 1.0
+            return regularized_incomplete_beta(dfd / 2.0, dfn / 2.0, dfd / (dfd + dfn * value))
+
+    class chi2:
+        @staticmethod
+        def sf(value, df):
+            """P(X > value) pour une loi du khi-deux à df degrés de liberté"""
+            return regularized_upper_gamma(df / 2.0, value / 2.0)
+
+    @staticmethod
+    def linregress(x, y):
+        """Régression linéaire des moindres carrés (mêmes résultats que scipy.stats.linregress)"""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n = len(x)
+        if n < 2:
+            return LinregressResult(0.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+        x_mean, y_mean = x.mean(), y.mean()
+        x_centered, y_centered = x - x_mean, y - y_mean
+        ssxm = np.dot(x_centered, x_centered) / n
+        ssym = np.dot(y_centered, y_centered) / n
+        ssxym = np.dot(x_centered, y_centered) / n
+        if ssxm == 0:
+            return LinregressResult(0.0, y_mean, 0.0, 1.0, np.nan, np.nan)
+
+        slope = ssxym / ssxm
+        intercept = y_mean - slope * x_mean
+
+        if n == 2:
+            pvalue = 1.0 if ssym == 0 else 0.0
+            rvalue = np.nan if ssym == 0 else float(np.sign(ssxym))
+            return LinregressResult(slope, intercept, rvalue, pvalue, 0.0, 0.0)
+        if ssym == 0:
+            # y constant: corrélation indéfinie, comme scipy
+            return LinregressResult(slope, intercept, np.nan, np.nan, np.nan, np.nan)
+
+        rvalue = float(np.clip(ssxym / np.sqrt(ssxm * ssym), -1.0, 1.0))
+
+        df = n - 2
+        tiny = 1.0e-20
+        t_value = rvalue * np.sqrt(df / ((1.0 - rvalue + tiny) * (1.0 + rvalue + tiny)))
+        pvalue = 2 * NumpyStats.t.sf(abs(t_value), df)
+        stderr = np.sqrt((1 - rvalue ** 2) * ssym / ssxm / df)
+        intercept_stderr = stderr * np.sqrt(ssxm + x_mean ** 2)
+        return LinregressResult(slope, intercept, rvalue, pvalue, stderr, intercept_stderr)
+
+    @staticmethod
+    def f_oneway(*samples):
+        """ANOVA à un facteur sur plusieurs échantillons"""
+        samples = [np.asarray(sample, dtype=np.float64) for sample in samples]
+        counts = np.array([len(sample) for sample in samples], dtype=np.float64)
+        means = np.array([sample.mean() if len(sample) else np.nan for sample in samples])
+        within = sum(np.dot(sample - mean, sample - mean) for sample, mean in zip(samples, means) if len(sample))
+        k, total = len(samples), counts.sum()
+        grand_mean = np.nansum(counts * means) / total
+        between = np.nansum(counts * (means - grand_mean) ** 2)
+        dfn, dfd = k - 1, total - k
+        with np.errstate(invalid='ignore', divide='ignore'):
+            statistic = (between / dfn) / (within / dfd)
+        pvalue = NumpyStats.f.sf(statistic, dfn, dfd) if np.isfinite(statistic) else np.nan
+        return F_onewayResult(statistic, pvalue)
+
 
 # Gestion de l'importation de scipy avec fallback
 try:
@@ -16,67 +190,33 @@ try:
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
-    st.warning("⚠️ Le module scipy n'est pas installé. Certaines analyses avancées seront limitées.")
+    st.warning("⚠️ Le module scipy n'est pas installé. Les tests statistiques utilisent le moteur NumPy intégré.")
 
+    stats = NumpyStats()
 
-    # Création d'un mock pour éviter les erreurs
-    class MockStats:
-        @staticmethod
-        def linregress(x, y):
-            # Implémentation simplifiée de la régression linéaire
-            n = len(x)
-            if n < 2:
-                return type('obj', (object,), {
-                    'slope': 0,
-                    'intercept': 0,
-                    'rvalue': 0,
-                    'pvalue': 1,
-                    'stderr': 0
-                })()
-
-            x_mean = np.mean(x)
-            y_mean = np.mean(y)
-
-            # Calcul de la pente
-            numerator = sum((x[i] - x_mean) * (y[i] - y_mean) for i in range(n))
-            denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
-
-            if denominator == 0:
-                slope = 0
-            else:
-                slope = numerator / denominator
-
-            intercept = y_mean - slope * x_mean
-
-            # Calcul du coefficient de corrélation
-            if n > 1:
-                x_std = np.std(x, ddof=1)
-                y_std = np.std(y, ddof=1)
-                if x_std > 0 and y_std > 0:
-                    rvalue = np.corrcoef(x, y)[0, 1]
-                else:
-                    rvalue = 0
-            else:
-                rvalue = 0
+# Formats Parquet et Arrow IPC (Feather) disponibles si pyarrow est installé
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
 
-            return type('obj', (object,), {
-                'slope': slope,
-                'intercept': intercept,
-                'rvalue': rvalue,
-                'pvalue': 0.05 if abs(rvalue) > 0.5 else 0.5,
-                'stderr': 0.1
-            })()
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
-        @staticmethod
-        def f_oneway(*args):
-            # Mock pour ANOVA
-            return type('obj', (object,), {
-                'statistic': 1.0,
-                'pvalue': 0.05
-            })()
+try:
+    import httpx
 
+    HTTPX_AVAILABLE = True
+    try:
+        import h2  # noqa: F401
 
-    stats = MockStats()
+        HTTP2_AVAILABLE = True
+    except ImportError:
+        HTTP2_AVAILABLE = False
+except ImportError:
+    HTTPX_AVAILABLE = False
+    HTTP2_AVAILABLE = False
 
 # Le reste du code reste inchangé...
 # Configuration de la page
@@ -250,6 +390,1634 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Paramètres de performance
+APP_DATA_DIR = os.environ.get("DHIS2_VIEWER_DATA_DIR",
+                              os.path.join(os.path.expanduser("~"), ".dhis2_viewer"))
+DATA_CACHE_TTL = int(os.environ.get("DHIS2_VIEWER_CACHE_TTL", "600"))
+DATA_CACHE_MAX_ENTRIES = int(os.environ.get("DHIS2_VIEWER_CACHE_SIZE", "256"))
+# Entrées expirées conservées pour revalidation conditionnelle (ETag / Last-Modified)
+DATA_CACHE_STALE_TTL = int(os.environ.get("DHIS2_VIEWER_CACHE_STALE_TTL", "86400"))
+SNAPSHOT_DIR = os.path.join(APP_DATA_DIR, "snapshots")
+SNAPSHOT_VERIFIER_ITERATIONS = 200000
+DATA_CACHE_DISK_ENABLED = os.environ.get("DHIS2_VIEWER_DISK_CACHE", "0") == "1"
+MAX_CONCURRENT_REQUESTS_PER_SERVER = int(os.environ.get("DHIS2_VIEWER_MAX_CONCURRENCY", "8"))
+DASHBOARD_PAGE_FANOUT = int(os.environ.get("DHIS2_VIEWER_PAGE_FANOUT", "4"))
+ANALYSIS_MEMO_MAX_ENTRIES = 128
+# Budget mémoire des résultats d'analyse mémoïsés par session
+ANALYSIS_MEMO_MAX_BYTES = int(os.environ.get("DHIS2_VIEWER_ANALYSIS_MEMO_MB", "64")) * 1024 * 1024
+STREAM_CHUNK_SIZE = 256 * 1024
+STREAM_ROWS_BATCH = 20000
+# Attente d'un jeton du serveur depuis la boucle asynchrone (secondes, doublée jusqu'au maximum)
+SERVER_SLOT_POLL_INTERVAL = 0.002
+SERVER_SLOT_POLL_MAX = 0.05
+
+# Projections des champs pour la liste des dashboards
+DASHBOARD_FULL_FIELDS = "*,user[id,name],dashboardItems[*]"
+DASHBOARD_LISTING_FIELDS = (
+    "id,name,description,created,lastUpdated,user[id,name],"
+    "dashboardItems[id,type,text,visualization[id,name,type],chart[id,name,type],map[id,name]]"
+)
+
+# Réduction des graphiques : nombre maximal de points envoyés au navigateur par graphique
+CHART_POINT_BUDGET = 5000
+# Nuages de points : échantillon au budget jusqu'à ce multiple du budget, carte de densité au-delà
+SCATTER_DENSITY_FACTOR = 10
+
+# Tableaux paginés : seules les lignes de la page courante sont envoyées au navigateur
+TABLE_PAGE_SIZES = [25, 50, 100, 500]
+TABLE_DEFAULT_PAGE_SIZE = 100
+# Budget mémoire des index de tri et de filtre conservés par session
+TABLE_INDEX_MAX_BYTES = int(os.environ.get("DHIS2_VIEWER_TABLE_INDEX_MB", "64")) * 1024 * 1024
+
+# Export Excel : lignes de données par feuille (1 048 576 moins l'en-tête) et lignes converties par lot
+EXCEL_MAX_DATA_ROWS = 1048575
+EXCEL_WRITE_BATCH = 50000
+
+# Exports générés à la demande : nombre de fichiers et budget mémoire conservés par session
+EXPORT_CACHE_MAX_ENTRIES = 16
+EXPORT_CACHE_MAX_BYTES = int(os.environ.get("DHIS2_VIEWER_EXPORT_CACHE_MB", "64")) * 1024 * 1024
+
+# Préchargement en arrière-plan des dashboards les plus ouverts et de ceux de l'utilisateur
+PREFETCH_ENABLED = os.environ.get("DHIS2_VIEWER_PREFETCH", "1") == "1"
+PREFETCH_MAX_DASHBOARDS = 5
+PREFETCH_MAX_BYTES_PER_SECOND = int(os.environ.get("DHIS2_VIEWER_PREFETCH_RATE", str(512 * 1024)))
+PREFETCH_PAUSE = 0.2
+
+# Couche HTTP : délais (connexion, lecture) par type d'endpoint, reprises et disjoncteur par serveur
+HTTP_TIMEOUTS = {
+    'auth': (5, 10),
+    'catalogue': (5, 20),
+    'data': (5, 30),
+}
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BASE_DELAY = 0.5
+HTTP_RETRY_MAX_DELAY = 8.0
+HTTP_RETRY_STATUSES = {429, 502, 503, 504}
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Compression négociée (du plus au moins compact) et rapport des éléments les plus lourds
+HTTP_ENCODING_PREFERENCE = ('zstd', 'br', 'gzip', 'deflate')
+HEAVIEST_ITEMS_LIMIT = 10
+
+
+class DataCache:
+    """Cache LRU à durée de vie limitée, partagé entre les sessions du processus"""
+
+    def __init__(self, ttl=DATA_CACHE_TTL, max_entries=DATA_CACHE_MAX_ENTRIES, disk_path=None,
+                 stale_ttl=DATA_CACHE_STALE_TTL):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.disk_path:
+            os.makedirs(os.path.dirname(self.disk_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries "
+                    "(key TEXT PRIMARY KEY, stored_at REAL, value BLOB, validators TEXT)"
+                )
+                try:
+                    conn.execute("ALTER TABLE entries ADD COLUMN validators TEXT")
+                except sqlite3.OperationalError:
+                    pass
+
+    @staticmethod
+    def make_key(*parts):
+        """Construit une clé stable à partir de l'identifiant et des paramètres"""
+        return json.dumps(parts, sort_keys=True, default=str)
+
+    def _connect(self):
+        return sqlite3.connect(self.disk_path, timeout=5)
+
+    def get(self, key):
+        """Retourne la valeur en cache ou None si absente/expirée"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value, _ = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if now - stored_at > self.stale_ttl:
+                    del self._entries[key]
+
+        entry = self._disk_get(key, now, self.ttl)
+        with self._lock:
+            if entry is not None:
+                self.hits += 1
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+        return entry[1] if entry else None
+
+    def get_stale(self, key):
+        """Retourne (valeur, validateurs) même expirée, pour une requête conditionnelle; None si absente"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.stale_ttl:
+                return entry[1], entry[2]
+
+        entry = self._disk_get(key, now, self.stale_ttl)
+        return (entry[1], entry[2]) if entry else None
+
+    def put(self, key, value, validators=None):
+        """Ajoute une valeur au cache (et au stockage disque si activé), avec ses validateurs HTTP"""
+        now = time.time()
+        with self._lock:
+            self._store(key, now, value, validators)
+        self._disk_put(key, now, value, validators)
+
+    def refresh(self, key, validators=None):
+        """Réponse 304: l'entrée redevient fraîche sans retransfert du corps"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            validators = validators or entry[2]
+            self._store(key, now, entry[1], validators)
+            self.revalidations += 1
+        self._disk_refresh(key, now, validators)
+
+    def _store(self, key, stored_at, value, validators=None):
+        self._entries[key] = (stored_at, value, validators)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key, now, max_age):
+        if not self.disk_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT stored_at, value, validators FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None or now - row[0] > max_age:
+                return None
+            value = pickle.loads(row[1])
+            validators = json.loads(row[2]) if row[2] else None
+        except Exception:
+            return None
+        with self._lock:
+            self._store(key, row[0], value, validators)
+        return row[0], value, validators
+
+    def _disk_put(self, key, stored_at, value, validators=None):
+        if not self.disk_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, stored_at, value, validators) VALUES (?, ?, ?, ?)",
+                    (key, stored_at, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                     json.dumps(validators) if validators else None)
+                )
+                conn.execute("DELETE FROM entries WHERE stored_at < ?", (stored_at - self.stale_ttl,))
+        except Exception:
+            pass
+
+    def _disk_refresh(self, key, stored_at, validators):
+        if not self.disk_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE entries SET stored_at = ?, validators = ? WHERE key = ?",
+                    (stored_at, json.dumps(validators) if validators else None, key)
+                )
+        except Exception:
+            pass
+
+    def clear(self):
+        """Vide le cache mémoire et disque"""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM entries")
+            except Exception:
+                pass
+
+    def clear_user(self, base_url, username):
+        """Retire du cache mémoire et disque les seules entrées d'un utilisateur sur un serveur"""
+        # Les clés commencent par [serveur, utilisateur, ...] (voir make_key)
+        prefix = self.make_key(base_url, username)[:-1] + ", "
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+        if self.disk_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            except Exception:
+                pass
+
+    def get_stats(self):
+        """Retourne les compteurs du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'revalidations': self.revalidations,
+                'hit_rate': (self.hits / total * 100) if total else 0.0
+            }
+
+
+@st.cache_resource
+def get_data_cache():
+    """Instance unique du cache de données pour tout le processus Streamlit"""
+    disk_path = os.path.join(APP_DATA_DIR, "data_cache.sqlite") if DATA_CACHE_DISK_ENABLED else None
+    return DataCache(disk_path=disk_path)
+
+
+class EndpointRegistry:
+    """Mémorise, par serveur et type de visualisation, l'endpoint de données qui répond"""
+
+    EVENT = 'event'
+    DATA_JSON = 'data.json'
+
+    def __init__(self, path=None):
+        self.path = path
+        self.fallbacks_used = 0
+        self.fallbacks_avoided = 0
+        self._preferences = {}
+        self._lock = threading.Lock()
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._preferences = json.load(f)
+            except Exception:
+                self._preferences = {}
+
+    @staticmethod
+    def _key(base_url, viz_type):
+        return f"{base_url}|{viz_type or 'INCONNU'}"
+
+    def get(self, base_url, viz_type):
+        """Endpoint connu pour ce serveur et ce type, ou None"""
+        with self._lock:
+            return self._preferences.get(self._key(base_url, viz_type))
+
+    def record(self, base_url, viz_type, endpoint):
+        """Enregistre l'endpoint qui a fonctionné et le persiste s'il a changé"""
+        key = self._key(base_url, viz_type)
+        with self._lock:
+            if self._preferences.get(key) == endpoint:
+                return
+            self._preferences[key] = endpoint
+            snapshot = dict(self._preferences)
+        self._save(snapshot)
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks_used += 1
+
+    def record_avoided(self):
+        with self._lock:
+            self.fallbacks_avoided += 1
+
+    def _save(self, preferences):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(preferences, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+    def get_stats(self):
+        """Retourne les compteurs de repli"""
+        with self._lock:
+            return {
+                'known_types': len(self._preferences),
+                'fallbacks_used': self.fallbacks_used,
+                'fallbacks_avoided': self.fallbacks_avoided
+            }
+
+
+@st.cache_resource
+def get_endpoint_registry():
+    """Instance unique du registre d'endpoints, persistée sur disque"""
+    return EndpointRegistry(path=os.path.join(APP_DATA_DIR, "endpoints.json"))
+
+
+# Types de valeurs DHIS2 (headers[].valueType)
+INTEGER_VALUE_TYPES = {'INTEGER', 'INTEGER_POSITIVE', 'INTEGER_NEGATIVE', 'INTEGER_ZERO_OR_POSITIVE'}
+NUMBER_VALUE_TYPES = {'NUMBER', 'PERCENTAGE', 'UNIT_INTERVAL'}
+DATE_VALUE_TYPES = {'DATE', 'DATETIME'}
+
+
+def get_analytics_column_kind(header):
+    """Détermine le type de colonne cible à partir d'un header DHIS2"""
+    value_type = str(header.get('valueType', '')).upper()
+    if header.get('meta'):
+        return 'dimension'
+    if value_type in INTEGER_VALUE_TYPES:
+        return 'integer'
+    if value_type in NUMBER_VALUE_TYPES:
+        return 'number'
+    if value_type in DATE_VALUE_TYPES:
+        return 'date'
+    if value_type:
+        return 'text'
+    return 'unknown'
+
+
+def get_analytics_column_names(headers, width):
+    """Noms de colonnes à partir des headers (name, sinon column)"""
+    column_names = []
+    for header in headers[:width]:
+        name = header.get('name', '')
+        if not name and 'column' in header:
+            name = header['column']
+        column_names.append(name or f"Colonne_{len(column_names)}")
+    while len(column_names) < width:
+        column_names.append(f"Colonne_{len(column_names)}")
+    return column_names
+
+
+def categorical_from_codes(codes, uniques, meta_items=None):
+    """Construit une colonne catégorielle en résolvant les identifiants via metaData.items"""
+    if meta_items:
+        names = [
+            meta_items[u].get('name', u) if isinstance(meta_items.get(u), dict) else u
+            for u in uniques
+        ]
+        # Deux identifiants peuvent porter le même nom: ré-encoder sur les noms
+        name_codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+        codes = np.append(name_codes, -1).astype(np.int32)[codes]
+    return pd.Categorical.from_codes(codes, categories=pd.Index(uniques))
+
+
+def build_categorical_column(values, meta_items=None):
+    """Encode une colonne en catégories en résolvant les identifiants via metaData.items"""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    return categorical_from_codes(codes, uniques, meta_items)
+
+
+def convert_analytics_column(values, kind, meta_items=None):
+    """Convertit une colonne brute (chaînes DHIS2) vers un type numpy/pandas adapté"""
+    values = np.asarray(values, dtype=object)
+
+    if kind in ('number', 'integer'):
+        numeric = pd.to_numeric(values, errors='coerce').astype(np.float64, copy=False)
+        if kind == 'integer' and not np.isnan(numeric).any():
+            return numeric.astype(np.int64)
+        return numeric
+
+    if kind == 'unknown':
+        # Type non déclaré: nombre seulement si aucune valeur non vide n'est perdue.
+        # Les colonnes TEXT restent du texte (codes, identifiants à zéros initiaux...)
+        numeric = pd.to_numeric(values, errors='coerce')
+        present = pd.notna(values) & (values != '')
+        if present.any() and not pd.isna(numeric[present]).any():
+            return numeric
+
+    if kind == 'date':
+        return pd.to_datetime(pd.Series(values), errors='coerce').values
+
+    if kind == 'dimension':
+        return build_categorical_column(values, meta_items)
+
+    # Texte libre: catégoriel si la cardinalité est faible
+    categorical = build_categorical_column(values)
+    if len(categorical.categories) <= max(1, len(values) // 2):
+        return categorical
+    return values
+
+
+def build_analytics_frame(headers, rows, meta_items=None):
+    """Construit un DataFrame typé à partir d'une grille analytics DHIS2"""
+    grid = np.array(rows, dtype=object)
+    if grid.ndim != 2:
+        # Lignes de longueurs différentes: compléter avec des valeurs manquantes
+        grid = pd.DataFrame(list(rows)).to_numpy(dtype=object)
+
+    width = grid.shape[1]
+    column_names = get_analytics_column_names(headers, width)
+    kinds = [get_analytics_column_kind(h) for h in headers[:width]]
+    kinds += ['unknown'] * (width - len(kinds))
+
+    df = pd.DataFrame({
+        position: convert_analytics_column(grid[:, position], kind, meta_items)
+        for position, kind in enumerate(kinds)
+    })
+    df.columns = column_names
+    return df
+
+
+class AnalyticsColumnBuffer:
+    """Accumule des lignes analytics par lots dans des buffers colonne préalloués"""
+
+    def __init__(self, headers, width, capacity=STREAM_ROWS_BATCH):
+        self.column_names = get_analytics_column_names(headers, width)
+        self.kinds = [get_analytics_column_kind(h) for h in headers[:width]]
+        self.kinds += ['unknown'] * (width - len(self.kinds))
+        self.size = 0
+        self.capacity = capacity
+        # Colonnes numériques: float64; autres colonnes: codes int32 + dictionnaire des valeurs
+        self.buffers = [
+            np.empty(capacity, dtype=np.float64 if kind in ('number', 'integer') else np.int32)
+            for kind in self.kinds
+        ]
+        self.dictionaries = [{} for _ in self.kinds]
+
+    def _ensure_capacity(self, needed):
+        if needed <= self.capacity:
+            return
+        while self.capacity < needed:
+            self.capacity *= 2
+        for buffer in self.buffers:
+            buffer.resize(self.capacity, refcheck=False)
+
+    def append_rows(self, rows):
+        """Ajoute un lot de lignes brutes"""
+        if not rows:
+            return
+        grid = np.array(rows, dtype=object)
+        if grid.ndim != 2 or grid.shape[1] != len(self.kinds):
+            grid = pd.DataFrame(list(rows)).reindex(columns=range(len(self.kinds))).to_numpy(dtype=object)
+
+        start, end = self.size, self.size + len(grid)
+        self._ensure_capacity(end)
+
+        for position, kind in enumerate(self.kinds):
+            values = grid[:, position]
+            buffer = self.buffers[position]
+            if kind in ('number', 'integer'):
+                buffer[start:end] = pd.to_numeric(values, errors='coerce')
+            else:
+                local_codes, local_uniques = pd.factorize(values)
+                dictionary = self.dictionaries[position]
+                lookup = np.array(
+                    [dictionary.setdefault(u, len(dictionary)) for u in local_uniques] + [-1],
+                    dtype=np.int32
+                )
+                buffer[start:end] = lookup[local_codes]
+
+        self.size = end
+
+    def to_frame(self, meta_items=None):
+        """Construit le DataFrame final à partir des buffers"""
+        columns = {}
+        for position, kind in enumerate(self.kinds):
+            # Libérer chaque buffer dès sa conversion: le pic reste proche de la taille du DataFrame
+            buffer, self.buffers[position] = self.buffers[position], None
+            buffer.resize(self.size, refcheck=False)
+            if kind in ('number', 'integer'):
+                if kind == 'integer' and not np.isnan(buffer).any():
+                    columns[position] = buffer.astype(np.int64)
+                else:
+                    columns[position] = buffer
+                continue
+
+            uniques = np.empty(len(self.dictionaries[position]), dtype=object)
+            for value, code in self.dictionaries[position].items():
+                uniques[code] = value
+
+            if kind == 'dimension':
+                columns[position] = categorical_from_codes(buffer, uniques, meta_items)
+            elif kind == 'text' and len(uniques) <= max(1, self.size // 2):
+                # Texte peu varié: les codes du buffer sont déjà ceux de la colonne catégorielle
+                columns[position] = categorical_from_codes(buffer, uniques)
+            else:
+                values = np.where(buffer >= 0, uniques[np.maximum(buffer, 0)] if len(uniques) else None, None)
+                columns[position] = convert_analytics_column(values, kind, meta_items)
+
+        df = pd.DataFrame(columns)
+        df.columns = self.column_names
+        return df
+
+
+class StreamingAnalyticsDecoder:
+    """Décodeur JSON incrémental d'une réponse analytics: les lignes ne sont jamais toutes en mémoire"""
+
+    _WHITESPACE = re.compile(r'\s*')
+    _SEPARATORS = re.compile(r'[\s,]*')
+
+    def __init__(self):
+        self.result = {}
+        self.columns = None
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._stage = 'start'
+        self._key = None
+        self._saw_rows = False
+        self._pending_rows = []
+        self._retry_size = 0
+
+    def feed(self, chunk):
+        """Ajoute un morceau (bytes ou str) de la réponse"""
+        if isinstance(chunk, bytes):
+            chunk = self._text_decoder.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        if len(self._buffer) >= self._retry_size:
+            self._parse(final=False)
+
+    def close(self):
+        """Termine le décodage et retourne le dictionnaire de la réponse"""
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(b'', final=True)
+        self._pos = 0
+        self._parse(final=True)
+        if self._stage != 'done':
+            raise json.JSONDecodeError("Réponse JSON incomplète", self._buffer, self._pos)
+
+        self._flush_rows()
+        if self.columns is not None:
+            meta_items = self.result.get('metaData', {}).get('items', {})
+            self.result['frame'] = self.columns.to_frame(meta_items)
+        elif self._saw_rows:
+            self.result['rows'] = []
+        return self.result
+
+    def _expect(self, char, final):
+        self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+        if self._pos >= len(self._buffer):
+            if final:
+                raise json.JSONDecodeError(f"'{char}' attendu", self._buffer, self._pos)
+            return False
+        if self._buffer[self._pos] != char:
+            raise json.JSONDecodeError(f"'{char}' attendu", self._buffer, self._pos)
+        self._pos += 1
+        return True
+
+    def _decode_value(self, final):
+        """Décode une valeur JSON complète à la position courante, ou None si incomplète"""
+        self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            # Attendre que le buffer double avant de réessayer (évite un coût quadratique)
+            self._retry_size = (len(self._buffer) - self._pos) * 2
+            return None
+        if end == len(self._buffer) and not final and isinstance(value, (int, float)):
+            return None
+        self._retry_size = 0
+        self._pos = end
+        return (value,)
+
+    def _parse(self, final):
+        while True:
+            if self._stage == 'start':
+                if not self._expect('{', final):
+                    return
+                self._stage = 'key'
+
+            elif self._stage == 'key':
+                self._pos = self._SEPARATORS.match(self._buffer, self._pos).end()
+                if self._buffer[self._pos:self._pos + 1] == '}':
+                    self._pos += 1
+                    self._stage = 'done'
+                    return
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                self._key = decoded[0]
+                self._stage = 'colon'
+
+            elif self._stage == 'colon':
+                if not self._expect(':', final):
+                    return
+                self._stage = 'rows_start' if self._key == 'rows' else 'value'
+
+            elif self._stage == 'value':
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                self.result[self._key] = decoded[0]
+                self._stage = 'key'
+
+            elif self._stage == 'rows_start':
+                if not self._expect('[', final):
+                    return
+                self._saw_rows = True
+                self._stage = 'rows'
+
+            elif self._stage == 'rows':
+                self._pos = self._SEPARATORS.match(self._buffer, self._pos).end()
+                if self._buffer[self._pos:self._pos + 1] == ']':
+                    self._pos += 1
+                    self._stage = 'key'
+                    continue
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                self._pending_rows.append(decoded[0])
+                if len(self._pending_rows) >= STREAM_ROWS_BATCH:
+                    self._flush_rows()
+
+            else:
+                return
+
+    def _flush_rows(self):
+        # Les headers précèdent les lignes dans les réponses DHIS2; sinon le lot reste en attente
+        if not self._pending_rows or ('headers' not in self.result and self._stage != 'done'):
+            return
+        if self.columns is None:
+            headers = self.result.get('headers', [])
+            self.columns = AnalyticsColumnBuffer(headers, len(self._pending_rows[0]))
+        self.columns.append_rows(self._pending_rows)
+        self._pending_rows = []
+
+
+class DashboardCatalogue:
+    """Catalogue local des dashboards, synchronisé incrémentalement via lastUpdated"""
+
+    def __init__(self):
+        self.dashboards = {}
+        self.last_updated = None
+        self.last_sync = None
+        self.last_sync_stats = {}
+
+    def is_empty(self):
+        return not self.dashboards
+
+    def replace(self, dashboards):
+        """Remplace tout le catalogue (synchronisation complète)"""
+        self.dashboards = {d['id']: d for d in dashboards if d.get('id')}
+        self._update_watermark(dashboards)
+        self.last_sync = datetime.now()
+        self.last_sync_stats = {'mode': 'complète', 'changed': len(self.dashboards), 'deleted': 0}
+
+    def merge(self, changed, existing_ids):
+        """Applique les dashboards modifiés et retire ceux qui n'existent plus"""
+        for dashboard in changed:
+            if dashboard.get('id'):
+                self.dashboards[dashboard['id']] = dashboard
+        deleted = 0
+        if existing_ids is not None:
+            for dashboard_id in set(self.dashboards) - set(existing_ids):
+                del self.dashboards[dashboard_id]
+                deleted += 1
+        self._update_watermark(changed)
+        self.last_sync = datetime.now()
+        self.last_sync_stats = {'mode': 'incrémentale', 'changed': len(changed), 'deleted': deleted}
+
+    def _update_watermark(self, dashboards):
+        stamps = [d['lastUpdated'] for d in dashboards if d.get('lastUpdated')]
+        if stamps:
+            self.last_updated = max([self.last_updated] + stamps if self.last_updated else stamps)
+
+    def to_list(self):
+        """Dashboards triés par nom, comme l'ordre serveur name:asc"""
+        return sorted(self.dashboards.values(), key=lambda d: d.get('name', '').lower())
+
+
+def normalize_search_text(text):
+    """Minuscules sans accents (Thiès -> thies)"""
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+class DashboardSearchIndex:
+    """Index inversé et trigrammes sur les noms, descriptions, propriétaires et éléments"""
+
+    _TOKEN_PATTERN = re.compile(r'\w+')
+
+    def __init__(self, dashboards):
+        self.dashboards = dashboards
+        self.postings = {}
+        self.trigrams = {}
+
+        for position, dashboard in enumerate(dashboards):
+            for token in self._TOKEN_PATTERN.findall(normalize_search_text(self._document(dashboard))):
+                self.postings.setdefault(token, set()).add(position)
+
+        self.sorted_tokens = sorted(self.postings)
+        for token in self.sorted_tokens:
+            for i in range(len(token) - 2):
+                self.trigrams.setdefault(token[i:i + 3], set()).add(token)
+
+    @staticmethod
+    def _document(dashboard):
+        parts = [
+            dashboard.get('name', ''),
+            dashboard.get('description', ''),
+            dashboard.get('user', {}).get('name', '')
+        ]
+        for item in dashboard.get('dashboardItems', []):
+            for key in ('visualization', 'chart', 'map'):
+                if item.get(key):
+                    parts.append(item[key].get('name', ''))
+        return ' '.join(p for p in parts if p)
+
+    def _match_term(self, term):
+        """Positions des dashboards dont un mot commence par ou contient le terme"""
+        matches = set()
+
+        # Préfixe: plage contiguë dans la liste triée des mots
+        start = bisect.bisect_left(self.sorted_tokens, term)
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(term):
+                break
+            matches |= self.postings[token]
+
+        # Sous-chaîne: intersection des trigrammes puis vérification
+        if len(term) >= 3:
+            candidates = None
+            for i in range(len(term) - 2):
+                tokens = self.trigrams.get(term[i:i + 3], set())
+                candidates = tokens if candidates is None else candidates & tokens
+                if not candidates:
+                    break
+            for token in candidates or ():
+                if term in token:
+                    matches |= self.postings[token]
+
+        return matches
+
+    def search(self, query):
+        """Dashboards correspondant à tous les termes de la requête, dans l'ordre du catalogue"""
+        terms = self._TOKEN_PATTERN.findall(normalize_search_text(query))
+        if not terms:
+            return list(self.dashboards)
+
+        positions = None
+        for term in terms:
+            matches = self._match_term(term)
+            positions = matches if positions is None else positions & matches
+            if not positions:
+                return []
+        return [self.dashboards[p] for p in sorted(positions)]
+
+
+def credential_verifier(password, salt=None, iterations=SNAPSHOT_VERIFIER_ITERATIONS):
+    """Empreinte PBKDF2 du mot de passe, pour ouvrir ses instantanés sans joindre le serveur"""
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return {'salt': salt.hex(), 'hash': digest.hex(), 'iterations': iterations}
+
+
+def check_credential(password, verifier):
+    expected = credential_verifier(password, bytes.fromhex(verifier['salt']), verifier['iterations'])
+    return hmac.compare_digest(expected['hash'], verifier['hash'])
+
+
+def is_fallback_data(data, item_type):
+    """Données de repli (générées localement ou erreur) plutôt que des données du serveur"""
+    return item_type == "Erreur" or bool(data.attrs.get('synthetic'))
+
+
+def snapshot_item_key(item):
+    """Identifiant stable d'un élément de dashboard dans un instantané"""
+    if item.get('id'):
+        return item['id']
+    return hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class SnapshotStore:
+    """Instantanés locaux de dashboards (définition + données des éléments) pour une réouverture hors ligne
+
+    Chaque instantané est une archive zip : manifest.json (propriétaire, horodatages, liste des éléments),
+    dashboard.json et un fichier par élément (Parquet si pyarrow est disponible, sinon pickle).
+    Les instantanés appartiennent à un couple (serveur, utilisateur) et ne sont visibles que de lui.
+    L'empreinte du mot de passe est unique par propriétaire (la plus récente), hors des archives.
+    """
+
+    MANIFEST_VERSION = 3
+
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self._refresh_status = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _owner_prefix(server, username):
+        return hashlib.sha1(f"{server}|{username}".encode()).hexdigest()[:12]
+
+    def path_for(self, server, username, dashboard_id):
+        return os.path.join(self.directory, f"{self._owner_prefix(server, username)}_{dashboard_id}.zip")
+
+    def verifier_path(self, server, username):
+        return os.path.join(self.directory, f"{self._owner_prefix(server, username)}.verifier.json")
+
+    def _save_verifier(self, server, username, password):
+        """Remplace l'empreinte du mot de passe du propriétaire par celle du dernier enregistrement"""
+        record = {'server': server, 'owner': username, 'verifier': credential_verifier(password)}
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(temp_path, self.verifier_path(server, username))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _load_verifier(self, server, username):
+        """Empreinte la plus récente du propriétaire, ou None"""
+        try:
+            with open(self.verifier_path(server, username), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            record = None
+        if record and record.get('server') == server and record.get('owner') == username:
+            return record.get('verifier')
+        # Instantanés antérieurs (version 2): empreinte dans le manifeste, on garde la plus récente
+        for manifest in self.list_snapshots(server, username):
+            if manifest.get('verifier'):
+                return manifest['verifier']
+        return None
+
+    def save(self, server, username, dashboard, items_data, password=None):
+        """Enregistre un dashboard et les données réelles de ses éléments (alignées sur dashboardItems)"""
+        data_format = 'parquet' if PYARROW_AVAILABLE else 'pickle'
+        manifest = {
+            'version': self.MANIFEST_VERSION,
+            'server': server,
+            'owner': username,
+            'dashboard_id': dashboard.get('id'),
+            'name': dashboard.get('name', 'Dashboard sans nom'),
+            'lastUpdated': dashboard.get('lastUpdated'),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'format': data_format,
+            'items': []
+        }
+
+        path = self.path_for(server, username, dashboard.get('id'))
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(handle)
+        try:
+            with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+                bundle.writestr('dashboard.json', json.dumps(dashboard, default=str))
+                for idx, (item, (data, info, item_type)) in enumerate(zip(dashboard.get('dashboardItems', []),
+                                                                         items_data)):
+                    if is_fallback_data(data, item_type):
+                        # Données de repli: signalées dans le manifeste, pas présentées comme hors ligne
+                        manifest['items'].append({'key': snapshot_item_key(item), 'fallback': True,
+                                                  'info': info, 'item_type': item_type})
+                        continue
+                    file_name = f"items/element_{idx + 1:03d}.{'parquet' if data_format == 'parquet' else 'pkl'}"
+                    if data_format == 'parquet':
+                        # Fichiers Parquet déjà compressés (zstd) : stockés tels quels dans l'archive
+                        bundle.writestr(zipfile.ZipInfo(file_name), serialize_export(data, 'parquet'),
+                                        compress_type=zipfile.ZIP_STORED)
+                    else:
+                        bundle.writestr(file_name, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+                    manifest['items'].append({
+                        'key': snapshot_item_key(item), 'file': file_name, 'info': info,
+                        'item_type': item_type, 'rows': len(data)
+                    })
+                bundle.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        if password:
+            self._save_verifier(server, username, password)
+        return path
+
+    def _read_manifest(self, path, server, username):
+        """Manifeste d'un instantané appartenant à (serveur, utilisateur), sinon None"""
+        try:
+            with zipfile.ZipFile(path) as bundle:
+                manifest = json.loads(bundle.read('manifest.json'))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        if manifest.get('server') != server or manifest.get('owner') != username:
+            return None
+        manifest['path'] = path
+        return manifest
+
+    def list_snapshots(self, server, username):
+        """Manifestes des instantanés de l'utilisateur, du plus récent au plus ancien"""
+        prefix = f"{self._owner_prefix(server, username)}_"
+        manifests = []
+        for file_name in os.listdir(self.directory):
+            if not (file_name.startswith(prefix) and file_name.endswith('.zip')):
+                continue
+            manifest = self._read_manifest(os.path.join(self.directory, file_name), server, username)
+            if manifest:
+                manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m.get('created_at', ''), reverse=True)
+
+    def find(self, server, username, dashboard_id):
+        """Manifeste de l'instantané d'un dashboard pour cet utilisateur, ou None"""
+        path = self.path_for(server, username, dashboard_id)
+        if not os.path.exists(path):
+            return None
+        return self._read_manifest(path, server, username)
+
+    def unlock(self, server, username, password):
+        """Vérifie localement le mot de passe contre l'empreinte la plus récente de l'utilisateur"""
+        prefix = f"{self._owner_prefix(server, username)}_"
+        if not any(name.startswith(prefix) and name.endswith('.zip') for name in os.listdir(self.directory)):
+            return False
+        verifier = self._load_verifier(server, username)
+        return bool(verifier) and check_credential(password, verifier)
+
+    def load(self, server, username, dashboard_id):
+        """Charge un instantané; retourne (manifeste, dashboard, {clé d'élément: (data, info, type)})"""
+        path = self.path_for(server, username, dashboard_id)
+        if self._read_manifest(path, server, username) is None:
+            raise PermissionError("Instantané introuvable pour cet utilisateur")
+        with zipfile.ZipFile(path) as bundle:
+            manifest = json.loads(bundle.read('manifest.json'))
+            dashboard = json.loads(bundle.read('dashboard.json'))
+            items = {}
+            for entry in manifest['items']:
+                if entry.get('fallback'):
+                    continue
+                payload = bundle.read(entry['file'])
+                if manifest.get('format') == 'parquet':
+                    data = pq.read_table(io.BytesIO(payload)).to_pandas()
+                else:
+                    data = pickle.loads(payload)
+                items[entry['key']] = (data, entry['info'], entry['item_type'])
+        manifest['path'] = path
+        return manifest, dashboard, items
+
+    def delete(self, server, username, dashboard_id):
+        path = self.path_for(server, username, dashboard_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def get_refresh_status(self, path):
+        with self._lock:
+            return self._refresh_status.get(path)
+
+    def refresh_in_background(self, client, dashboard):
+        """Recharge le dashboard depuis le serveur dans un thread et réécrit son instantané"""
+        path = self.path_for(client.base_url, client.username, dashboard.get('id'))
+        with self._lock:
+            if (self._refresh_status.get(path) or {}).get('state') == 'running':
+                return
+            self._refresh_status[path] = {'state': 'running', 'started_at': time.time()}
+
+        def refresh():
+            try:
+                details = client.get_dashboard_details(dashboard['id'])
+                if not details:
+                    raise RuntimeError("dashboard introuvable")
+                for key in ('is_owner', 'owner_info'):
+                    if key in dashboard:
+                        details[key] = dashboard[key]
+                details['item_types'] = get_dashboard_item_types(details.get('dashboardItems', []))
+                items_data = client.get_items_data(details.get('dashboardItems', []))
+                self.save(client.base_url, client.username, details, items_data, password=client.password)
+                status = {'state': 'done', 'finished_at': time.time()}
+            except Exception as e:
+                status = {'state': 'error', 'error': str(e), 'finished_at': time.time()}
+            with self._lock:
+                self._refresh_status[path] = status
+
+        threading.Thread(target=refresh, name="dhis2-snapshot-refresh", daemon=True).start()
+
+
+@st.cache_resource
+def get_snapshot_store():
+    """Instance unique du magasin d'instantanés"""
+    return SnapshotStore()
+
+
+class DashboardUsage:
+    """Compte les ouvertures de chaque dashboard (par serveur et par utilisateur), persisté sur disque"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._counts = {}
+        self._lock = threading.Lock()
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._counts = json.load(f)
+            except Exception:
+                self._counts = {}
+
+    @staticmethod
+    def _key(base_url, username, dashboard_id):
+        return f"{base_url}|{username}|{dashboard_id}"
+
+    def get_count(self, base_url, username, dashboard_id):
+        with self._lock:
+            return self._counts.get(self._key(base_url, username, dashboard_id), 0)
+
+    def record_open(self, base_url, username, dashboard_id):
+        key = self._key(base_url, username, dashboard_id)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            counts = dict(self._counts)
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(counts, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+
+@st.cache_resource
+def get_dashboard_usage():
+    """Instance unique des compteurs d'ouverture, persistée sur disque"""
+    return DashboardUsage(path=os.path.join(APP_DATA_DIR, "dashboard_usage.json"))
+
+
+class BandwidthLimiter:
+    """Limite le débit moyen d'une suite de requêtes: les octets reçus sont comptés, l'attente se fait entre deux requêtes"""
+
+    def __init__(self, bytes_per_second):
+        self.bytes_per_second = bytes_per_second
+        self.started_at = time.monotonic()
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, n_bytes):
+        """Comptabilise n_bytes reçus sur le réseau"""
+        with self._lock:
+            self.total_bytes += n_bytes
+
+    def delay(self):
+        """Attente nécessaire (en secondes) avant la prochaine requête pour respecter le débit"""
+        with self._lock:
+            return self.total_bytes / self.bytes_per_second - (time.monotonic() - self.started_at)
+
+
+class PrefetchScheduler:
+    """Préchargement en arrière-plan des dashboards probables, dans le cache de données
+
+    Un seul thread de faible priorité : il cède la place aux requêtes de premier plan (créneaux du
+    serveur pris sans attendre), respecte un débit maximal et abandonne son travail dès qu'une
+    nouvelle génération est planifiée ou que l'utilisateur ouvre un dashboard.
+    """
+
+    def __init__(self, client, max_dashboards=PREFETCH_MAX_DASHBOARDS,
+                 bytes_per_second=PREFETCH_MAX_BYTES_PER_SECOND):
+        self.client = client
+        self.max_dashboards = max_dashboards
+        self.bytes_per_second = bytes_per_second
+        self.dashboards_done = 0
+        self.items_done = 0
+        self.bytes_fetched = 0
+        self._generation = 0
+        self._queue = []
+        self._scheduled_ids = None
+        self._details = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def select(self, dashboards):
+        """Dashboards à précharger : les plus ouverts puis ceux de l'utilisateur"""
+        usage = get_dashboard_usage()
+        candidates = []
+        for dashboard in dashboards:
+            if not dashboard.get('dashboardItems'):
+                continue
+            opens = usage.get_count(self.client.base_url, self.client.username, dashboard['id'])
+            if opens or dashboard.get('is_owner'):
+                candidates.append((-opens, not dashboard.get('is_owner'), dashboard['id'], dashboard))
+        candidates.sort(key=lambda c: c[:3])
+        return [c[3] for c in candidates[:self.max_dashboards]]
+
+    def schedule(self, dashboards):
+        """Planifie le préchargement; sans effet si la sélection n'a pas changé"""
+        selected = self.select(dashboards)
+        selected_ids = tuple(d['id'] for d in selected)
+        with self._lock:
+            if selected_ids == self._scheduled_ids:
+                return
+            self._scheduled_ids = selected_ids
+            self._generation += 1
+            self._queue = list(selected)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="dhis2-prefetch", daemon=True)
+                self._thread.start()
+
+    def cancel(self):
+        """Abandonne le travail en cours (navigation de l'utilisateur)"""
+        with self._lock:
+            self._generation += 1
+            self._queue = []
+            self._scheduled_ids = None
+
+    def is_running(self):
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive() and bool(self._queue or self._scheduled_ids)
+
+    def get_details(self, dashboard_id):
+        """Copie des détails préchargés d'un dashboard s'ils sont encore frais, sinon None"""
+        with self._lock:
+            entry = self._details.get(dashboard_id)
+        if entry and time.time() - entry[0] < DATA_CACHE_TTL:
+            # L'appelant annote les détails (propriétaire, types): l'entrée préchargée reste intacte
+            return copy.deepcopy(entry[1])
+        return None
+
+    def _cancelled(self, generation):
+        with self._lock:
+            return generation != self._generation
+
+    def _run(self):
+        limiter = BandwidthLimiter(self.bytes_per_second)
+        self.client._throttle.limiter = limiter
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._scheduled_ids = None
+                    return
+                dashboard = self._queue.pop(0)
+                generation = self._generation
+            try:
+                self._prefetch_dashboard(dashboard, generation)
+            except Exception:
+                pass
+            self.bytes_fetched = limiter.total_bytes
+
+    def _with_slot(self, generation, fetch):
+        """Exécute une requête quand un créneau du serveur est libre (priorité au premier plan)"""
+        while not self.client.server_slots.acquire(blocking=False):
+            if self._cancelled(generation):
+                return None
+            time.sleep(PREFETCH_PAUSE)
+        # Le client asynchrone ne doit pas reprendre un second jeton pour cette requête
+        self.client._throttle.holds_server_slot = True
+        try:
+            return fetch()
+        finally:
+            self.client._throttle.holds_server_slot = False
+            self.client.server_slots.release()
+            # Le débit est respecté créneau rendu: les requêtes de premier plan n'attendent jamais le préchargement
+            self._pause(generation)
+
+    def _pause(self, generation):
+        """Attente entre deux requêtes (au moins PREFETCH_PAUSE), interrompue par une annulation"""
+        limiter = getattr(self.client._throttle, 'limiter', None)
+        delay = max(PREFETCH_PAUSE, limiter.delay() if limiter is not None else 0)
+        deadline = time.monotonic() + delay
+        while not self._cancelled(generation):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, PREFETCH_PAUSE))
+
+    def _prefetch_dashboard(self, dashboard, generation):
+        if self._cancelled(generation):
+            return
+        details = self._with_slot(generation, lambda: self.client.get_dashboard_details(dashboard['id']))
+        if not details:
+            return
+        with self._lock:
+            self._details[dashboard['id']] = (time.time(), details)
+
+        for item in details.get('dashboardItems', []):
+            if self._cancelled(generation):
+                return
+            if item.get('visualization') or item.get('chart'):
+                self._with_slot(generation, lambda: self.client.get_item_data(item))
+                self.items_done += 1
+        self.dashboards_done += 1
+
+
+def get_prefetch_scheduler():
+    """Planificateur de préchargement de la session, lié au client connecté"""
+    client = st.session_state.get('client')
+    if client is None or not PREFETCH_ENABLED:
+        return None
+    scheduler = st.session_state.get('prefetch_scheduler')
+    if scheduler is None or scheduler.client is not client:
+        if scheduler is not None:
+            scheduler.cancel()
+        scheduler = PrefetchScheduler(client)
+        st.session_state.prefetch_scheduler = scheduler
+    return scheduler
+
+
+class SnapshotClient:
+    """Source de données hors ligne : sert les éléments d'un instantané avec l'interface de DHIS2Client"""
+
+    def __init__(self, manifest, items):
+        self.manifest = manifest
+        self.items = items
+        self.listing_stats = {}
+
+    def get_item_data(self, item):
+        cached = self.items.get(snapshot_item_key(item))
+        if cached is None:
+            return pd.DataFrame(), "Élément non disponible hors ligne", get_item_type(item)
+        data, info, item_type = cached
+        frame_fingerprint(data)
+        return data.copy(), f"{info} | Instantané du {self.manifest.get('created_at', '')}", item_type
+
+    def get_items_data(self, items, max_workers=None, on_item_done=None):
+        items = list(items)
+        results = []
+        for idx, item in enumerate(items):
+            results.append(self.get_item_data(item))
+            if on_item_done:
+                on_item_done(idx, idx + 1, len(items))
+        return results
+
+    def iter_items_data(self, items, max_workers=None):
+        for idx, item in enumerate(items):
+            yield idx, self.get_item_data(item)
+
+
+def get_snapshot_owner():
+    """(serveur, utilisateur) dont les instantanés sont accessibles dans cette session, ou None"""
+    client = st.session_state.get('client')
+    if st.session_state.get('authenticated') and client:
+        return client.base_url, client.username
+    return st.session_state.get('offline_owner')
+
+
+def get_data_client():
+    """Client servant les données des éléments : l'instantané ouvert s'il y en a un, sinon le serveur"""
+    return st.session_state.get('snapshot_client') or st.session_state.client
+
+
+_server_semaphores = {}
+_server_semaphores_lock = threading.Lock()
+_circuit_breakers = {}
+
+
+def get_server_semaphore(base_url):
+    """Sémaphore limitant le nombre de requêtes simultanées vers un même serveur"""
+    with _server_semaphores_lock:
+        if base_url not in _server_semaphores:
+            _server_semaphores[base_url] = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS_PER_SERVER)
+        return _server_semaphores[base_url]
+
+
+def get_circuit_breaker(base_url):
+    """Disjoncteur partagé par toutes les sessions connectées à un même serveur"""
+    with _server_semaphores_lock:
+        if base_url not in _circuit_breakers:
+            _circuit_breakers[base_url] = CircuitBreaker()
+        return _circuit_breakers[base_url]
+
+
+class CircuitOpenError(Exception):
+    """Le disjoncteur du serveur est ouvert : la requête échoue sans être envoyée"""
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un serveur: s'ouvre après des échecs consécutifs, puis laisse passer une sonde"""
+
+    CLOSED = 'fermé'
+    OPEN = 'ouvert'
+    HALF_OPEN = 'semi-ouvert'
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Indique si une requête peut partir (une seule sonde à la fois en semi-ouvert)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Libère la sonde sans verdict (requête annulée côté client)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class TransportMetrics:
+    """Histogrammes de latence et compteurs de la couche HTTP, par type d'endpoint"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, seconds):
+        with self._lock:
+            histogram = self._histograms.setdefault(endpoint, {'counts': [0] * (len(self.buckets) + 1),
+                                                               'count': 0, 'total': 0.0})
+            histogram['counts'][bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram['count'] += 1
+            histogram['total'] += seconds
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def _quantile(self, counts, total, q):
+        """Borne supérieure du seau contenant le quantile q"""
+        threshold = q * total
+        cumulative = 0
+        for idx, count in enumerate(counts):
+            cumulative += count
+            if cumulative >= threshold:
+                return self.buckets[idx] if idx < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def bucket_labels(self):
+        return [f"≤ {bound:g} s" for bound in self.buckets] + [f"> {self.buckets[-1]:g} s"]
+
+    def get_stats(self):
+        with self._lock:
+            histograms = {endpoint: dict(h, counts=list(h['counts'])) for endpoint, h in self._histograms.items()}
+            stats = {'retries': self.retries, 'failures': self.failures, 'rejected': self.rejected}
+
+        stats['endpoints'] = {
+            endpoint: {
+                'count': h['count'],
+                'mean': h['total'] / h['count'],
+                'p50': self._quantile(h['counts'], h['count'], 0.5),
+                'p95': self._quantile(h['counts'], h['count'], 0.95),
+                'counts': h['counts']
+            }
+            for endpoint, h in histograms.items() if h['count']
+        }
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self.retries = 0
+            self.failures = 0
+            self.rejected = 0
+
+
+@st.cache_resource
+def get_transport_metrics():
+    """Métriques HTTP partagées par toutes les sessions du processus"""
+    return TransportMetrics()
+
+
+class PayloadStats:
+    """Octets reçus (sur le réseau et décompressés) et temps de décodage JSON, agrégés par élément
+
+    Les mesures sont propres à chaque (serveur, utilisateur): le rapport n'expose jamais les noms
+    d'éléments consultés par un autre compte.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def record(self, base_url, username, item_id, name, wire_bytes, decoded_bytes, decode_seconds, encoding=None):
+        with self._lock:
+            entry = self._items.setdefault((base_url, username, item_id), {
+                'name': name or item_id, 'requests': 0, 'wire_bytes': 0, 'decoded_bytes': 0, 'decode_seconds': 0.0
+            })
+            entry['requests'] += 1
+            entry['wire_bytes'] += wire_bytes
+            entry['decoded_bytes'] += decoded_bytes
+            entry['decode_seconds'] += decode_seconds
+            entry['encoding'] = encoding or 'identity'
+
+    def _owned(self, base_url, username):
+        return [entry for (url, user, _), entry in self._items.items() if (url, user) == (base_url, username)]
+
+    def heaviest(self, base_url, username, limit=HEAVIEST_ITEMS_LIMIT):
+        """Éléments les plus coûteux consultés par l'utilisateur, par taille moyenne transférée sur le réseau"""
+        with self._lock:
+            entries = [dict(entry) for entry in self._owned(base_url, username)]
+        for entry in entries:
+            for field in ('wire_bytes', 'decoded_bytes', 'decode_seconds'):
+                entry[field] /= entry['requests']
+        entries.sort(key=lambda entry: (entry['wire_bytes'], entry['decoded_bytes']), reverse=True)
+        return entries[:limit]
+
+    def totals(self, base_url, username):
+        with self._lock:
+            entries = self._owned(base_url, username)
+            return {field: sum(entry[field] for entry in entries)
+                    for field in ('requests', 'wire_bytes', 'decoded_bytes', 'decode_seconds')}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+@st.cache_resource
+def get_payload_stats():
+    """Tailles des réponses par élément, partagées par toutes les sessions du processus"""
+    return PayloadStats()
+
+
+def preferred_accept_encoding(supported):
+    """En-tête Accept-Encoding limité aux encodages décodables, du plus au moins compact"""
+    supported = {encoding.strip() for encoding in supported.split(',')}
+    return ', '.join(encoding for encoding in HTTP_ENCODING_PREFERENCE if encoding in supported)
+
+
+def retry_delay(attempt, retry_after=None):
+    """Attente avant la reprise n° attempt: Retry-After du serveur, sinon backoff exponentiel à gigue totale"""
+    if retry_after:
+        try:
+            return min(float(retry_after), HTTP_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(HTTP_RETRY_MAX_DELAY, HTTP_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def response_validators(headers, endpoint=None):
+    """Validateurs HTTP (ETag, Last-Modified) d'une réponse, ou None si le serveur n'en fournit pas"""
+    etag = headers.get('ETag')
+    last_modified = headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return None
+    return {'endpoint': endpoint, 'etag': etag, 'last_modified': last_modified}
+
+
+def conditional_headers(validators):
+    """En-têtes d'une requête conditionnelle à partir des validateurs en cache"""
+    headers = {}
+    if validators and validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators and validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers or None
+
+
+def visualization_target(item):
+    """(identifiant, nom) de la visualisation ou du graphique d'un élément, None pour les autres types"""
+    viz = item.get('visualization') or item.get('chart')
+    if not viz or not viz.get('id'):
+        return None
+    return viz['id'], viz.get('name', 'Visualisation' if item.get('visualization') else 'Graphique')
+
+
+class DHIS2Transport:
+    """GET idempotents vers un serveur DHIS2: délais par endpoint, reprises avec gigue et disjoncteur
+
+    Sert le client synchrone (requests) et le client asynchrone (httpx); les erreurs réseau,
+    délais dépassés, corps tronqués et réponses 5xx/429 comptent comme des échecs pour le disjoncteur.
+    """
+
+    def __init__(self, base_url, session=None, max_retries=HTTP_MAX_RETRIES):
+        self.base_url = base_url
+        self.session = session
+        self.max_retries = max_retries
+        self.breaker = get_circuit_breaker(base_url)
+        self.metrics = get_transport_metrics()
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            self.metrics.record_rejected()
+            raise CircuitOpenError(f"Serveur {self.base_url} momentanément indisponible (disjoncteur ouvert)")
+
+    def _record(self, endpoint, started, status_code=None):
+        """Enregistre la tentative; retourne True si elle a échoué de façon transitoire"""
+        self.metrics.observe(endpoint, time.perf_counter() - started)
+        failed = status_code is None or status_code >= 500 or status_code in HTTP_RETRY_STATUSES
+        if failed:
+            self.metrics.record_failure()
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return failed and (status_code is None or status_code in HTTP_RETRY_STATUSES)
+
+    def get(self, url, params=None, endpoint='catalogue', stream=False, headers=None):
+        """GET synchrone; la dernière réponse est retournée, ou la dernière exception relevée"""
+        return self.fetch(url, params, endpoint, stream, headers)[0]
+
+    def fetch(self, url, params=None, endpoint='catalogue', stream=False, headers=None, read=None):
+        """GET synchrone dont le corps d'une réponse 200 est lu par read(réponse) dans la tentative
+
+        Une coupure ou un délai dépassé en cours de corps est repris comme une erreur de connexion, et la
+        latence mesurée va jusqu'à la fin de la lecture. Retourne (réponse, résultat de read ou None).
+        """
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            started = time.perf_counter()
+            body = None
+            try:
+                response = self.session.get(url, params=params, headers=headers,
+                                            timeout=HTTP_TIMEOUTS[endpoint], stream=stream)
+                if read is not None and response.status_code == 200:
+                    try:
+                        body = read(response)
+                    except BaseException:
+                        response.close()
+                        raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                self._record(endpoint, started)
+                if attempt == self.max_retries:
+                    raise
+                self.metrics.record_retry()
+                time.sleep(retry_delay(attempt))
+                continue
+            except Exception:
+                # Décodage, redirections...: échec non repris, la sonde est libérée
+                self._record(endpoint, started)
+                raise
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            if not self._record(endpoint, started, response.status_code) or attempt == self.max_retries:
+                return response, body
+            response.close()
+            self.metrics.record_retry()
+            time.sleep(retry_delay(attempt, response.headers.get('Retry-After')))
+
+    async def aget(self, http, url, params=None, endpoint='catalogue', stream=False, headers=None):
+        """Équivalent asynchrone de get() sur un httpx.AsyncClient"""
+        return (await self.afetch(http, url, params, endpoint, stream, headers))[0]
+
+    async def afetch(self, http, url, params=None, endpoint='catalogue', stream=False, headers=None, read=None):
+        """Équivalent asynchrone de fetch(); read est une coroutine appelée avec la réponse"""
+        connect_timeout, read_timeout = HTTP_TIMEOUTS[endpoint]
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            started = time.perf_counter()
+            body = None
+            try:
+                request = http.build_request('GET', url, params=params, headers=headers, timeout=timeout)
+                response = await http.send(request, stream=stream)
+                if read is not None and response.status_code == 200:
+                    try:
+                        body = await read(response)
+                    except BaseException:
+                        await response.aclose()
+                        raise
+            except httpx.TransportError:
+                self._record(endpoint, started)
+                if attempt == self.max_retries:
+                    raise
+                self.metrics.record_retry()
+                await asyncio.sleep(retry_delay(attempt))
+                continue
+            except Exception:
+                self._record(endpoint, started)
+                raise
+            except BaseException:
+                # Annulation de la tâche: pas un échec du serveur, mais la sonde doit être libérée
+                self.breaker.release_probe()
+                raise
+
+            if not self._record(endpoint, started, response.status_code) or attempt == self.max_retries:
+                return response, body
+            await response.aclose()
+            self.metrics.record_retry()
+            await asyncio.sleep(retry_delay(attempt, response.headers.get('Retry-After')))
+
 
 class DHIS2Client:
     def __init__(self, base_url, username, password):
@@ -258,17 +2026,41 @@ class DHIS2Client:
         self.password = password
         self.session = requests.Session()
         self.session.auth = (username, password)
+        self.session.headers['Accept-Encoding'] = preferred_accept_encoding(URLLIB3_ACCEPT_ENCODING)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4,
+                                                pool_maxsize=MAX_CONCURRENT_REQUESTS_PER_SERVER)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.server_slots = get_server_semaphore(self.base_url)
+        self.transport = DHIS2Transport(self.base_url, session=self.session)
         self.current_user_id = None
-        self.timeout = 30
         self.debug_mode = False
+        self.streaming_decode = True
+        self.listing_stats = {}
+        self.page_fanout = DASHBOARD_PAGE_FANOUT
+        self.cache = get_data_cache()
+        self.endpoints = get_endpoint_registry()
+        self.payloads = get_payload_stats()
+        # Limiteur de débit propre au thread courant (utilisé par le préchargement)
+        self._throttle = threading.local()
+
+    def _charge_bandwidth(self, wire_bytes):
+        """Compte les octets reçus dans le débit du préchargement (l'attente a lieu entre les requêtes)"""
+        limiter = getattr(self._throttle, 'limiter', None)
+        if limiter is not None:
+            limiter.record(wire_bytes)
+
+    def close(self):
+        """Ferme les connexions du pool"""
+        self.session.close()
 
     def test_connection(self):
         """Teste la connexion à l'API DHIS2"""
         try:
-            response = self.session.get(
+            response = self.transport.get(
                 f"{self.base_url}/api/me",
                 params={"fields": "id,name,email,userGroups"},
-                timeout=self.timeout
+                endpoint='auth'
             )
             if response.status_code == 200:
                 user_info = response.json()
@@ -279,75 +2071,135 @@ class DHIS2Client:
             st.error(f"Erreur de connexion: {str(e)}")
             return False, None
 
-    def get_all_dashboards_complete(self, search_query=None):
-        """Récupère TOUS les dashboards disponibles en une seule requête"""
-        try:
-            all_dashboards = []
-            page = 1
-            page_size = 200
-
-            while True:
-                params = {
-                    "fields": "*,user[id,name],dashboardItems[*]",
-                    "paging": "true",
-                    "page": page,
-                    "pageSize": page_size,
-                    "order": "name:asc"
-                }
-
-                if search_query and search_query.strip():
-                    params["filter"] = f"name:ilike:{search_query}"
-
-                response = self.session.get(
-                    f"{self.base_url}/api/dashboards",
-                    params=params,
-                    timeout=self.timeout
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    dashboards = data.get('dashboards', [])
-
-                    if not dashboards:
-                        break
-
-                    for dashboard in dashboards:
-                        dashboard_user = dashboard.get('user', {})
-                        dashboard_user_id = dashboard_user.get('id')
+    def get_all_dashboards_complete(self, search_query=None, lightweight=True, filters=None):
+        """Récupère TOUS les dashboards disponibles (champs des cartes seulement en mode allégé)"""
+        mode = 'incrémental' if filters else ('allégé' if lightweight else 'complet')
+        started = time.perf_counter()
 
-                        if dashboard_user_id == self.current_user_id:
-                            dashboard['is_owner'] = True
+        try:
+            params = {
+                "fields": DASHBOARD_LISTING_FIELDS if lightweight else DASHBOARD_FULL_FIELDS,
+                "paging": "true",
+                "pageSize": 200,
+                "order": "name:asc"
+            }
+
+            params["filter"] = list(filters or [])
+            if search_query and search_query.strip():
+                params["filter"].append(f"name:ilike:{search_query}")
+
+            # Page 1 d'abord pour connaître le nombre de pages
+            status_code, payload_bytes, data = self._fetch_dashboards_page(params, 1)
+            first_page_seconds = time.perf_counter() - started
+            if status_code != 200:
+                st.error(f"Erreur API: {status_code}")
+                return []
+
+            pages = {1: data}
+            page_count = data.get('pager', {}).get('pageCount', 1)
+
+            # Pages suivantes en parallèle
+            if page_count > 1 and data.get('dashboards'):
+                max_workers = max(1, min(self.page_fanout, page_count - 1))
+                with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dhis2-pages") as executor:
+                    futures = {
+                        executor.submit(self._fetch_dashboards_page, params, page): page
+                        for page in range(2, page_count + 1)
+                    }
+                    for future in as_completed(futures):
+                        status_code, page_bytes, page_data = future.result()
+                        payload_bytes += page_bytes
+                        if status_code == 200:
+                            pages[futures[future]] = page_data
                         else:
-                            dashboard['is_owner'] = False
-
-                    all_dashboards.extend(dashboards)
-
-                    pager = data.get('pager', {})
-                    if page >= pager.get('pageCount', 1):
-                        break
-
-                    page += 1
-                else:
-                    st.error(f"Erreur API: {response.status_code}")
-                    break
+                            st.error(f"Erreur API: {status_code}")
 
+            # Fusion dans l'ordre des pages (order=name:asc côté serveur)
+            all_dashboards = []
+            for page in sorted(pages):
+                dashboards = pages[page].get('dashboards', [])
+                self._tag_ownership(dashboards)
+                all_dashboards.extend(dashboards)
+
+            self.listing_stats[mode] = {
+                'bytes': payload_bytes,
+                'first_page_seconds': first_page_seconds,
+                'seconds': time.perf_counter() - started,
+                'dashboards': len(all_dashboards)
+            }
             return all_dashboards
 
         except Exception as e:
             st.error(f"Erreur lors de la récupération des dashboards: {str(e)}")
             return []
 
+    def get_dashboard_ids(self):
+        """Liste légère des identifiants de dashboards (détection des suppressions)"""
+        try:
+            with self.server_slots:
+                response = self.transport.get(
+                    f"{self.base_url}/api/dashboards",
+                    params={"fields": "id", "paging": "false"}
+                )
+            if response.status_code == 200:
+                return [d['id'] for d in response.json().get('dashboards', [])]
+            st.error(f"Erreur API: {response.status_code}")
+            return None
+        except Exception as e:
+            st.error(f"Erreur lors de la récupération des identifiants: {str(e)}")
+            return None
+
+    def sync_dashboards(self, catalogue, lightweight=True):
+        """Synchronise le catalogue: seuls les dashboards modifiés depuis la dernière synchro sont récupérés"""
+        if catalogue.is_empty() or not catalogue.last_updated:
+            catalogue.replace(self.get_all_dashboards_complete(lightweight=lightweight))
+            return catalogue.to_list()
+
+        changed = self.get_all_dashboards_complete(
+            lightweight=lightweight,
+            filters=[f"lastUpdated:gt:{catalogue.last_updated}"]
+        )
+        catalogue.merge(changed, self.get_dashboard_ids())
+        return catalogue.to_list()
+
+    def _fetch_dashboards_page(self, params, page):
+        """Récupère une page de la liste des dashboards: (statut, taille, JSON)"""
+        with self.server_slots:
+            response = self.transport.get(
+                f"{self.base_url}/api/dashboards",
+                params={**params, "page": page}
+            )
+        if response.status_code != 200:
+            return response.status_code, 0, None
+        return response.status_code, len(response.content), response.json()
+
+    def _tag_ownership(self, dashboards):
+        """Marque les dashboards appartenant à l'utilisateur connecté"""
+        for dashboard in dashboards:
+            dashboard_user = dashboard.get('user', {})
+            dashboard['is_owner'] = dashboard_user.get('id') == self.current_user_id
+
     def get_dashboard_details(self, dashboard_id):
-        """Récupère les détails d'un dashboard spécifique"""
+        """Récupère les détails d'un dashboard spécifique (requête conditionnelle si déjà en cache)"""
+        cache_key = self.cache.make_key(self.base_url, self.username, 'dashboard', dashboard_id)
+        stale = self.cache.get_stale(cache_key)
         try:
-            response = self.session.get(
+            response = self.transport.get(
                 f"{self.base_url}/api/dashboards/{dashboard_id}",
                 params={
                     "fields": "*,dashboardItems[*,visualization[id,name,type],map[id,name],text,chart[id,name,type]],user[id,name]"
                 },
-                timeout=self.timeout
+                headers=conditional_headers(stale[1]) if stale else None
             )
+            if response.status_code == 304 and stale:
+                self.cache.refresh(cache_key, response_validators(response.headers))
+                return json.loads(stale[0])
             if response.status_code == 200:
+                self._charge_bandwidth(self._wire_bytes(response, len(response.content)))
+                validators = response_validators(response.headers)
+                if validators:
+                    # Corps brut en cache: chaque appel obtient son propre dictionnaire
+                    self.cache.put(cache_key, response.content, validators=validators)
                 dashboard_data = response.json()
                 return dashboard_data
             return None
@@ -355,72 +2207,204 @@ class DHIS2Client:
             st.error(f"Erreur lors de la récupération du dashboard: {str(e)}")
             return None
 
-    def get_visualization_data(self, visualization_id, visualization_name="Visualisation"):
-        """Récupère les données d'une visualisation DHIS2"""
+    def get_visualization_data(self, visualization_id, visualization_name="Visualisation",
+                               visualization_type=None):
+        """Récupère les données d'une visualisation DHIS2 (avec cache)"""
+        cache_key = self.cache.make_key(self.base_url, self.username, 'visualization', visualization_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            data, info = cached
+            return data.copy(), info
+
+        # Entrée expirée avec validateurs: requête conditionnelle avant tout téléchargement complet
+        revalidated = self._revalidate_visualization(cache_key, visualization_id, visualization_name)
+        if revalidated is not None:
+            result = revalidated[1]
+        else:
+            result = self._fetch_visualization_data(cache_key, visualization_id, visualization_name,
+                                                    visualization_type)
+        if result is not None:
+            return result[0].copy(), result[1]
+
+        return self._generate_analysis_ready_data(visualization_name)
+
+    def _revalidate_visualization(self, cache_key, visualization_id, visualization_name):
+        """Revalide une entrée en cache: (issue, données) ou None si elle n'a pas de validateurs"""
+        stale = self.cache.get_stale(cache_key)
+        if stale is None or not stale[1]:
+            return None
+        value, validators = stale
         try:
-            viz_response = self.session.get(
-                f"{self.base_url}/api/visualizations/{visualization_id}/data",
-                params={
-                    "outputType": "EVENT",
-                    "skipMeta": "false"
-                },
-                timeout=self.timeout
-            )
+            status_code, viz_data, new_validators = self._request_visualization_endpoint(
+                visualization_id, validators['endpoint'], validators, visualization_name)
+        except (CircuitOpenError, requests.exceptions.RequestException):
+            # Serveur injoignable: les données en cache valent mieux que des données de repli
+            return 'injoignable', value
+        return self._apply_revalidation(cache_key, value, visualization_name, status_code, viz_data, new_validators)
+
+    def _apply_revalidation(self, cache_key, value, visualization_name, status_code, viz_data, validators):
+        """Met à jour le cache selon la réponse conditionnelle (304 ou nouveau corps)"""
+        if status_code == 304:
+            self.cache.refresh(cache_key, validators)
+            return 'inchangé', value
+        if viz_data is not None:
+            result = self._parse_visualization_data(viz_data, visualization_name)
+            self.cache.put(cache_key, result, validators=validators)
+            return 'modifié', result
+        return None
+
+    def revalidate_items(self, items, max_workers=None):
+        """Vérifie en une seule vague la fraîcheur des données en cache des éléments; retourne les compteurs"""
+        targets = [target for target in map(visualization_target, items) if target]
+        if not targets:
+            return {}
+
+        max_workers = max(1, min(max_workers or MAX_CONCURRENT_REQUESTS_PER_SERVER, len(targets)))
+        ctx = get_script_run_ctx()
+
+        def revalidate(target):
+            if ctx is not None:
+                add_script_run_ctx(threading.current_thread(), ctx)
+            cache_key = self.cache.make_key(self.base_url, self.username, 'visualization', target[0])
+            with self.server_slots:
+                outcome = self._revalidate_visualization(cache_key, *target)
+            return outcome[0] if outcome else 'sans validateur'
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dhis2-revalidate") as executor:
+            return dict(Counter(executor.map(revalidate, targets)))
+
+    def _fetch_visualization_data(self, cache_key, visualization_id, visualization_name, visualization_type=None):
+        """Interroge l'API DHIS2 et met le résultat en cache; retourne None si aucune donnée réelle n'a été obtenue"""
+        try:
+            # Commencer par l'endpoint qui a déjà fonctionné pour ce type sur ce serveur
+            preferred = self.endpoints.get(self.base_url, visualization_type)
+            if preferred == EndpointRegistry.DATA_JSON:
+                endpoints = [EndpointRegistry.DATA_JSON, EndpointRegistry.EVENT]
+            else:
+                endpoints = [EndpointRegistry.EVENT, EndpointRegistry.DATA_JSON]
 
-            if viz_response.status_code == 200:
-                try:
-                    viz_data = viz_response.json()
-                    return self._parse_visualization_data(viz_data, visualization_name)
-                except json.JSONDecodeError:
-                    pass
+            for attempt, endpoint in enumerate(endpoints):
+                _, viz_data, validators = self._request_visualization_endpoint(
+                    visualization_id, endpoint, visualization_name=visualization_name)
+                if viz_data is None:
+                    continue
 
-            json_response = self.session.get(
-                f"{self.base_url}/api/visualizations/{visualization_id}/data.json",
-                params={
-                    "skipMeta": "false",
-                    "skipData": "false",
-                    "paging": "false"
-                },
-                timeout=self.timeout
-            )
+                self.endpoints.record(self.base_url, visualization_type, endpoint)
+                if attempt > 0:
+                    self.endpoints.record_fallback()
+                elif endpoint == EndpointRegistry.DATA_JSON:
+                    self.endpoints.record_avoided()
 
-            if json_response.status_code == 200:
-                try:
-                    json_data = json_response.json()
-                    return self._parse_visualization_data(json_data, visualization_name)
-                except json.JSONDecodeError:
-                    pass
+                result = self._parse_visualization_data(viz_data, visualization_name)
+                self.cache.put(cache_key, result, validators=validators)
+                return result
 
-            return self._generate_analysis_ready_data(visualization_name)
+            return None
 
+        except CircuitOpenError:
+            # Serveur saturé: repli immédiat, l'état du disjoncteur est affiché dans la barre latérale
+            return None
         except Exception as e:
             st.error(f"Erreur lors de la récupération des données: {str(e)}")
-            return self._generate_analysis_ready_data(visualization_name)
+            return None
+
+    def _request_visualization_endpoint(self, visualization_id, endpoint, validators=None, visualization_name=None):
+        """Appelle un endpoint de données: (statut, JSON décodé ou None, validateurs de la réponse)"""
+        if endpoint == EndpointRegistry.EVENT:
+            url = f"{self.base_url}/api/visualizations/{visualization_id}/data"
+            params = {
+                "outputType": "EVENT",
+                "skipMeta": "false"
+            }
+        else:
+            url = f"{self.base_url}/api/visualizations/{visualization_id}/data.json"
+            params = {
+                "skipMeta": "false",
+                "skipData": "false",
+                "paging": "false"
+            }
+
+        # Le corps est lu dans la tentative du transport: une coupure en cours de lecture est reprise
+        response, body = self.transport.fetch(url, params=params, endpoint='data', stream=self.streaming_decode,
+                                              headers=conditional_headers(validators),
+                                              read=self._read_visualization_body)
+        new_validators = response_validators(response.headers, endpoint)
+
+        try:
+            if body is None:
+                return response.status_code, None, new_validators
+            viz_data, decoded_bytes, decode_seconds = body
+            wire_bytes = self._wire_bytes(response, decoded_bytes)
+            self._charge_bandwidth(wire_bytes)
+            self.payloads.record(self.base_url, self.username, visualization_id, visualization_name,
+                                 wire_bytes, decoded_bytes, decode_seconds, response.headers.get('Content-Encoding'))
+            return 200, viz_data, new_validators
+        finally:
+            response.close()
+
+    def _read_visualization_body(self, response):
+        """Lit et décode le corps d'une réponse de données: (JSON, octets, durée du décodage) ou None s'il est invalide"""
+        try:
+            if self.streaming_decode:
+                return self._decode_streaming(response)
+            decoded_bytes = len(response.content)
+            started = time.perf_counter()
+            viz_data = response.json()
+            return viz_data, decoded_bytes, time.perf_counter() - started
+        except json.JSONDecodeError:
+            return None
+
+    def _decode_streaming(self, response):
+        """Décode la réponse au fil de l'eau, les lignes allant directement dans des buffers colonne
+
+        Retourne (JSON, octets décompressés, durée du décodage JSON).
+        """
+        decoder = StreamingAnalyticsDecoder()
+        decoded_bytes = 0
+        decode_seconds = 0.0
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            started = time.perf_counter()
+            decoder.feed(chunk)
+            decode_seconds += time.perf_counter() - started
+            decoded_bytes += len(chunk)
+
+        started = time.perf_counter()
+        data = decoder.close()
+        return data, decoded_bytes, decode_seconds + time.perf_counter() - started
+
+    @staticmethod
+    def _wire_bytes(response, decoded_bytes):
+        """Octets lus sur le réseau (avant décompression), à défaut la taille décompressée"""
+        try:
+            return response.raw.tell() or decoded_bytes
+        except AttributeError:
+            return decoded_bytes
 
     def _parse_visualization_data(self, viz_data, viz_name):
-        """Parse les données de visualisation"""
+        """Parse les données de visualisation; l'empreinte du DataFrame est calculée une fois, avant la mise en cache"""
+        df, info = self._frame_from_visualization_data(viz_data, viz_name)
+        frame_fingerprint(df)
+        return df, info
+
+    def _frame_from_visualization_data(self, viz_data, viz_name):
+        """Convertit la réponse d'une visualisation en DataFrame"""
         try:
-            if 'rows' in viz_data:
+            if 'frame' in viz_data:
+                # Réponse déjà décodée en colonnes par StreamingAnalyticsDecoder
+                df = viz_data['frame']
+                if df.empty:
+                    return pd.DataFrame(), "Aucune donnée disponible"
+                return df, f"Données récupérées ({len(df)} lignes)"
+
+            elif 'rows' in viz_data:
                 rows = viz_data['rows']
                 headers = viz_data.get('headers', [])
 
                 if not rows:
                     return pd.DataFrame(), "Aucune donnée disponible"
 
-                column_names = []
-                for header in headers:
-                    name = header.get('name', '')
-                    if not name and 'column' in header:
-                        name = header['column']
-                    column_names.append(name or f"Colonne_{len(column_names)}")
-
-                df = pd.DataFrame(rows, columns=column_names[:len(rows[0])])
-
-                for col in df.columns:
-                    try:
-                        df[col] = pd.to_numeric(df[col], errors='ignore')
-                    except:
-                        pass
+                meta_items = viz_data.get('metaData', {}).get('items', {})
+                df = build_analytics_frame(headers, rows, meta_items)
 
                 return df, f"Données récupérées ({len(df)} lignes)"
 
@@ -436,6 +2420,12 @@ class DHIS2Client:
             return pd.DataFrame(), f"Erreur de parsing: {str(e)}"
 
     def _generate_analysis_ready_data(self, viz_name):
+        """Génère des données de repli, marquées comme synthétiques (jamais enregistrées hors ligne)"""
+        data, info = self._generate_named_data(viz_name)
+        data.attrs['synthetic'] = True
+        return data, info
+
+    def _generate_named_data(self, viz_name):
         """Génère des données prêtes pour l'analyse basées sur le nom"""
         try:
             viz_name_lower = viz_name.lower()
@@ -616,63 +2606,1059 @@ class DHIS2Client:
                 item_name = viz.get('name', 'Visualisation')
                 item_type = viz.get('type', 'Visualisation')
 
-                if item_id:
-                    data, info = self.get_visualization_data(item_id, item_name)
-                    info = f"{info} | Type: {item_type}"
-                    return data, info, item_type
+                if item_id:
+                    data, info = self.get_visualization_data(item_id, item_name, item_type)
+                    info = f"{info} | Type: {item_type}"
+                    return data, info, item_type
+
+            elif 'chart' in item and item['chart']:
+                chart = item['chart']
+                item_id = chart.get('id')
+                item_name = chart.get('name', 'Graphique')
+                item_type = "Chart"
+
+                if item_id:
+                    data, info = self.get_visualization_data(item_id, item_name, item_type)
+                    return data, info, item_type
+
+            elif 'map' in item and item['map']:
+                map_data = item['map']
+                item_name = map_data.get('name', 'Carte')
+                item_type = "Map"
+
+                data = pd.DataFrame({
+                    'Région': ['Dakar', 'Thiès', 'Diourbel', 'Kaolack', 'Saint-Louis',
+                               'Louga', 'Fatick', 'Kaffrine', 'Matam', 'Kédougou'],
+                    'Latitude': [14.7167, 14.7833, 14.8833, 14.1500, 16.0333,
+                                 15.6500, 14.3333, 14.1167, 15.6667, 12.5500],
+                    'Longitude': [-17.4672, -16.9167, -16.2333, -16.0833, -16.5000,
+                                  -16.2333, -16.4333, -15.7000, -13.2500, -12.1833],
+                    'Valeur': np.random.randint(100, 1000, 10),
+                    'Population': np.random.randint(50000, 500000, 10)
+                })
+                data.attrs['synthetic'] = True
+                info = f"Données cartographiques pour {item_name}"
+                return data, info, item_type
+
+            elif 'text' in item:
+                item_name = f"Texte"
+                item_type = "Text"
+                text_content = item.get('text', 'Aucun contenu')
+                data = pd.DataFrame({
+                    'Type': ['Texte'],
+                    'Contenu': [text_content[:500] + "..." if len(text_content) > 500 else text_content]
+                })
+                return data, f"Élément texte: {item_name}", item_type
+
+            data, info = self._generate_analysis_ready_data(item_name)
+            return data, info, "Données génériques"
+
+        except Exception as e:
+            error_df = pd.DataFrame({
+                'Erreur': [str(e)],
+                'Élément': [item_name]
+            })
+            return error_df, f"Erreur: {str(e)}", "Erreur"
+
+    def get_items_data(self, items, max_workers=None, on_item_done=None):
+        """Récupère en parallèle les données de plusieurs éléments, dans l'ordre du dashboard"""
+        items = list(items)
+        if not items:
+            return []
+
+        max_workers = max(1, min(max_workers or MAX_CONCURRENT_REQUESTS_PER_SERVER, len(items)))
+        results = [None] * len(items)
+        ctx = get_script_run_ctx()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dhis2-fetch") as executor:
+            futures = {executor.submit(self._fetch_item_in_session, item, ctx): idx
+                       for idx, item in enumerate(items)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                idx = futures[future]
+                results[idx] = future.result()
+                if on_item_done:
+                    on_item_done(idx, done, len(items))
+
+        return results
+
+    def iter_items_data(self, items, max_workers=None):
+        """Récupère en parallèle les données des éléments et les restitue dans l'ordre dès qu'elles arrivent"""
+        items = list(items)
+        if not items:
+            return
+
+        max_workers = max(1, min(max_workers or MAX_CONCURRENT_REQUESTS_PER_SERVER, len(items)))
+        ctx = get_script_run_ctx()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dhis2-fetch") as executor:
+            futures = [executor.submit(self._fetch_item_in_session, item, ctx) for item in items]
+            for idx, future in enumerate(futures):
+                yield idx, future.result()
+                futures[idx] = None
+
+    def _fetch_item_in_session(self, item, ctx):
+        # Permet aux messages st.* émis depuis le thread d'atteindre la session
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        with self.server_slots:
+            return self.get_item_data(item)
+
+
+# Limiteur de débit de la tâche asynchrone courante (transmis par l'adaptateur synchrone)
+_async_bandwidth_limiter = contextvars.ContextVar('async_bandwidth_limiter', default=None)
+# Vrai si l'appelant synchrone détient déjà un jeton du serveur (préchargement)
+_server_slot_held = contextvars.ContextVar('server_slot_held', default=False)
+# Messages d'erreur de la tâche asynchrone courante, affichés ensuite sur le thread de la session appelante
+_async_error_messages = contextvars.ContextVar('async_error_messages', default=None)
+
+
+def report_async_error(message):
+    """Met de côté une erreur d'une coroutine; la boucle partagée n'appelle jamais Streamlit elle-même"""
+    messages = _async_error_messages.get()
+    if messages is None:
+        st.error(message)
+    else:
+        messages.append(message)
+
+
+def timed_call(function, *args):
+    """Exécute function(*args) et retourne sa durée en secondes"""
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+@st.cache_resource
+def get_async_loop():
+    """Boucle d'événements unique du processus, exécutée sur un thread démon, pour tous les clients asynchrones"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="dhis2-async", daemon=True).start()
+    return loop
+
+
+class AsyncDHIS2Client:
+    """Client DHIS2 asynchrone (httpx): pool de connexions, HTTP/2 si disponible, sémaphore de concurrence
+
+    Même interface que DHIS2Client sous forme de coroutines; le décodage des réponses et les
+    données de repli sont ceux du client synchrone.
+    """
+
+    _tag_ownership = DHIS2Client._tag_ownership
+    _parse_visualization_data = DHIS2Client._parse_visualization_data
+    _frame_from_visualization_data = DHIS2Client._frame_from_visualization_data
+    _apply_revalidation = DHIS2Client._apply_revalidation
+    _generate_analysis_ready_data = DHIS2Client._generate_analysis_ready_data
+    _generate_named_data = DHIS2Client._generate_named_data
+    _generate_ecv_dsdm_data = DHIS2Client._generate_ecv_dsdm_data
+    _generate_multi_dimensional_data = DHIS2Client._generate_multi_dimensional_data
+    _generate_vaccination_data = DHIS2Client._generate_vaccination_data
+    _generate_malaria_data = DHIS2Client._generate_malaria_data
+
+    def __init__(self, base_url, username, password, max_concurrency=MAX_CONCURRENT_REQUESTS_PER_SERVER):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.max_concurrency = max_concurrency
+        self.http2 = HTTP2_AVAILABLE
+        self.transport = DHIS2Transport(self.base_url)
+        self.server_slots = get_server_semaphore(self.base_url)
+        self.current_user_id = None
+        self.listing_stats = {}
+        self.cache = get_data_cache()
+        self.endpoints = get_endpoint_registry()
+        self.payloads = get_payload_stats()
+        self._http = None
+        self._slots = None
+
+    @property
+    def http(self):
+        # Créé à la première utilisation, dans la boucle d'événements qui l'exécutera
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                auth=(self.username, self.password),
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency)
+            )
+            # httpx annonce les décodeurs installés; on les ordonne par préférence
+            self._http.headers['Accept-Encoding'] = preferred_accept_encoding(self._http.headers['Accept-Encoding'])
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def aclose(self):
+        """Ferme les connexions du pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @contextlib.asynccontextmanager
+    async def _server_slot(self):
+        """Jeton du budget de requêtes partagé avec les autres clients du serveur, attendu sans bloquer la boucle"""
+        if _server_slot_held.get():
+            yield
+            return
+        # Le sémaphore du client ordonne ses propres requêtes; seules celles admises interrogent le budget partagé
+        async with self._slots:
+            delay = SERVER_SLOT_POLL_INTERVAL
+            while not self.server_slots.acquire(blocking=False):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, SERVER_SLOT_POLL_MAX)
+            try:
+                yield
+            finally:
+                self.server_slots.release()
+
+    def _charge_bandwidth(self, wire_bytes):
+        """Compte les octets reçus dans le débit du préchargement (l'attente a lieu entre les requêtes)"""
+        limiter = _async_bandwidth_limiter.get()
+        if limiter is not None:
+            limiter.record(wire_bytes)
+
+    async def _get(self, url, params=None, endpoint='catalogue', headers=None):
+        """GET borné par le budget de requêtes du serveur"""
+        http = self.http
+        async with self._server_slot():
+            response = await self.transport.aget(http, url, params, endpoint, headers=headers)
+        self._charge_bandwidth(response.num_bytes_downloaded)
+        return response
+
+    async def test_connection(self):
+        """Teste la connexion à l'API DHIS2"""
+        try:
+            response = await self._get(f"{self.base_url}/api/me", {"fields": "id,name,email,userGroups"}, 'auth')
+            if response.status_code == 200:
+                user_info = response.json()
+                self.current_user_id = user_info.get('id')
+                return True, user_info
+            return False, None
+        except Exception as e:
+            report_async_error(f"Erreur de connexion: {str(e)}")
+            return False, None
+
+    async def get_all_dashboards_complete(self, search_query=None, lightweight=True, filters=None):
+        """Récupère TOUS les dashboards disponibles (champs des cartes seulement en mode allégé)"""
+        mode = 'incrémental' if filters else ('allégé' if lightweight else 'complet')
+        started = time.perf_counter()
+
+        try:
+            params = {
+                "fields": DASHBOARD_LISTING_FIELDS if lightweight else DASHBOARD_FULL_FIELDS,
+                "paging": "true",
+                "pageSize": 200,
+                "order": "name:asc"
+            }
+
+            params["filter"] = list(filters or [])
+            if search_query and search_query.strip():
+                params["filter"].append(f"name:ilike:{search_query}")
+
+            # Page 1 d'abord pour connaître le nombre de pages
+            status_code, payload_bytes, data = await self._fetch_dashboards_page(params, 1)
+            first_page_seconds = time.perf_counter() - started
+            if status_code != 200:
+                report_async_error(f"Erreur API: {status_code}")
+                return []
+
+            pages = {1: data}
+            page_count = data.get('pager', {}).get('pageCount', 1)
+
+            # Pages suivantes toutes lancées à la fois: le sémaphore borne la concurrence
+            if page_count > 1 and data.get('dashboards'):
+                results = await asyncio.gather(*(self._fetch_dashboards_page(params, page)
+                                                 for page in range(2, page_count + 1)))
+                for page, (status_code, page_bytes, page_data) in enumerate(results, start=2):
+                    payload_bytes += page_bytes
+                    if status_code == 200:
+                        pages[page] = page_data
+                    else:
+                        report_async_error(f"Erreur API: {status_code}")
+
+            all_dashboards = []
+            for page in sorted(pages):
+                dashboards = pages[page].get('dashboards', [])
+                self._tag_ownership(dashboards)
+                all_dashboards.extend(dashboards)
+
+            self.listing_stats[mode] = {
+                'bytes': payload_bytes,
+                'first_page_seconds': first_page_seconds,
+                'seconds': time.perf_counter() - started,
+                'dashboards': len(all_dashboards)
+            }
+            return all_dashboards
+
+        except Exception as e:
+            report_async_error(f"Erreur lors de la récupération des dashboards: {str(e)}")
+            return []
+
+    async def _fetch_dashboards_page(self, params, page):
+        """Récupère une page de la liste des dashboards: (statut, taille, JSON)"""
+        response = await self._get(f"{self.base_url}/api/dashboards", {**params, "page": page})
+        if response.status_code != 200:
+            return response.status_code, 0, None
+        return response.status_code, len(response.content), response.json()
+
+    async def get_dashboard_ids(self):
+        """Liste légère des identifiants de dashboards (détection des suppressions)"""
+        try:
+            response = await self._get(f"{self.base_url}/api/dashboards", {"fields": "id", "paging": "false"})
+            if response.status_code == 200:
+                return [d['id'] for d in response.json().get('dashboards', [])]
+            report_async_error(f"Erreur API: {response.status_code}")
+            return None
+        except Exception as e:
+            report_async_error(f"Erreur lors de la récupération des identifiants: {str(e)}")
+            return None
+
+    async def sync_dashboards(self, catalogue, lightweight=True):
+        """Synchronise le catalogue: seuls les dashboards modifiés depuis la dernière synchro sont récupérés"""
+        if catalogue.is_empty() or not catalogue.last_updated:
+            catalogue.replace(await self.get_all_dashboards_complete(lightweight=lightweight))
+            return catalogue.to_list()
+
+        changed, dashboard_ids = await asyncio.gather(
+            self.get_all_dashboards_complete(lightweight=lightweight,
+                                             filters=[f"lastUpdated:gt:{catalogue.last_updated}"]),
+            self.get_dashboard_ids()
+        )
+        catalogue.merge(changed, dashboard_ids)
+        return catalogue.to_list()
+
+    async def get_dashboard_details(self, dashboard_id):
+        """Récupère les détails d'un dashboard spécifique (requête conditionnelle si déjà en cache)"""
+        cache_key = self.cache.make_key(self.base_url, self.username, 'dashboard', dashboard_id)
+        stale = self.cache.get_stale(cache_key)
+        try:
+            response = await self._get(
+                f"{self.base_url}/api/dashboards/{dashboard_id}",
+                {"fields": "*,dashboardItems[*,visualization[id,name,type],map[id,name],text,chart[id,name,type]],user[id,name]"},
+                headers=conditional_headers(stale[1]) if stale else None
+            )
+            if response.status_code == 304 and stale:
+                self.cache.refresh(cache_key, response_validators(response.headers))
+                return json.loads(stale[0])
+            if response.status_code == 200:
+                validators = response_validators(response.headers)
+                if validators:
+                    self.cache.put(cache_key, response.content, validators=validators)
+                return response.json()
+            return None
+        except Exception as e:
+            report_async_error(f"Erreur lors de la récupération du dashboard: {str(e)}")
+            return None
+
+    async def get_visualization_data(self, visualization_id, visualization_name="Visualisation",
+                                     visualization_type=None):
+        """Récupère les données d'une visualisation DHIS2 (avec cache)"""
+        cache_key = self.cache.make_key(self.base_url, self.username, 'visualization', visualization_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            data, info = cached
+            return data.copy(), info
+
+        revalidated = await self._revalidate_visualization(cache_key, visualization_id, visualization_name)
+        if revalidated is not None:
+            result = revalidated[1]
+        else:
+            result = await self._fetch_visualization_data(cache_key, visualization_id, visualization_name,
+                                                          visualization_type)
+        if result is not None:
+            return result[0].copy(), result[1]
+
+        return self._generate_analysis_ready_data(visualization_name)
+
+    async def _revalidate_visualization(self, cache_key, visualization_id, visualization_name):
+        """Revalide une entrée en cache: (issue, données) ou None si elle n'a pas de validateurs"""
+        stale = self.cache.get_stale(cache_key)
+        if stale is None or not stale[1]:
+            return None
+        value, validators = stale
+        try:
+            status_code, viz_data, new_validators = await self._request_visualization_endpoint(
+                visualization_id, validators['endpoint'], validators, visualization_name)
+        except (CircuitOpenError, httpx.HTTPError):
+            return 'injoignable', value
+        # Un corps modifié est reconverti en DataFrame: hors de la boucle partagée
+        return await asyncio.to_thread(self._apply_revalidation, cache_key, value, visualization_name,
+                                       status_code, viz_data, new_validators)
+
+    async def revalidate_items(self, items):
+        """Vérifie en une seule vague la fraîcheur des données en cache des éléments; retourne les compteurs"""
+        async def revalidate(target):
+            cache_key = self.cache.make_key(self.base_url, self.username, 'visualization', target[0])
+            outcome = await self._revalidate_visualization(cache_key, *target)
+            return outcome[0] if outcome else 'sans validateur'
+
+        targets = [target for target in map(visualization_target, items) if target]
+        return dict(Counter(await asyncio.gather(*(revalidate(target) for target in targets))))
+
+    async def _fetch_visualization_data(self, cache_key, visualization_id, visualization_name,
+                                        visualization_type=None):
+        """Interroge l'API DHIS2 et met le résultat en cache; retourne None si aucune donnée réelle n'a été obtenue"""
+        try:
+            preferred = self.endpoints.get(self.base_url, visualization_type)
+            if preferred == EndpointRegistry.DATA_JSON:
+                endpoints = [EndpointRegistry.DATA_JSON, EndpointRegistry.EVENT]
+            else:
+                endpoints = [EndpointRegistry.EVENT, EndpointRegistry.DATA_JSON]
+
+            for attempt, endpoint in enumerate(endpoints):
+                _, viz_data, validators = await self._request_visualization_endpoint(
+                    visualization_id, endpoint, visualization_name=visualization_name)
+                if viz_data is None:
+                    continue
+
+                self.endpoints.record(self.base_url, visualization_type, endpoint)
+                if attempt > 0:
+                    self.endpoints.record_fallback()
+                elif endpoint == EndpointRegistry.DATA_JSON:
+                    self.endpoints.record_avoided()
+
+                # Conversion en DataFrame hors de la boucle partagée par toutes les sessions
+                result = await asyncio.to_thread(self._parse_visualization_data, viz_data, visualization_name)
+                self.cache.put(cache_key, result, validators=validators)
+                return result
+
+            return None
+
+        except CircuitOpenError:
+            # Serveur saturé: repli immédiat, l'état du disjoncteur est affiché dans la barre latérale
+            return None
+        except Exception as e:
+            report_async_error(f"Erreur lors de la récupération des données: {str(e)}")
+            return None
+
+    async def _request_visualization_endpoint(self, visualization_id, endpoint, validators=None,
+                                              visualization_name=None):
+        """Appelle un endpoint de données, décodé au fil de l'eau: (statut, JSON ou None, validateurs)"""
+        if endpoint == EndpointRegistry.EVENT:
+            url = f"{self.base_url}/api/visualizations/{visualization_id}/data"
+            params = {"outputType": "EVENT", "skipMeta": "false"}
+        else:
+            url = f"{self.base_url}/api/visualizations/{visualization_id}/data.json"
+            params = {"skipMeta": "false", "skipData": "false", "paging": "false"}
+
+        http = self.http
+        async with self._server_slot():
+            # Le corps est lu dans la tentative du transport: une coupure en cours de lecture est reprise
+            response, body = await self.transport.afetch(http, url, params, endpoint='data', stream=True,
+                                                         headers=conditional_headers(validators),
+                                                         read=self._read_visualization_body)
+            await response.aclose()
+        self._charge_bandwidth(response.num_bytes_downloaded)
+        new_validators = response_validators(response.headers, endpoint)
+        if body is None:
+            return response.status_code, None, new_validators
+        decoder, decoded_bytes, decode_seconds = body
+
+        try:
+            started = time.perf_counter()
+            viz_data = await asyncio.to_thread(decoder.close)
+        except json.JSONDecodeError:
+            return 200, None, new_validators
+        decode_seconds += time.perf_counter() - started
+
+        self.payloads.record(self.base_url, self.username, visualization_id, visualization_name,
+                             response.num_bytes_downloaded, decoded_bytes, decode_seconds,
+                             response.headers.get('Content-Encoding'))
+        return 200, viz_data, new_validators
+
+    async def _read_visualization_body(self, response):
+        """Lit le corps d'une réponse de données dans un décodeur neuf: (décodeur, octets, durée) ou None s'il est invalide"""
+        decoder = StreamingAnalyticsDecoder()
+        decoded_bytes = 0
+        decode_seconds = 0.0
+        try:
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                # Décodage (CPU) sur un thread: la boucle continue de servir les autres sessions
+                decode_seconds += await asyncio.to_thread(timed_call, decoder.feed, chunk)
+                decoded_bytes += len(chunk)
+        except json.JSONDecodeError:
+            return None
+        return decoder, decoded_bytes, decode_seconds
+
+    async def get_item_data(self, item):
+        """Récupère les données selon le type d'élément"""
+        viz = item.get('visualization') or item.get('chart')
+        if not viz or not viz.get('id'):
+            # Cartes, textes et données génériques: aucun appel réseau
+            return DHIS2Client.get_item_data(self, item)
+
+        is_chart = not item.get('visualization')
+        item_name = viz.get('name', 'Graphique' if is_chart else 'Visualisation')
+        item_type = "Chart" if is_chart else viz.get('type', 'Visualisation')
+        try:
+            data, info = await self.get_visualization_data(viz['id'], item_name, item_type)
+            if not is_chart:
+                info = f"{info} | Type: {item_type}"
+            return data, info, item_type
+        except Exception as e:
+            error_df = pd.DataFrame({
+                'Erreur': [str(e)],
+                'Élément': [item_name]
+            })
+            return error_df, f"Erreur: {str(e)}", "Erreur"
+
+    async def get_items_data(self, items, on_item_done=None):
+        """Récupère toutes les données des éléments en une seule vague, dans l'ordre du dashboard"""
+        items = list(items)
+        results = [None] * len(items)
+
+        async def fetch(idx, item):
+            return idx, await self.get_item_data(item)
+
+        pending = [fetch(idx, item) for idx, item in enumerate(items)]
+        for done, next_result in enumerate(asyncio.as_completed(pending), start=1):
+            idx, results[idx] = await next_result
+            if on_item_done:
+                on_item_done(idx, done, len(items))
+
+        return results
+
+
+class SyncDHIS2Client:
+    """Adaptateur synchrone d'AsyncDHIS2Client, utilisable partout où DHIS2Client l'est
+
+    Les coroutines s'exécutent sur la boucle d'événements partagée du processus : l'appelant
+    reste bloquant, mais toutes les requêtes partagent le pool (une connexion multiplexée en HTTP/2).
+    """
+
+    def __init__(self, async_client):
+        self.async_client = async_client
+        self._throttle = threading.local()
+        self._loop = get_async_loop()
+
+    def __getattr__(self, name):
+        # base_url, username, cache, listing_stats... sont ceux du client asynchrone
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.async_client, name)
+
+    def _submit(self, coroutine_function, *args):
+        """Planifie une coroutine sur la boucle avec le limiteur de l'appelant: (future, erreurs à afficher)
+
+        Le thread de la boucle est partagé par toutes les sessions: il ne reçoit aucun contexte
+        Streamlit, les erreurs sont collectées puis affichées par l'appelant (voir _result).
+        """
+        limiter = getattr(self._throttle, 'limiter', None)
+        holds_slot = getattr(self._throttle, 'holds_server_slot', False)
+        messages = []
+
+        async def run():
+            _async_bandwidth_limiter.set(limiter)
+            _server_slot_held.set(holds_slot)
+            _async_error_messages.set(messages)
+            return await coroutine_function(*args)
+
+        return asyncio.run_coroutine_threadsafe(run(), self._loop), messages
+
+    @staticmethod
+    def _result(submitted):
+        """Attend une coroutine planifiée puis affiche ses erreurs sur le thread (et la session) de l'appelant"""
+        future, messages = submitted
+        try:
+            return future.result()
+        finally:
+            for message in messages:
+                st.error(message)
+
+    def _run(self, coroutine_function, *args):
+        return self._result(self._submit(coroutine_function, *args))
+
+    def close(self):
+        """Ferme les connexions du client (la boucle partagée continue de servir les autres sessions)"""
+        self._run(self.async_client.aclose)
+
+    def test_connection(self):
+        return self._run(self.async_client.test_connection)
+
+    def get_all_dashboards_complete(self, search_query=None, lightweight=True, filters=None):
+        return self._run(self.async_client.get_all_dashboards_complete, search_query, lightweight, filters)
+
+    def get_dashboard_ids(self):
+        return self._run(self.async_client.get_dashboard_ids)
+
+    def sync_dashboards(self, catalogue, lightweight=True):
+        return self._run(self.async_client.sync_dashboards, catalogue, lightweight)
+
+    def get_dashboard_details(self, dashboard_id):
+        return self._run(self.async_client.get_dashboard_details, dashboard_id)
+
+    def get_visualization_data(self, visualization_id, visualization_name="Visualisation",
+                               visualization_type=None):
+        return self._run(self.async_client.get_visualization_data,
+                         visualization_id, visualization_name, visualization_type)
+
+    def get_item_data(self, item):
+        return self._run(self.async_client.get_item_data, item)
+
+    def revalidate_items(self, items, max_workers=None):
+        return self._run(self.async_client.revalidate_items, items)
+
+    def get_items_data(self, items, max_workers=None, on_item_done=None):
+        # max_workers est ignoré: le budget de requêtes du serveur borne la concurrence
+        return self._run(self.async_client.get_items_data, items, on_item_done)
+
+    def iter_items_data(self, items, max_workers=None):
+        submitted = [self._submit(self.async_client.get_item_data, item) for item in items]
+        for idx, pending in enumerate(submitted):
+            yield idx, self._result(pending)
+            submitted[idx] = None
 
-            elif 'chart' in item and item['chart']:
-                chart = item['chart']
-                item_id = chart.get('id')
-                item_name = chart.get('name', 'Graphique')
-                item_type = "Chart"
 
-                if item_id:
-                    data, info = self.get_visualization_data(item_id, item_name)
-                    return data, info, item_type
+def dataframe_fingerprint(df):
+    """Empreinte du contenu complet d'un DataFrame (structure, index et toutes les valeurs)"""
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, [str(c) for c in df.columns], [str(t) for t in df.dtypes])).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except TypeError:
+        # Cellules non hachables (listes, dictionnaires): hachage de leur représentation texte
+        digest.update(pd.util.hash_pandas_object(df.astype(str), index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df):
+    """Empreinte d'un DataFrame tel que récupéré, calculée une seule fois puis conservée dans df.attrs"""
+    # pandas recopie attrs dans les DataFrames dérivés: une forme ou des colonnes différentes invalident l'empreinte
+    signature = (df.shape, tuple(str(col) for col in df.columns))
+    stored = df.attrs.get('fingerprint')
+    if stored is not None and stored[0] == signature:
+        return stored[1]
+    fingerprint = dataframe_fingerprint(df)
+    df.attrs['fingerprint'] = (signature, fingerprint)
+    return fingerprint
+
+
+def derived_fingerprint(fingerprint, *params):
+    """Empreinte d'un DataFrame entièrement déterminé par un DataFrame source et des paramètres"""
+    return hashlib.sha1(repr((fingerprint,) + params).encode()).hexdigest()
+
+
+def estimate_memo_size(value):
+    """Estimation en octets de l'empreinte mémoire d'un résultat d'analyse"""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, go.Figure):
+        return estimate_memo_size(value.to_plotly_json())
+    if isinstance(value, dict):
+        return sum(estimate_memo_size(k) + estimate_memo_size(v) for k, v in value.items()) + 64
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_memo_size(v) for v in value) + 8 * len(value) + 56
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        return estimate_memo_size(vars(value))
+    return sys.getsizeof(value)
+
+
+def memoize_analysis(fingerprint, tab, params, compute):
+    """Mémoïse un résultat d'analyse par (empreinte des données, onglet, paramètres des widgets)"""
+    memo = st.session_state.setdefault('analysis_memo', OrderedDict())
+    key = (fingerprint, tab, params)
+    if key in memo:
+        memo.move_to_end(key)
+        return memo[key][0]
+
+    value = compute()
+    size = estimate_memo_size(value)
+    if size > ANALYSIS_MEMO_MAX_BYTES:
+        # Résultat plus gros que tout le budget: recalculé à chaque fois plutôt que de vider le mémo
+        return value
+    memo[key] = (value, size)
+    total = st.session_state.get('analysis_memo_bytes', 0) + size
+    while memo and (total > ANALYSIS_MEMO_MAX_BYTES or len(memo) > ANALYSIS_MEMO_MAX_ENTRIES):
+        _, (_, evicted_size) = memo.popitem(last=False)
+        total -= evicted_size
+    st.session_state['analysis_memo_bytes'] = total
+    return value
+
+
+class DataProfile:
+    """Profil des colonnes d'un DataFrame (types, manquants, cardinalités, quantiles, doublons)"""
+
+    TOP_VALUES_MAX_UNIQUE = 50
+
+    def __init__(self, df):
+        self.n_rows, self.n_cols = df.shape
+        self.size = df.size
+        self.dtypes = df.dtypes
+        numeric_data = df.select_dtypes(include=[np.number])
+        self.numeric_columns = numeric_data.columns.tolist()
+        self.categorical_columns = [col for col in df.columns if col not in set(self.numeric_columns)]
+
+        self.null_counts = df.isna().sum()
+        self.missing = int(self.null_counts.sum())
+        try:
+            self.n_unique = df.nunique()
+        except TypeError:
+            self.n_unique = pd.Series({col: df[col].astype(str).nunique() for col in df.columns})
+        try:
+            self.duplicate_rows = int(df.duplicated().sum())
+        except TypeError:
+            self.duplicate_rows = int(df.astype(str).duplicated().sum())
+
+        self.first_values = df.iloc[0] if self.n_rows else None
+        self.last_values = df.iloc[-1] if self.n_rows else None
+
+        self.describe, self.zero_counts = self._profile_numeric(numeric_data)
+        self.top_values = self._profile_categorical(df)
+
+    @staticmethod
+    def _profile_numeric(numeric_data):
+        """Statistiques de describe() calculées en une passe sur le bloc numérique"""
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        if numeric_data.shape[1] == 0:
+            return pd.DataFrame(index=index), pd.Series(dtype='int64')
+
+        values = numeric_data.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            totals = np.where(valid, values, 0.0).sum(axis=0)
+            mean = totals / count
+            deviations = np.where(valid, values - mean, 0.0)
+            std = np.sqrt((deviations ** 2).sum(axis=0) / (count - 1))
+        std[count < 2] = np.nan
+
+        # Tri par colonne (NaN en fin) puis interpolation linéaire comme pandas
+        ordered = np.sort(values, axis=0)
+        quantiles = np.full((5, values.shape[1]), np.nan)
+        for j in np.flatnonzero(count):
+            positions = np.array([0.0, 0.25, 0.5, 0.75, 1.0]) * (count[j] - 1)
+            lower = np.floor(positions).astype(int)
+            upper = np.ceil(positions).astype(int)
+            column = ordered[:, j]
+            quantiles[:, j] = column[lower] + (column[upper] - column[lower]) * (positions - lower)
+
+        describe = pd.DataFrame(
+            [count, mean, std, quantiles[0], quantiles[1], quantiles[2], quantiles[3], quantiles[4]],
+            index=index, columns=numeric_data.columns
+        )
+        zero_counts = pd.Series((values == 0).sum(axis=0), index=numeric_data.columns)
+        return describe, zero_counts
+
+    def _profile_categorical(self, df):
+        """Valeur la plus fréquente des colonnes non numériques de faible cardinalité"""
+        top_values = {}
+        for col in self.categorical_columns:
+            if self.n_unique[col] < self.TOP_VALUES_MAX_UNIQUE:
+                counts = df[col].value_counts()
+                if len(counts) > 0:
+                    top_values[col] = (counts.index[0], int(counts.iloc[0]))
+        return top_values
+
+    def column_info(self):
+        """Tableau récapitulatif par colonne"""
+        return pd.DataFrame({
+            'Colonne': self.dtypes.index,
+            'Type': [str(t) for t in self.dtypes.values],
+            'Valeurs uniques': self.n_unique.reindex(self.dtypes.index).values,
+            'Valeurs manquantes': self.null_counts.values,
+            'Première valeur': [str(v) for v in self.first_values] if self.n_rows else '',
+            'Dernière valeur': [str(v) for v in self.last_values] if self.n_rows else ''
+        })
 
-            elif 'map' in item and item['map']:
-                map_data = item['map']
-                item_name = map_data.get('name', 'Carte')
-                item_type = "Map"
 
-                data = pd.DataFrame({
-                    'Région': ['Dakar', 'Thiès', 'Diourbel', 'Kaolack', 'Saint-Louis',
-                               'Louga', 'Fatick', 'Kaffrine', 'Matam', 'Kédougou'],
-                    'Latitude': [14.7167, 14.7833, 14.8833, 14.1500, 16.0333,
-                                 15.6500, 14.3333, 14.1167, 15.6667, 12.5500],
-                    'Longitude': [-17.4672, -16.9167, -16.2333, -16.0833, -16.5000,
-                                  -16.2333, -16.4333, -15.7000, -13.2500, -12.1833],
-                    'Valeur': np.random.randint(100, 1000, 10),
-                    'Population': np.random.randint(50000, 500000, 10)
-                })
-                info = f"Données cartographiques pour {item_name}"
-                return data, info, item_type
+def get_data_profile(df, fingerprint=None):
+    """Profil mémoïsé d'un DataFrame, partagé par les différents affichages"""
+    fingerprint = fingerprint or dataframe_fingerprint(df)
+    return memoize_analysis(fingerprint, 'profile', (), lambda: DataProfile(df))
+
+
+def get_point_budget():
+    """Budget de points par graphique choisi dans la barre latérale"""
+    return int(st.session_state.get('chart_point_budget', CHART_POINT_BUDGET))
+
+
+def to_plot_axis(series):
+    """Valeurs numériques d'un axe (dates en nanosecondes, catégories par position)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy().astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.arange(len(series), dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices retenus par l'algorithme Largest-Triangle-Three-Buckets (x trié)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs((x[anchor] - next_x) * (y[start:end] - y[anchor])
+                       - (x[anchor] - x[start:end]) * (next_y - y[anchor]))
+        anchor = start + int(np.argmax(areas)) if end > start else start
+        selected[i + 1] = anchor
+    return np.unique(selected)
+
+
+def make_line_chart(data, x, y, title, labels=None):
+    """Courbe réduite par LTTB au budget de points"""
+    budget = get_point_budget()
+    if len(data) > budget:
+        data = data[data[y].notna()]
+        axis = to_plot_axis(data[x])
+        data = data.iloc[lttb_indices(axis, data[y].to_numpy(dtype=np.float64), budget)]
+    return px.line(data, x=x, y=y, title=title, labels=labels)
+
+
+def make_histogram_chart(data, x, nbins, title):
+    """Histogramme pré-calculé avec np.histogram au-delà du budget de points"""
+    if len(data) <= get_point_budget():
+        return px.histogram(data, x=x, nbins=nbins, title=title)
+
+    values = data[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=nbins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name=str(x)))
+    fig.update_layout(title=title, xaxis_title=str(x), yaxis_title='count', bargap=0)
+    return fig
+
+
+def compute_box_statistics(values, codes, n_groups):
+    """Quartiles, moustaches (1,5 × IQR) et valeurs atypiques par groupe"""
+    valid = (codes >= 0) & np.isfinite(values)
+    values, codes = values[valid], codes[valid]
+    order = np.lexsort((values, codes))
+    values, codes = values[order], codes[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    present = np.flatnonzero(counts)
+    starts = (np.cumsum(counts) - counts)[present]
+    sizes = counts[present]
+
+    def quantile(q):
+        position = q * (sizes - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, sizes - 1)
+        weight = position - lower
+        return values[starts + lower] * (1 - weight) + values[starts + upper] * weight
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    low_limit, high_limit = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    slot = np.full(n_groups, -1)
+    slot[present] = np.arange(len(present))
+    in_low = values >= low_limit[slot[codes]]
+    in_high = values <= high_limit[slot[codes]]
+    lowerfence = np.minimum.reduceat(np.where(in_low, values, np.inf), starts)
+    upperfence = np.maximum.reduceat(np.where(in_high, values, -np.inf), starts)
+    means = np.add.reduceat(values, starts) / sizes
+    outliers = ~(in_low & in_high)
+    return {
+        'groups': present, 'q1': q1, 'median': median, 'q3': q3, 'mean': means,
+        'lowerfence': lowerfence, 'upperfence': upperfence,
+        'outlier_codes': codes[outliers], 'outlier_values': values[outliers]
+    }
 
-            elif 'text' in item:
-                item_name = f"Texte"
-                item_type = "Text"
-                text_content = item.get('text', 'Aucun contenu')
-                data = pd.DataFrame({
-                    'Type': ['Texte'],
-                    'Contenu': [text_content[:500] + "..." if len(text_content) > 500 else text_content]
-                })
-                return data, f"Élément texte: {item_name}", item_type
 
-            data, info = self._generate_analysis_ready_data(item_name)
-            return data, info, "Données génériques"
+def make_box_chart(data, y, title, x=None):
+    """Boîte à moustaches à partir de statistiques pré-calculées au-delà du budget de points"""
+    budget = get_point_budget()
+    if len(data) <= budget:
+        return px.box(data, x=x, y=y, title=title)
 
-        except Exception as e:
-            error_df = pd.DataFrame({
-                'Erreur': [str(e)],
-                'Élément': [item_name]
-            })
-            return error_df, f"Erreur: {str(e)}", "Erreur"
+    if x is not None:
+        codes, groups = pd.factorize(data[x], sort=True)
+        groups = [str(group) for group in groups]
+    else:
+        codes, groups = np.zeros(len(data), dtype=np.int64), [str(y)]
+    box = compute_box_statistics(data[y].to_numpy(dtype=np.float64, na_value=np.nan), codes, len(groups))
+    names = np.array(groups, dtype=object)
+
+    fig = go.Figure(go.Box(
+        x=names[box['groups']], q1=box['q1'], median=box['median'], q3=box['q3'], mean=box['mean'],
+        lowerfence=box['lowerfence'], upperfence=box['upperfence'], name=str(y), boxpoints=False
+    ))
+    outlier_values = box['outlier_values']
+    if len(outlier_values):
+        # Valeurs atypiques échantillonnées régulièrement dans la limite du budget
+        keep = np.linspace(0, len(outlier_values) - 1, min(budget, len(outlier_values))).astype(np.int64)
+        fig.add_trace(go.Scattergl(x=names[box['outlier_codes'][keep]], y=outlier_values[keep],
+                                   mode='markers', marker=dict(size=4), name='Valeurs atypiques'))
+    fig.update_layout(title=title, xaxis_title=str(x) if x is not None else None, yaxis_title=str(y),
+                      showlegend=False)
+    return fig
+
+
+def scatter_sample_indices(x_values, y_values, n_out, seed=0):
+    """Positions d'un échantillon reproductible d'au plus n_out points finis, extrêmes des deux axes inclus"""
+    candidates = np.flatnonzero(np.isfinite(x_values) & np.isfinite(y_values))
+    if len(candidates) <= n_out:
+        return candidates
+    extremes = np.unique(candidates[[np.argmin(x_values[candidates]), np.argmax(x_values[candidates]),
+                                     np.argmin(y_values[candidates]), np.argmax(y_values[candidates])]])
+    rest = np.setdiff1d(candidates, extremes, assume_unique=True)
+    # Graine fixe : le même échantillon d'une réexécution à l'autre
+    sampled = np.random.default_rng(seed).choice(rest, size=max(0, n_out - len(extremes)), replace=False)
+    return np.union1d(sampled, extremes)
+
+
+def make_scatter_chart(data, x, y, title, color=None, trend=None):
+    """Nuage de points borné au budget : échantillon au-delà, carte de densité pour les très grands volumes"""
+    budget = get_point_budget()
+    n = len(data)
+    if n <= budget:
+        fig = px.scatter(data, x=x, y=y, color=color, title=title)
+    elif n <= budget * SCATTER_DENSITY_FACTOR:
+        keep = scatter_sample_indices(to_plot_axis(data[x]), to_plot_axis(data[y]), budget)
+        # WebGL: simple choix de rendu, le nombre de points envoyés reste borné par le budget
+        fig = px.scatter(data.iloc[keep], x=x, y=y, color=color, render_mode='webgl',
+                         title=f"{title} (échantillon de {len(keep)} points sur {n})")
+    else:
+        x_values = data[x].to_numpy(dtype=np.float64, na_value=np.nan)
+        y_values = data[y].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = np.isfinite(x_values) & np.isfinite(y_values)
+        bins = max(10, int(np.sqrt(budget)))
+        counts, x_edges, y_edges = np.histogram2d(x_values[finite], y_values[finite], bins=bins)
+        fig = go.Figure(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts > 0, counts, np.nan).T, colorscale='Viridis', colorbar=dict(title='Points')
+        ))
+        fig.update_layout(title=f"{title} (densité de {n} points)", xaxis_title=str(x), yaxis_title=str(y))
+
+    if trend is not None:
+        x_range = np.array([np.nanmin(data[x].to_numpy(dtype=np.float64, na_value=np.nan)),
+                            np.nanmax(data[x].to_numpy(dtype=np.float64, na_value=np.nan))])
+        fig.add_trace(go.Scatter(x=x_range, y=trend.intercept + trend.slope * x_range,
+                                 mode='lines', name='Tendance (MCO)', line=dict(color='red')))
+    return fig
+
+
+def build_time_series_cube(df, date_col, numeric_cols):
+    """Cube temporel des variables numériques, ou None si la colonne n'est pas convertible en dates"""
+    try:
+        parsed_dates = pd.to_datetime(df[date_col])
+    except Exception:
+        return None
+    return TimeSeriesCube(parsed_dates, df[numeric_cols])
+
+
+class TimeSeriesCube:
+    """Agrégats temporels (somme, moyenne, écart-type, effectif) de toutes les variables numériques
+
+    Les agrégats journaliers sont calculés une fois sur des clés entières (jours depuis l'époque),
+    puis consolidés en semaines, mois, trimestres et années sans repasser sur les lignes.
+    """
+
+    # Période d'agrégation -> (niveau, colonne d'affichage)
+    LEVELS = OrderedDict([
+        ('Journalier', ('day', 'Date_Display')),
+        ('Hebdomadaire', ('week', 'Semaine')),
+        ('Mensuel', ('month', 'Mois')),
+        ('Trimestriel', ('quarter', 'Trimestre')),
+        ('Annuel', ('year', 'Année'))
+    ])
+
+    def __init__(self, parsed_dates, numeric_data):
+        if getattr(parsed_dates.dt, 'tz', None) is not None:
+            parsed_dates = parsed_dates.dt.tz_localize(None)
+        valid_dates = parsed_dates.notna().to_numpy()
+        days = parsed_dates.to_numpy()[valid_dates].astype('datetime64[D]').astype(np.int64)
+        values = numeric_data.to_numpy(dtype=np.float64, na_value=np.nan)[valid_dates]
+
+        self.columns = numeric_data.columns.tolist()
+        self.levels = {}
+
+        day_keys, day_codes = np.unique(days, return_inverse=True)
+        self.levels['day'] = (day_keys,) + self._aggregate_rows(day_codes, len(day_keys), values)
+
+        calendar = pd.to_datetime(day_keys, unit='D')
+        years = calendar.year.to_numpy().astype(np.int64)
+        # Numéro de semaine au sens de strftime('%U') : semaines commençant le dimanche
+        sunday_weekday = (calendar.dayofweek.to_numpy() + 1) % 7
+        weeks = (calendar.dayofyear.to_numpy() - 1 + 7 - sunday_weekday) // 7
+        coarse_keys = {
+            'week': years * 100 + weeks,
+            'month': years * 100 + calendar.month.to_numpy(),
+            'quarter': years * 10 + calendar.quarter.to_numpy(),
+            'year': years
+        }
+        for level, keys in coarse_keys.items():
+            level_keys, level_codes = np.unique(keys, return_inverse=True)
+            self.levels[level] = (level_keys,) + self._rollup(level_codes, len(level_keys), *self.levels['day'][1:])
+
+    @staticmethod
+    def _aggregate_rows(codes, n_groups, values):
+        """Effectif, somme et somme des carrés des écarts par groupe, pour chaque colonne"""
+        counts = np.zeros((n_groups, values.shape[1]))
+        sums = np.zeros((n_groups, values.shape[1]))
+        squares = np.zeros((n_groups, values.shape[1]))
+        for j in range(values.shape[1]):
+            column = values[:, j]
+            valid = ~np.isnan(column)
+            counts[:, j] = np.bincount(codes[valid], minlength=n_groups)
+            sums[:, j] = np.bincount(codes[valid], weights=column[valid], minlength=n_groups)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = sums[:, j] / counts[:, j]
+            deviations = column[valid] - means[codes[valid]]
+            squares[:, j] = np.bincount(codes[valid], weights=deviations ** 2, minlength=n_groups)
+        return counts, sums, squares
+
+    @staticmethod
+    def _rollup(codes, n_groups, counts, sums, squares):
+        """Consolide des agrégats fins en agrégats plus larges (combinaison des variances par groupe)"""
+        shape = (n_groups, counts.shape[1])
+        rolled_counts, rolled_sums, rolled_squares = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for j in range(counts.shape[1]):
+                rolled_counts[:, j] = np.bincount(codes, weights=counts[:, j], minlength=n_groups)
+                rolled_sums[:, j] = np.bincount(codes, weights=sums[:, j], minlength=n_groups)
+                fine_means = np.where(counts[:, j] > 0, sums[:, j] / counts[:, j], 0.0)
+                coarse_means = rolled_sums[:, j] / rolled_counts[:, j]
+                shift = np.where(counts[:, j] > 0, counts[:, j] * (fine_means - coarse_means[codes]) ** 2, 0.0)
+                rolled_squares[:, j] = np.bincount(codes, weights=squares[:, j] + shift, minlength=n_groups)
+        return rolled_counts, rolled_sums, rolled_squares
+
+    @staticmethod
+    def _labels(level, keys):
+        """Libellés des périodes, formatés uniquement pour les clés distinctes"""
+        if level == 'day':
+            return pd.to_datetime(keys, unit='D').strftime('%Y-%m-%d')
+        if level in ('week', 'month'):
+            return [f"{key // 100}-{key % 100:02d}" for key in keys]
+        if level == 'quarter':
+            return [f"{key // 10}-Q{key % 10}" for key in keys]
+        return keys
+
+    def series(self, agg_type, value_col):
+        """Série agrégée d'une variable; retourne (série, colonne d'affichage)"""
+        level, display_col = self.LEVELS[agg_type]
+        keys, counts, sums, squares = self.levels[level]
+        j = self.columns.index(value_col)
+        has_values = counts[:, j] > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(has_values, sums[:, j] / counts[:, j], np.nan)
+            stds = np.where(counts[:, j] > 1, np.sqrt(squares[:, j] / (counts[:, j] - 1)), np.nan)
+        time_series = pd.DataFrame({
+            display_col: self._labels(level, keys),
+            'mean': means,
+            'sum': sums[:, j],
+            'std': stds,
+            'count': counts[:, j].astype(np.int64)
+        })
+        return time_series, display_col
+
+
+def compute_temporal_trend(time_series):
+    """Régression linéaire de la somme sur l'indice de période (None si moins de deux périodes)"""
+    if len(time_series) > 1:
+        return stats.linregress(range(len(time_series)), time_series['sum'].values)
+    return None
 
 
-def display_temporal_analyses(df, title):
+def display_temporal_analyses(df, title, fingerprint=None):
     """Affiche les analyses temporelles"""
     st.markdown("#### 📈 Analyses Temporelles")
+    fingerprint = fingerprint or dataframe_fingerprint(df)
 
     # Détecter les colonnes temporelles
     date_cols = []
@@ -697,99 +3683,50 @@ def display_temporal_analyses(df, title):
     value_col = st.selectbox("Variable à analyser", numeric_cols)
 
     if date_col and value_col:
-        temp_df = df.copy()
+        # Construire le cube temporel une seule fois par jeu de données et colonne de dates
+        cube = memoize_analysis(fingerprint, 'temporal_cube', (date_col,),
+                                lambda: build_time_series_cube(df, date_col, numeric_cols))
 
-        # Essayer de convertir en datetime
-        try:
-            temp_df[date_col] = pd.to_datetime(temp_df[date_col])
-            date_conversion_successful = True
-        except Exception as e:
-            date_conversion_successful = False
+        agg_type = None
+        if cube is None:
             st.warning(f"Impossible de convertir '{date_col}' en date. Utilisation comme chaîne de caractères.")
-
-        if not date_conversion_successful:
-            # Si la conversion a échoué, traiter comme une colonne catégorielle
-            period_col = date_col
         else:
             # Si la conversion a réussi, proposer des options d'agrégation
-            agg_type = st.selectbox("Période d'agrégation",
-                                    ['Journalier', 'Hebdomadaire', 'Mensuel', 'Trimestriel', 'Annuel'])
-
-            if agg_type == 'Journalier':
-                period_col = date_col  # Utiliser la colonne date directement
-                # Ajouter une colonne de format pour l'affichage
-                temp_df['Date_Display'] = temp_df[date_col].dt.strftime('%Y-%m-%d')
-                display_col = 'Date_Display'
-            elif agg_type == 'Hebdomadaire':
-                period_col = 'Semaine'
-                temp_df[period_col] = temp_df[date_col].dt.strftime('%Y-%U')
-                display_col = period_col
-            elif agg_type == 'Mensuel':
-                period_col = 'Mois'
-                temp_df[period_col] = temp_df[date_col].dt.strftime('%Y-%m')
-                display_col = period_col
-            elif agg_type == 'Trimestriel':
-                period_col = 'Trimestre'
-                temp_df[period_col] = temp_df[date_col].dt.year.astype(str) + '-Q' + temp_df[
-                    date_col].dt.quarter.astype(str)
-                display_col = period_col
-            else:  # Annuel
-                period_col = 'Année'
-                temp_df[period_col] = temp_df[date_col].dt.year
-                display_col = period_col
-
-        # Vérifier que la colonne de période existe
-        if period_col not in temp_df.columns:
-            st.error(f"La colonne '{period_col}' n'a pas pu être créée.")
-            return
-
-        # Vérifier que la colonne de valeur existe
-        if value_col not in temp_df.columns:
-            st.error(f"La colonne '{value_col}' n'existe pas dans les données.")
-            return
+            agg_type = st.selectbox("Période d'agrégation", list(TimeSeriesCube.LEVELS))
 
         try:
-            # Grouper par la période
-            time_series = temp_df.groupby(display_col)[value_col].agg(['mean', 'sum', 'std', 'count']).reset_index()
-
-            # Trier par la colonne de période si c'est une date
-            if date_conversion_successful and agg_type == 'Journalier':
-                time_series = time_series.sort_values(by=date_col)
-            elif date_conversion_successful and display_col != date_col:
-                # Trier par la colonne d'affichage
-                time_series = time_series.sort_values(by=display_col)
+            if cube is not None:
+                time_series, display_col = cube.series(agg_type, value_col)
+            else:
+                # Colonne non convertible : agrégation directe par valeur
+                display_col = date_col
+                time_series = memoize_analysis(
+                    fingerprint, 'temporal', (date_col, value_col),
+                    lambda: df.groupby(date_col, observed=True)[value_col]
+                    .agg(['mean', 'sum', 'std', 'count']).reset_index()
+                )
+            result = memoize_analysis(fingerprint, 'temporal_trend', (date_col, value_col, agg_type),
+                                      lambda: compute_temporal_trend(time_series))
 
             if len(time_series) > 1:
                 # Créer le graphique
-                fig = px.line(time_series, x=display_col, y='sum',
-                              title=f"Évolution temporelle de {value_col}",
-                              labels={display_col: 'Période', 'sum': f'Somme de {value_col}'})
+                fig = make_line_chart(time_series, display_col, 'sum',
+                                      title=f"Évolution temporelle de {value_col}",
+                                      labels={display_col: 'Période', 'sum': f'Somme de {value_col}'})
                 st.plotly_chart(fig, use_container_width=True)
 
                 st.markdown("##### 📉 Analyse de tendance")
-                try:
-                    x = range(len(time_series))
-                    y = time_series['sum'].values
-
-                    if len(y) > 1:
-                        result = stats.linregress(x, y)
-
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("Pente", f"{result.slope:.2f}")
-                            st.metric("Coefficient R²", f"{result.rvalue ** 2:.3f}")
-                        with col2:
-                            if result.slope > 0:
-                                st.success("📈 Tendance à la hausse")
-                            elif result.slope < 0:
-                                st.warning("📉 Tendance à la baisse")
-                            else:
-                                st.info("➡️ Tendance stable")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Pente", f"{result.slope:.2f}")
+                    st.metric("Coefficient R²", f"{result.rvalue ** 2:.3f}")
+                with col2:
+                    if result.slope > 0:
+                        st.success("📈 Tendance à la hausse")
+                    elif result.slope < 0:
+                        st.warning("📉 Tendance à la baisse")
                     else:
-                        st.info("Données insuffisantes pour l'analyse de tendance")
-
-                except Exception as e:
-                    st.warning(f"Analyse de tendance non disponible: {str(e)}")
+                        st.info("➡️ Tendance stable")
 
                 # Afficher les données
                 with st.expander("📋 Voir les données agrégées"):
@@ -803,12 +3740,137 @@ def display_temporal_analyses(df, title):
 
             # Analyse alternative: afficher simplement les données
             with st.expander("📋 Voir les données brutes"):
-                st.dataframe(temp_df[[date_col, value_col]].head(50), use_container_width=True)
+                st.dataframe(df[[date_col, value_col]].head(50), use_container_width=True)
+
+
+GroupTestResult = namedtuple('GroupTestResult', ['statistic', 'pvalue', 'df'])
+
+GROUP_TESTS = ['ANOVA', 'ANOVA de Welch', 'Kruskal-Wallis']
+
+
+def f_survival(statistic, dfn, dfd):
+    """P(F > statistic) pour une loi de Fisher"""
+    if not np.isfinite(statistic):
+        return np.nan
+    return float(stats.f.sf(statistic, dfn, dfd))
+
+
+def chi2_survival(statistic, df):
+    """P(X > statistic) pour une loi du khi-deux"""
+    if not np.isfinite(statistic):
+        return np.nan
+    return float(stats.chi2.sf(statistic, df))
+
+
+def compute_grouped_moments(codes, values, n_groups):
+    """Effectif, moyenne, écart-type, min et max par groupe en une passe (codes factorisés)"""
+    counts = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        squares = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_groups)
+        variances = np.where(counts > 1, squares / (counts - 1), np.nan)
+
+    # Un seul tri (groupe, valeur) donne les extrêmes de chaque groupe
+    order = np.lexsort((values, codes))
+    ends = np.cumsum(counts).astype(np.int64)
+    starts = ends - counts.astype(np.int64)
+    present = counts > 0
+    minima = np.full(n_groups, np.nan)
+    maxima = np.full(n_groups, np.nan)
+    minima[present] = values[order[starts[present]]]
+    maxima[present] = values[order[ends[present] - 1]]
 
+    return {
+        'count': counts, 'mean': means, 'm2': squares, 'var': variances,
+        'min': minima, 'max': maxima
+    }
+
+
+def grouped_anova(moments):
+    """ANOVA à un facteur à partir des moments par groupe"""
+    counts, means = moments['count'], moments['mean']
+    k = len(counts)
+    total = counts.sum()
+    grand_mean = (counts * means).sum() / total
+    between = (counts * (means - grand_mean) ** 2).sum()
+    within = moments['m2'].sum()
+    dfn, dfd = k - 1, int(total) - k
+    with np.errstate(invalid='ignore', divide='ignore'):
+        statistic = (between / dfn) / (within / dfd)
+    return GroupTestResult(statistic, f_survival(statistic, dfn, dfd), (dfn, dfd))
+
+
+def grouped_welch_anova(moments):
+    """ANOVA de Welch (variances inégales) à partir des moments par groupe"""
+    usable = (moments['count'] > 1) & (moments['var'] > 0)
+    counts, means, variances = moments['count'][usable], moments['mean'][usable], moments['var'][usable]
+    k = len(counts)
+    if k < 2:
+        return GroupTestResult(np.nan, np.nan, None)
+
+    weights = counts / variances
+    total_weight = weights.sum()
+    weighted_mean = (weights * means).sum() / total_weight
+    spread = (weights * (means - weighted_mean) ** 2).sum() / (k - 1)
+    correction = ((1 - weights / total_weight) ** 2 / (counts - 1)).sum()
+    statistic = spread / (1 + 2 * (k - 2) / (k ** 2 - 1) * correction)
+    dfn, dfd = k - 1, (k ** 2 - 1) / (3 * correction)
+    return GroupTestResult(statistic, f_survival(statistic, dfn, dfd), (dfn, dfd))
+
+
+def grouped_kruskal(codes, values, n_groups):
+    """Test de Kruskal-Wallis (rangs moyens en cas d'égalité, correction des ex aequo)"""
+    unique_values, inverse, tie_counts = np.unique(values, return_inverse=True, return_counts=True)
+    mean_ranks = np.cumsum(tie_counts) - (tie_counts - 1) / 2.0
+    rank_sums = np.bincount(codes, weights=mean_ranks[inverse], minlength=n_groups)
+    counts = np.bincount(codes, minlength=n_groups)
+    present = counts > 0
+    total = len(values)
+
+    statistic = 12.0 / (total * (total + 1)) * (rank_sums[present] ** 2 / counts[present]).sum() - 3 * (total + 1)
+    ties = 1 - (tie_counts.astype(np.float64) ** 3 - tie_counts).sum() / (float(total) ** 3 - total)
+    statistic = statistic / ties if ties > 0 else np.nan
+    df = int(present.sum()) - 1
+    return GroupTestResult(statistic, chi2_survival(statistic, df), df)
+
+
+def compute_group_comparison(df, cat_col, num_col):
+    """Statistiques par groupe et tests de comparaison; retourne (statistiques, {test: résultat})"""
+    values = df[num_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, groups = pd.factorize(df[cat_col], sort=True)
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+
+    moments = compute_grouped_moments(codes, values, len(groups))
+    present = moments['count'] > 0
+    group_stats = pd.DataFrame({
+        'mean': moments['mean'],
+        'std': np.sqrt(moments['var']),
+        'min': moments['min'],
+        'max': moments['max'],
+        'count': moments['count'].astype(np.int64)
+    }, index=pd.Index(groups, name=cat_col))[present].round(2)
+
+    tests = {}
+    if present.sum() > 2 and len(df) > 30:
+        kept = np.flatnonzero(present)
+        remap = np.full(len(groups), -1)
+        remap[kept] = np.arange(len(kept))
+        codes = remap[codes]
+        moments = {name: column[kept] for name, column in moments.items()}
+        tests = {
+            'ANOVA': grouped_anova(moments),
+            'ANOVA de Welch': grouped_welch_anova(moments),
+            'Kruskal-Wallis': grouped_kruskal(codes, values, len(kept))
+        }
+    return group_stats, tests
 
-def display_comparative_analyses(df, title):
+
+def display_comparative_analyses(df, title, fingerprint=None):
     """Affiche les analyses comparatives"""
     st.markdown("#### 📋 Analyses Comparatives")
+    fingerprint = fingerprint or dataframe_fingerprint(df)
 
     categorical_cols = df.select_dtypes(exclude=[np.number]).columns.tolist()
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -821,46 +3883,43 @@ def display_comparative_analyses(df, title):
     num_col = st.selectbox("Variable numérique à comparer", numeric_cols)
 
     if cat_col and num_col:
-        fig = px.box(df, x=cat_col, y=num_col,
-                     title=f"Comparaison de {num_col} par {cat_col}")
+        fig = memoize_analysis(fingerprint, 'comparative_box', (cat_col, num_col, get_point_budget()),
+                               lambda: make_box_chart(df, num_col, x=cat_col,
+                                                      title=f"Comparaison de {num_col} par {cat_col}"))
         st.plotly_chart(fig, use_container_width=True)
 
+        group_stats, tests = memoize_analysis(fingerprint, 'comparative', (cat_col, num_col),
+                                              lambda: compute_group_comparison(df, cat_col, num_col))
+
         st.markdown("##### 📊 Statistiques par groupe")
-        group_stats = df.groupby(cat_col)[num_col].agg(['mean', 'std', 'min', 'max', 'count']).round(2)
         st.dataframe(group_stats, use_container_width=True)
 
-        unique_groups = df[cat_col].nunique()
-        if unique_groups > 2 and len(df) > 30:
-            st.markdown("##### 🔬 Test ANOVA")
+        if tests:
+            st.markdown("##### 🔬 Test de comparaison des groupes")
+            test_name = st.radio("Test", GROUP_TESTS, horizontal=True, key=f"group_test_{title}")
+            result = tests[test_name]
             try:
-                result = stats.f_oneway(*[df[df[cat_col] == group][num_col].dropna()
-                                          for group in df[cat_col].unique()])
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.metric("Statistique F", f"{result.statistic:.3f}")
+                    label = "Statistique H" if test_name == 'Kruskal-Wallis' else "Statistique F"
+                    st.metric(label, f"{result.statistic:.3f}")
                 with col2:
-                    st.metric("p-value", f"{result.pvalue:.4f}")
+                    st.metric("p-value", f"{result.pvalue:.4f}" if np.isfinite(result.pvalue) else "n/d")
 
-                if result.pvalue < 0.05:
+                if not np.isfinite(result.pvalue):
+                    st.info(f"p-value du test {test_name} non disponible")
+                elif result.pvalue < 0.05:
                     st.success("Différences statistiquement significatives entre les groupes")
                 else:
                     st.info("Pas de différences statistiquement significatives")
-            except:
-                st.info("Test ANOVA non disponible")
+            except Exception:
+                st.info(f"Test {test_name} non disponible")
 
 
-def display_predictive_analyses(df, title):
+def display_predictive_analyses(df, title, fingerprint=None):
     """Affiche les analyses prédictives"""
     st.markdown("#### 🔮 Analyses Prédictives")
-
-    if not SCIPY_AVAILABLE:
-        st.markdown("""
-        <div class="warning-banner">
-            ⚠️ <strong>scipy non disponible</strong><br>
-            Les analyses prédictives avancées nécessitent l'installation de scipy.<br>
-            Exécutez: <code>pip install scipy</code> dans votre terminal.
-        </div>
-        """, unsafe_allow_html=True)
+    fingerprint = fingerprint or dataframe_fingerprint(df)
 
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
 
@@ -877,14 +3936,16 @@ def display_predictive_analyses(df, title):
         y_var = st.selectbox("Variable dépendante (Y)", numeric_cols, key="pred_y")
 
     if x_var and y_var and x_var != y_var:
-        clean_data = df[[x_var, y_var]].dropna()
+        clean_data = memoize_analysis(fingerprint, 'predictive_data', (x_var, y_var),
+                                      lambda: df[[x_var, y_var]].dropna())
 
         if len(clean_data) > 10:
             x = clean_data[x_var].values
             y = clean_data[y_var].values
 
             try:
-                result = stats.linregress(x, y)
+                result = memoize_analysis(fingerprint, 'predictive', (x_var, y_var),
+                                          lambda: stats.linregress(x, y))
 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -894,8 +3955,9 @@ def display_predictive_analyses(df, title):
                 with col3:
                     st.metric("R²", f"{result.rvalue ** 2:.4f}")
 
-                fig = px.scatter(clean_data, x=x_var, y=y_var, trendline="ols",
-                                 title=f"Régression linéaire: {y_var} ~ {x_var}")
+                fig = memoize_analysis(fingerprint, 'predictive_scatter', (x_var, y_var, get_point_budget()),
+                                       lambda: make_scatter_chart(clean_data, x_var, y_var, trend=result,
+                                                                  title=f"Régression linéaire: {y_var} ~ {x_var}"))
                 st.plotly_chart(fig, use_container_width=True)
 
                 st.markdown("##### 🔮 Prédiction")
@@ -925,61 +3987,38 @@ def display_all_analysis_tabs(df, title, description=""):
         st.markdown("""
         <div class="warning-banner">
             ⚠️ <strong>Fonctionnalités limitées</strong><br>
-            Le module scipy n'est pas installé. Certaines analyses avancées (ANOVA, clustering) seront limitées.<br>
+            Le module scipy n'est pas installé. Les tests statistiques sont calculés par le moteur NumPy intégré.<br>
             Exécutez: <code>pip install scipy</code> pour activer toutes les fonctionnalités.
         </div>
         """, unsafe_allow_html=True)
 
-    # Onglets simplifiés sans analyses avancées qui nécessitent scipy
-    if SCIPY_AVAILABLE:
-        tabs = st.tabs([
-            "📊 Descriptives",
-            "📈 Temporelles",
-            "🌍 Géographiques",
-            "🎯 Performance",
-            "📋 Comparatives",
-            "🔮 Prédictives",
-            "📈 Qualité Données"
-        ])
-    else:
-        tabs = st.tabs([
-            "📊 Descriptives",
-            "📈 Temporelles",
-            "🌍 Géographiques",
-            "🎯 Performance",
-            "📋 Comparatives",
-            "📈 Qualité Données"
-        ])
-
-    with tabs[0]:
-        display_descriptive_analyses(df, title)
-
-    with tabs[1]:
-        display_temporal_analyses(df, title)
-
-    with tabs[2]:
-        display_geographic_analyses(df, title)
-
-    with tabs[3]:
-        display_performance_analyses(df, title)
-
-    with tabs[4]:
-        display_comparative_analyses(df, title)
-
-    if SCIPY_AVAILABLE:
-        with tabs[5]:
-            display_predictive_analyses(df, title)
-        with tabs[6]:
-            display_data_quality_analyses(df, title)
-    else:
-        with tabs[5]:
-            display_data_quality_analyses(df, title)
+    analyses = {
+        "📊 Descriptives": display_descriptive_analyses,
+        "📈 Temporelles": display_temporal_analyses,
+        "🌍 Géographiques": display_geographic_analyses,
+        "🎯 Performance": display_performance_analyses,
+        "📋 Comparatives": display_comparative_analyses,
+        "🔮 Prédictives": display_predictive_analyses,
+        "📈 Qualité Données": display_data_quality_analyses,
+    }
+
+    # Seule l'analyse sélectionnée est calculée (st.tabs exécuterait tous les onglets)
+    selected_analysis = st.radio(
+        "Type d'analyse",
+        list(analyses.keys()),
+        horizontal=True,
+        key=f"analysis_tab_{title}",
+        label_visibility="collapsed"
+    )
+
+    fingerprint = frame_fingerprint(df)
+    analyses[selected_analysis](df, title, fingerprint)
 
     st.markdown('</div>', unsafe_allow_html=True)
 
 
 # Les autres fonctions display_* restent inchangées...
-def display_descriptive_analyses(df, title):
+def display_descriptive_analyses(df, title, fingerprint=None):
     """Affiche les analyses descriptives"""
     st.markdown("#### 📊 Analyses Descriptives")
 
@@ -987,51 +4026,77 @@ def display_descriptive_analyses(df, title):
         st.info("Aucune donnée pour l'analyse descriptive")
         return
 
+    fingerprint = fingerprint or dataframe_fingerprint(df)
+    profile = get_data_profile(df, fingerprint)
+
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Moyenne", f"{df.select_dtypes(include=[np.number]).mean().mean():.2f}")
+        st.metric("Moyenne", f"{profile.describe.loc['mean'].mean():.2f}")
     with col2:
-        st.metric("Médiane", f"{df.select_dtypes(include=[np.number]).median().median():.2f}")
+        st.metric("Médiane", f"{profile.describe.loc['50%'].median():.2f}")
     with col3:
-        st.metric("Écart-type", f"{df.select_dtypes(include=[np.number]).std().mean():.2f}")
+        st.metric("Écart-type", f"{profile.describe.loc['std'].mean():.2f}")
     with col4:
-        missing = df.isnull().sum().sum()
-        total = df.size
-        st.metric("Données manquantes", f"{missing}/{total}")
+        st.metric("Données manquantes", f"{profile.missing}/{profile.size}")
 
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_cols = profile.numeric_columns
     if numeric_cols:
         st.markdown("##### 📈 Distributions")
         selected_col = st.selectbox("Sélectionnez une variable numérique", numeric_cols)
 
+        histogram, box = memoize_analysis(
+            fingerprint, 'descriptive', (selected_col, get_point_budget()),
+            lambda: (make_histogram_chart(df, selected_col, 30, title=f"Distribution de {selected_col}"),
+                     make_box_chart(df, selected_col, title=f"Boîte à moustaches - {selected_col}"))
+        )
+
         col1, col2 = st.columns(2)
         with col1:
-            fig = px.histogram(df, x=selected_col, nbins=30,
-                               title=f"Distribution de {selected_col}")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(histogram, use_container_width=True)
 
         with col2:
-            fig = px.box(df, y=selected_col, title=f"Boîte à moustaches - {selected_col}")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(box, use_container_width=True)
 
         st.markdown("##### 📋 Statistiques détaillées")
-        st.dataframe(df[selected_col].describe(), use_container_width=True)
+        st.dataframe(profile.describe[selected_col], use_container_width=True)
 
-    categorical_cols = df.select_dtypes(exclude=[np.number]).columns.tolist()
+    categorical_cols = profile.categorical_columns
     if categorical_cols:
         st.markdown("##### 📊 Analyses catégorielles")
         cat_col = st.selectbox("Sélectionnez une variable catégorielle", categorical_cols)
 
         if cat_col:
-            value_counts = df[cat_col].value_counts()
+            value_counts = memoize_analysis(fingerprint, 'descriptive_counts', (cat_col,),
+                                            lambda: df[cat_col].value_counts())
             fig = px.bar(x=value_counts.index, y=value_counts.values,
                          title=f"Distribution de {cat_col}")
             st.plotly_chart(fig, use_container_width=True)
 
 
-def display_geographic_analyses(df, title):
+def compute_geographic_summary(df, geo_col, value_col):
+    """Agrégats par zone géographique et carte choroplèthe (None si indisponible)"""
+    geo_data = df.groupby(geo_col, observed=True)[value_col].agg(['mean', 'sum', 'std', 'count']).reset_index()
+    geo_data.columns = [geo_col, 'Moyenne', 'Somme', 'Écart-type', 'Nombre']
+
+    try:
+        fig = px.choropleth(
+            geo_data,
+            locations=geo_col,
+            locationmode='country names',
+            color='Somme',
+            title=f"Distribution géographique de {value_col}",
+            color_continuous_scale="Viridis"
+        )
+        fig.update_layout(height=500)
+    except Exception:
+        fig = None
+    return geo_data, fig
+
+
+def display_geographic_analyses(df, title, fingerprint=None):
     """Affiche les analyses géographiques"""
     st.markdown("#### 🌍 Analyses Géographiques")
+    fingerprint = fingerprint or dataframe_fingerprint(df)
 
     geo_cols = [col for col in df.columns if any(x in str(col).lower()
                                                  for x in
@@ -1046,22 +4111,13 @@ def display_geographic_analyses(df, title):
                              df.select_dtypes(include=[np.number]).columns.tolist())
 
     if geo_col and value_col:
-        geo_data = df.groupby(geo_col)[value_col].agg(['mean', 'sum', 'std', 'count']).reset_index()
-        geo_data.columns = [geo_col, 'Moyenne', 'Somme', 'Écart-type', 'Nombre']
+        geo_data, fig = memoize_analysis(fingerprint, 'geographic', (geo_col, value_col),
+                                         lambda: compute_geographic_summary(df, geo_col, value_col))
 
         st.markdown("##### 🗺️ Carte Choroplèthe")
-        try:
-            fig = px.choropleth(
-                geo_data,
-                locations=geo_col,
-                locationmode='country names',
-                color='Somme',
-                title=f"Distribution géographique de {value_col}",
-                color_continuous_scale="Viridis"
-            )
-            fig.update_layout(height=500)
+        if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
-        except:
+        else:
             st.dataframe(geo_data.sort_values('Somme', ascending=False), use_container_width=True)
 
         st.markdown("##### 📊 Comparaison Régionale")
@@ -1073,9 +4129,24 @@ def display_geographic_analyses(df, title):
         st.plotly_chart(fig, use_container_width=True)
 
 
-def display_performance_analyses(df, title):
+def compute_performance_distribution(df, perf_col):
+    """Histogramme et statistiques d'un indicateur de performance"""
+    values = df[perf_col]
+    fig = make_histogram_chart(df, perf_col, 20, title=f"Distribution de {perf_col}")
+    quantiles = values.quantile([0.25, 0.5, 0.75])
+    return fig, {
+        'mean': values.mean(),
+        'std': values.std(),
+        'q1': quantiles.loc[0.25],
+        'median': quantiles.loc[0.5],
+        'q3': quantiles.loc[0.75]
+    }, df[[perf_col]].describe()
+
+
+def display_performance_analyses(df, title, fingerprint=None):
     """Affiche les analyses de performance (ECV/DSDM)"""
     st.markdown("#### 🎯 Analyses de Performance")
+    fingerprint = fingerprint or dataframe_fingerprint(df)
 
     perf_cols = []
     for col in df.columns:
@@ -1099,37 +4170,31 @@ def display_performance_analyses(df, title):
     if perf_col:
         st.markdown("##### 📊 Distribution des performances")
 
+        fig, perf_stats, description = memoize_analysis(
+            fingerprint, 'performance', (perf_col, get_point_budget()),
+            lambda: compute_performance_distribution(df, perf_col)
+        )
+
         col1, col2 = st.columns(2)
         with col1:
-            fig = px.histogram(df, x=perf_col, nbins=20,
-                               title=f"Distribution de {perf_col}")
             st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             # Afficher les statistiques descriptives
             if len(df) > 0:
-                q1 = df[perf_col].quantile(0.25)
-                median = df[perf_col].median()
-                q3 = df[perf_col].quantile(0.75)
-                mean_val = df[perf_col].mean()
-                std_val = df[perf_col].std()
-
-                st.metric("Moyenne", f"{mean_val:.1f}")
-                st.metric("Écart-type", f"{std_val:.1f}")
-                st.metric("25e percentile", f"{q1:.1f}")
-                st.metric("Médiane", f"{median:.1f}")
-                st.metric("75e percentile", f"{q3:.1f}")
+                st.metric("Moyenne", f"{perf_stats['mean']:.1f}")
+                st.metric("Écart-type", f"{perf_stats['std']:.1f}")
+                st.metric("25e percentile", f"{perf_stats['q1']:.1f}")
+                st.metric("Médiane", f"{perf_stats['median']:.1f}")
+                st.metric("75e percentile", f"{perf_stats['q3']:.1f}")
 
         st.markdown("##### 📋 Classification par seuils")
 
         # Afficher les données sous forme de tableau
         with st.expander("📋 Voir les données brutes"):
-            st.dataframe(df[[perf_col]].describe(), use_container_width=True)
-            if len(df) <= 100:
-                st.dataframe(df[[perf_col]], use_container_width=True)
-            else:
-                st.dataframe(df[[perf_col]].head(100), use_container_width=True)
-                st.info(f"Affiche les 100 premières lignes sur {len(df)} au total")
+            st.dataframe(description, use_container_width=True)
+            display_paginated_table(df[[perf_col]], key=f"perf_table_{title}",
+                                    fingerprint=derived_fingerprint(fingerprint, 'columns', perf_col))
 
         # Remplacer le slider à 3 valeurs par 3 sliders séparés ou un slider à plage
         st.markdown("##### 🎯 Définir les seuils de classification")
@@ -1154,13 +4219,14 @@ def display_performance_analyses(df, title):
 
             # Vérifier que les bins sont dans l'ordre croissant
             if all(bins[i] < bins[i + 1] for i in range(len(bins) - 1)):
-                df['Catégorie'] = pd.cut(df[perf_col],
-                                         bins=bins,
-                                         labels=labels,
-                                         include_lowest=True)
+                categories = memoize_analysis(
+                    fingerprint, 'performance_classes', (perf_col, tuple(bins)),
+                    lambda: pd.cut(df[perf_col], bins=bins, labels=labels,
+                                   include_lowest=True).rename('Catégorie')
+                )
 
                 # Compter les catégories
-                cat_dist = df['Catégorie'].value_counts().sort_index()
+                cat_dist = categories.value_counts().sort_index()
 
                 # Créer le graphique en camembert
                 if not cat_dist.empty:
@@ -1180,7 +4246,7 @@ def display_performance_analyses(df, title):
 
                     # Afficher un échantillon des données classées
                     st.markdown("##### 📋 Échantillon des données classées")
-                    sample_df = df[[perf_col, 'Catégorie']].head(20)
+                    sample_df = pd.concat([df[perf_col], categories], axis=1).head(20)
                     st.dataframe(sample_df.sort_values(by=perf_col, ascending=False),
                                  use_container_width=True)
                 else:
@@ -1193,9 +4259,9 @@ def display_performance_analyses(df, title):
 
             # Alternative: classification simple par quartiles
             st.markdown("##### 🔄 Classification alternative par quartiles")
-            df['Catégorie_Quartile'] = pd.qcut(df[perf_col], q=4,
-                                               labels=['Très faible', 'Faible', 'Moyen', 'Élevé'])
-            cat_dist_q = df['Catégorie_Quartile'].value_counts()
+            quartiles = pd.qcut(df[perf_col], q=4,
+                                labels=['Très faible', 'Faible', 'Moyen', 'Élevé'])
+            cat_dist_q = quartiles.value_counts()
 
             if not cat_dist_q.empty:
                 fig = px.pie(values=cat_dist_q.values, names=cat_dist_q.index,
@@ -1203,30 +4269,29 @@ def display_performance_analyses(df, title):
                 st.plotly_chart(fig, use_container_width=True)
 
 
-def display_data_quality_analyses(df, title):
+def display_data_quality_analyses(df, title, fingerprint=None):
     """Affiche les analyses de qualité des données"""
     st.markdown("#### 📈 Analyse de la Qualité des Données")
+    fingerprint = fingerprint or dataframe_fingerprint(df)
+    profile = get_data_profile(df, fingerprint)
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        missing_pct = (df.isnull().sum().sum() / df.size) * 100
+        missing_pct = (profile.missing / profile.size) * 100 if profile.size else 0.0
         st.metric("Données manquantes", f"{missing_pct:.1f}%")
 
     with col2:
-        duplicate_rows = df.duplicated().sum()
-        st.metric("Lignes dupliquées", duplicate_rows)
+        st.metric("Lignes dupliquées", profile.duplicate_rows)
 
     with col3:
-        numeric_cols = len(df.select_dtypes(include=[np.number]).columns)
-        st.metric("Colonnes numériques", numeric_cols)
+        st.metric("Colonnes numériques", len(profile.numeric_columns))
 
     with col4:
-        zero_counts = (df.select_dtypes(include=[np.number]) == 0).sum().sum()
-        st.metric("Valeurs zéro", zero_counts)
+        st.metric("Valeurs zéro", int(profile.zero_counts.sum()))
 
     st.markdown("##### 🔍 Valeurs manquantes par colonne")
-    missing_by_col = df.isnull().sum().sort_values(ascending=False)
+    missing_by_col = profile.null_counts.sort_values(ascending=False)
     missing_by_col = missing_by_col[missing_by_col > 0]
 
     if len(missing_by_col) > 0:
@@ -1265,7 +4330,7 @@ def display_dashboard_item(item, idx):
             text_content = item.get('text', '')
             st.markdown(f"**Contenu:** {text_content[:200]}...")
 
-    data, info, item_type = st.session_state.client.get_item_data(item)
+    data, info, item_type = get_data_client().get_item_data(item)
     item_name = get_item_name(item, idx)
 
     if not data.empty:
@@ -1372,15 +4437,121 @@ def display_dashboard_card(dashboard, idx):
     """, unsafe_allow_html=True)
 
     if st.button("Ouvrir", key=f"open_{dashboard['id']}_{idx}", use_container_width=True):
+        get_dashboard_usage().record_open(st.session_state.client.base_url, st.session_state.client.username,
+                                          dashboard['id'])
+        scheduler = get_prefetch_scheduler()
+        if scheduler:
+            scheduler.cancel()
         with st.spinner("Chargement du dashboard..."):
-            details = st.session_state.client.get_dashboard_details(dashboard['id'])
+            details = (scheduler and scheduler.get_details(dashboard['id'])) \
+                or st.session_state.client.get_dashboard_details(dashboard['id'])
             if details:
                 details['is_owner'] = is_owner
                 details['owner_info'] = owner_info
                 details['item_types'] = get_dashboard_item_types(details.get('dashboardItems', []))
                 st.session_state.current_dashboard = details
+                st.session_state.snapshot_client = None
                 st.rerun()
 
+    snapshot = get_snapshot_store().find(st.session_state.client.base_url, st.session_state.client.username,
+                                         dashboard['id'])
+    if snapshot and st.button(f"⚡ Instantané du {snapshot['created_at'][:16].replace('T', ' ')}",
+                              key=f"open_snapshot_{dashboard['id']}_{idx}", use_container_width=True,
+                              help="Réouverture immédiate depuis l'instantané local, actualisé en arrière-plan"):
+        get_dashboard_usage().record_open(st.session_state.client.base_url, st.session_state.client.username,
+                                          dashboard['id'])
+        scheduler = get_prefetch_scheduler()
+        if scheduler:
+            scheduler.cancel()
+        open_snapshot(dashboard['id'], refresh=True)
+        st.rerun()
+
+
+def open_snapshot(dashboard_id, refresh=False):
+    """Ouvre un instantané local de l'utilisateur; l'actualise en arrière-plan si demandé et si le serveur est connecté"""
+    owner = get_snapshot_owner()
+    if owner is None:
+        return
+    store = get_snapshot_store()
+    manifest, dashboard, items = store.load(*owner, dashboard_id)
+    st.session_state.snapshot_client = SnapshotClient(manifest, items)
+    st.session_state.current_dashboard = dashboard
+
+    client = st.session_state.get('client')
+    if refresh and st.session_state.get('authenticated') and client and client.base_url == manifest['server']:
+        store.refresh_in_background(client, dashboard)
+
+
+def save_dashboard_snapshot(dashboard):
+    """Télécharge tous les éléments du dashboard et les enregistre dans un instantané local"""
+    items = dashboard.get('dashboardItems', [])
+    progress = st.progress(0.0, text=f"💾 Instantané de {len(items)} éléments...")
+
+    def on_item_done(idx, done, total):
+        progress.progress(done / total, text=f"💾 Élément {done}/{total} récupéré")
+
+    client = st.session_state.client
+    items_data = client.get_items_data(items, on_item_done=on_item_done)
+    path = get_snapshot_store().save(client.base_url, client.username, dashboard, items_data,
+                                     password=client.password)
+    progress.empty()
+    return path
+
+
+def display_snapshot_status(dashboard):
+    """Bandeau de l'instantané ouvert : date, actualisation en arrière-plan, rechargement"""
+    snapshot_client = st.session_state.get('snapshot_client')
+    if not snapshot_client:
+        return
+
+    store = get_snapshot_store()
+    manifest = snapshot_client.manifest
+    fallback_count = sum(1 for entry in manifest.get('items', []) if entry.get('fallback'))
+    st.info(f"📦 Instantané hors ligne du {manifest.get('created_at', '').replace('T', ' ')} "
+            f"({len(manifest.get('items', [])) - fallback_count} éléments)")
+    if fallback_count:
+        st.caption(f"⚠️ {fallback_count} élément(s) non enregistré(s): le serveur n'avait pas fourni leurs données")
+
+    status = store.get_refresh_status(manifest['path'])
+    online = st.session_state.get('authenticated') and st.session_state.get('client')
+    if status and status['state'] == 'running':
+        st.caption("🔄 Actualisation de l'instantané en arrière-plan...")
+    elif status and status['state'] == 'done':
+        if st.button("🔁 Afficher l'instantané actualisé", key="reload_snapshot"):
+            open_snapshot(manifest['dashboard_id'])
+            st.rerun()
+    elif status and status['state'] == 'error':
+        st.warning(f"⚠️ Actualisation impossible: {status['error']}")
+
+    if online and (not status or status['state'] != 'running'):
+        if st.button("🔄 Actualiser en arrière-plan", key="refresh_snapshot"):
+            store.refresh_in_background(st.session_state.client, dashboard)
+            st.rerun()
+
+
+def display_snapshot_list():
+    """Liste des instantanés de l'utilisateur dans la barre latérale (connecté ou déverrouillé hors ligne)"""
+    owner = get_snapshot_owner()
+    if owner is None:
+        return
+    store = get_snapshot_store()
+    snapshots = store.list_snapshots(*owner)
+
+    with st.expander(f"📦 Instantanés hors ligne ({len(snapshots)})"):
+        if not snapshots:
+            st.caption("Aucun instantané enregistré")
+        for snapshot in snapshots:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                label = f"📂 {snapshot['name']} — {snapshot['created_at'][:16].replace('T', ' ')}"
+                if st.button(label, key=f"sidebar_snapshot_{snapshot['path']}", use_container_width=True):
+                    open_snapshot(snapshot['dashboard_id'])
+                    st.rerun()
+            with col2:
+                if st.button("🗑️", key=f"delete_snapshot_{snapshot['path']}"):
+                    store.delete(*owner, snapshot['dashboard_id'])
+                    st.rerun()
+
 
 def display_selected_dashboard():
     """Affiche un dashboard sélectionné avec tous ses éléments"""
@@ -1404,14 +4575,32 @@ def display_selected_dashboard():
             st.markdown(f"**📝 Description:** {dashboard.get('description')}")
 
     with col2:
+        export_format = st.selectbox("Format d'export", list(DASHBOARD_EXPORT_FORMATS),
+                                     format_func=DASHBOARD_EXPORT_FORMATS.get,
+                                     key="export_all_format", label_visibility="collapsed")
         if st.button("📥 Exporter tout", use_container_width=True, help="Exporter tous les éléments du dashboard"):
-            export_all_dashboard_items(dashboard)
+            export_all_dashboard_items(dashboard, export_format)
 
     with col3:
+        if not st.session_state.get('snapshot_client') and st.session_state.get('authenticated'):
+            if st.button("💾 Instantané", use_container_width=True,
+                         help="Enregistrer le dashboard et ses données pour une réouverture hors ligne"):
+                save_dashboard_snapshot(dashboard)
+                st.success("Instantané enregistré")
+            if st.button("🔁 Revalider", use_container_width=True,
+                         help="Vérifier en une seule vague, par requêtes conditionnelles, que les données en cache sont à jour"):
+                with st.spinner("Revalidation des éléments..."):
+                    outcomes = st.session_state.client.revalidate_items(dashboard.get('dashboardItems', []))
+                st.success(" · ".join(f"{count} {outcome}" for outcome, count in outcomes.items())
+                           or "Aucun élément à revalider")
+
         if st.button("← Retour", use_container_width=True):
             st.session_state.current_dashboard = None
+            st.session_state.snapshot_client = None
             st.rerun()
 
+    display_snapshot_status(dashboard)
+
     # ... (le reste du code reste inchangé) ...
     # Métriques du dashboard
     items = dashboard.get('dashboardItems', [])
@@ -1463,40 +4652,46 @@ def display_all_dashboard_items(items):
         horizontal=True
     )
 
+    # Récupérer les données de tous les éléments en parallèle
+    visible_items = [(idx, item) for idx, item in enumerate(items) if has_visualizable_data(item)]
+    with st.spinner(f"📡 Chargement des données de {len(visible_items)} éléments..."):
+        items_data = get_data_client().get_items_data([item for _, item in visible_items])
+
     # Afficher tous les éléments
-    for idx, item in enumerate(items):
-        if has_visualizable_data(item):
-            if display_mode == "📋 Contenu complet":
-                display_item_full_content(item, idx)
-                st.markdown("---")
-            elif display_mode == "📊 Analyses seulement":
-                display_dashboard_item_with_transform(item, idx)
-                st.markdown("---")
-            elif display_mode == "📁 Données seulement":
-                display_data_only(item, idx)
-                st.markdown("---")
+    for (idx, item), item_data in zip(visible_items, items_data):
+        if display_mode == "📋 Contenu complet":
+            display_item_full_content(item, idx, item_data)
+            st.markdown("---")
+        elif display_mode == "📊 Analyses seulement":
+            display_dashboard_item_with_transform(item, idx, item_data)
+            st.markdown("---")
+        elif display_mode == "📁 Données seulement":
+            display_data_only(item, idx, item_data)
+            st.markdown("---")
 
     # Résumé
     st.markdown(f"**Total d'éléments affichés:** {len(items)}")
 
 
-def display_data_only(item, idx):
+def display_data_only(item, idx, item_data=None):
     """Affiche uniquement les données d'un élément"""
     item_name = get_item_name(item, idx)
 
     st.markdown(f"### 📊 Données: {item_name}")
 
     # Récupérer les données
-    data, info, item_type = st.session_state.client.get_item_data(item)
+    if item_data is None:
+        item_data = get_data_client().get_item_data(item)
+    data, info, item_type = item_data
 
     if not data.empty:
         st.info(info)
-        display_data_content(data)
+        display_data_content(data, key=f"data_only_{idx}_{item_name}")
     else:
         st.warning(f"⚠️ Aucune donnée disponible pour {item_name}")
 
 
-def display_item_full_content(item, idx):
+def display_item_full_content(item, idx, item_data=None):
     """Affiche le contenu complet d'un élément du dashboard"""
     item_name = get_item_name(item, idx)
     item_type = get_item_type(item)
@@ -1523,7 +4718,9 @@ def display_item_full_content(item, idx):
         display_other_content(item)
 
     # Récupérer et afficher les données
-    data, info, data_type = st.session_state.client.get_item_data(item)
+    if item_data is None:
+        item_data = get_data_client().get_item_data(item)
+    data, info, data_type = item_data
 
     if not data.empty:
         st.markdown("#### 📊 Données associées")
@@ -1531,7 +4728,7 @@ def display_item_full_content(item, idx):
 
         # Afficher les données
         with st.expander("📋 Voir les données", expanded=True):
-            display_data_content(data)
+            display_data_content(data, key=f"full_content_{idx}_{item_name}")
 
         # Options d'export
         display_export_options(data, item_name)
@@ -1705,105 +4902,249 @@ def display_other_content(item):
         st.json(item)
 
 
-def display_data_content(data):
+TABLE_FILTER_PATTERN = re.compile(r'^\s*(<=|>=|<|>|=|!=)\s*(-?\d+(?:[.,]\d+)?)\s*$')
+
+
+def compute_table_filter(column, text):
+    """Masque de filtrage d'une colonne (comparaison numérique « >= 10 » ou recherche de texte)"""
+    match = TABLE_FILTER_PATTERN.match(text)
+    if match and pd.api.types.is_numeric_dtype(column):
+        operator, number = match.group(1), float(match.group(2).replace(',', '.'))
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            return {
+                '<': values < number, '<=': values <= number, '>': values > number,
+                '>=': values >= number, '=': values == number, '!=': values != number
+            }[operator]
+    return column.astype(str).str.contains(text, case=False, regex=False, na=False).to_numpy()
+
+
+def compute_table_order(column, ascending):
+    """Positions des lignes triées selon une colonne (valeurs manquantes en fin)"""
+    values = pd.Series(column.to_numpy())
+    try:
+        ordered = values.sort_values(ascending=ascending, kind='stable', na_position='last')
+    except TypeError:
+        ordered = values.astype(str).sort_values(ascending=ascending, kind='stable')
+    return ordered.index.to_numpy()
+
+
+def get_table_index(key, fingerprint):
+    """Index de tri et de filtre d'un tableau, remis à zéro quand ses données changent"""
+    indexes = st.session_state.setdefault('table_indexes', OrderedDict())
+    state = indexes.get(key)
+    if state is None or state['fingerprint'] != fingerprint:
+        state = {'fingerprint': fingerprint, 'order': None, 'mask': None, 'view': None}
+    return state
+
+
+def store_table_index(key, state):
+    """Conserve l'index d'un tableau (LRU de la session borné par TABLE_INDEX_MAX_BYTES)"""
+    indexes = st.session_state.setdefault('table_indexes', OrderedDict())
+    # La vue réutilise souvent le tableau d'ordre: chaque tableau n'est compté qu'une fois
+    arrays = {id(part[1]): part[1] for part in (state['order'], state['mask'], state['view'])
+              if part is not None and part[1] is not None}
+    state['bytes'] = sum(array.nbytes for array in arrays.values())
+    indexes[key] = state
+    indexes.move_to_end(key)
+    total = sum(entry['bytes'] for entry in indexes.values())
+    while indexes and total > TABLE_INDEX_MAX_BYTES:
+        # Un index plus gros que tout le budget sert pour ce rerun puis est recalculé
+        total -= indexes.popitem(last=False)[1]['bytes']
+    st.session_state['table_index_bytes'] = total
+
+
+def display_paginated_table(data, key, page_size=TABLE_DEFAULT_PAGE_SIZE, fingerprint=None):
+    """Tableau paginé, triable et filtrable; seule la page visible est sérialisée"""
+    # Index de tri et de filtre conservés par tableau, recalculés seulement si les données ou les critères changent
+    state = get_table_index(key, fingerprint or dataframe_fingerprint(data))
+
+    columns = [str(col) for col in data.columns]
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+    with col1:
+        filter_col = st.selectbox("Filtrer la colonne", ["Aucun filtre"] + columns, key=f"{key}_filter_col")
+    with col2:
+        filter_text = st.text_input("Valeur (texte, ou > < = pour les nombres)", key=f"{key}_filter_text",
+                                    disabled=filter_col == "Aucun filtre")
+    with col3:
+        sort_col = st.selectbox("Trier par", ["Aucun tri"] + columns, key=f"{key}_sort_col")
+    with col4:
+        ascending = st.selectbox("Ordre", ["↑", "↓"], key=f"{key}_sort_order",
+                                 disabled=sort_col == "Aucun tri") == "↑"
+
+    filter_params = (filter_col, filter_text.strip()) if filter_col != "Aucun filtre" and filter_text.strip() else None
+    sort_params = (sort_col, ascending) if sort_col != "Aucun tri" else None
+
+    if state['view'] is None or state['view'][0] != (filter_params, sort_params):
+        positions = None
+        if sort_params:
+            if state['order'] is None or state['order'][0] != sort_params:
+                column = data.iloc[:, columns.index(sort_col)]
+                state['order'] = (sort_params, compute_table_order(column, ascending))
+            positions = state['order'][1]
+        if filter_params:
+            if state['mask'] is None or state['mask'][0] != filter_params:
+                column = data.iloc[:, columns.index(filter_col)]
+                state['mask'] = (filter_params, compute_table_filter(column, filter_params[1]))
+            mask = state['mask'][1]
+            positions = np.flatnonzero(mask) if positions is None else positions[mask[positions]]
+        state['view'] = ((filter_params, sort_params), positions)
+    store_table_index(key, state)
+    positions = state['view'][1]
+
+    total = len(data) if positions is None else len(positions)
+    size_col, page_col, info_col = st.columns([1, 1, 3])
+    with size_col:
+        default_size = TABLE_PAGE_SIZES.index(page_size) if page_size in TABLE_PAGE_SIZES else 0
+        rows_per_page = st.selectbox("Lignes par page", TABLE_PAGE_SIZES, index=default_size, key=f"{key}_page_size")
+    n_pages = max(1, -(-total // rows_per_page))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    start = (int(page) - 1) * rows_per_page
+    end = min(start + rows_per_page, total)
+    window = data.iloc[start:end] if positions is None else data.iloc[positions[start:end]]
+    with info_col:
+        filtered = f" (filtrées sur {len(data)})" if filter_params else ""
+        st.caption(f"Lignes {start + 1 if total else 0}–{end} sur {total}{filtered} · page {int(page)}/{n_pages}")
+
+    st.dataframe(window, use_container_width=True)
+
+
+def display_data_content(data, key="data_content"):
     """Affiche le contenu des données"""
+    fingerprint = frame_fingerprint(data)
+    profile = get_data_profile(data, fingerprint)
+
     # Informations générales
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Lignes", data.shape[0])
+        st.metric("Lignes", profile.n_rows)
     with col2:
-        st.metric("Colonnes", data.shape[1])
+        st.metric("Colonnes", profile.n_cols)
     with col3:
-        missing = data.isnull().sum().sum()
-        total = data.size
-        st.metric("Valeurs manquantes", f"{missing}/{total}")
+        st.metric("Valeurs manquantes", f"{profile.missing}/{profile.size}")
     with col4:
-        numeric_cols = len(data.select_dtypes(include=[np.number]).columns)
-        st.metric("Colonnes numériques", numeric_cols)
+        st.metric("Colonnes numériques", len(profile.numeric_columns))
 
     # Aperçu des données
     st.markdown("**Aperçu des données:**")
-    st.dataframe(data, use_container_width=True)
+    display_paginated_table(data, key, fingerprint=fingerprint)
 
     # Informations détaillées sur les colonnes
     with st.expander("📋 Informations sur les colonnes"):
-        col_info = []
-        for col in data.columns:
-            col_info.append({
-                'Colonne': col,
-                'Type': str(data[col].dtype),
-                'Valeurs uniques': data[col].nunique(),
-                'Valeurs manquantes': data[col].isnull().sum(),
-                'Première valeur': str(data[col].iloc[0]) if len(data) > 0 else '',
-                'Dernière valeur': str(data[col].iloc[-1]) if len(data) > 0 else ''
-            })
-        st.dataframe(pd.DataFrame(col_info), use_container_width=True)
+        st.dataframe(profile.column_info(), use_container_width=True)
 
     # Statistiques numériques
-    numeric_data = data.select_dtypes(include=[np.number])
-    if not numeric_data.empty:
+    if profile.numeric_columns and profile.n_rows:
         with st.expander("📊 Statistiques numériques"):
-            st.dataframe(numeric_data.describe(), use_container_width=True)
+            st.dataframe(profile.describe, use_container_width=True)
 
 
-def display_export_options(data, item_name):
-    """Affiche les options d'export des données"""
-    st.markdown("#### 📥 Options d'export")
+EXPORT_FORMATS = OrderedDict([
+    ('csv', ("📥 CSV", "csv", "text/csv")),
+    ('excel', ("📊 Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")),
+    ('json', ("📄 JSON", "json", "application/json"))
+])
+if PYARROW_AVAILABLE:
+    EXPORT_FORMATS['parquet'] = ("🧱 Parquet", "parquet", "application/vnd.apache.parquet")
+    EXPORT_FORMATS['feather'] = ("🪶 Feather", "arrow", "application/vnd.apache.arrow.file")
 
-    col1, col2, col3 = st.columns(3)
 
-    with col1:
-        # Export CSV
-        csv = data.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Télécharger CSV",
-            data=csv,
-            file_name=f"{clean_filename(item_name)}.csv",
-            mime="text/csv"
-        )
+def serialize_export(data, export_format):
+    """Sérialise un DataFrame dans le format d'export demandé"""
+    if export_format == 'csv':
+        return data.to_csv(index=False).encode('utf-8')
+    if export_format == 'excel':
+        from openpyxl import Workbook
 
-    with col2:
-        # Export Excel
-        try:
-            import io
-            from pandas import ExcelWriter
+        workbook = Workbook(write_only=True)
+        write_excel_frames(workbook, 'Données', data)
+        output = io.BytesIO()
+        workbook.save(output)
+        return output.getvalue()
+    if export_format in ('parquet', 'feather'):
+        # Les colonnes catégorielles deviennent des colonnes encodées par dictionnaire
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        output = io.BytesIO()
+        if export_format == 'parquet':
+            pq.write_table(table, output, compression='zstd')
+        else:
+            feather.write_feather(table, output, compression='zstd')
+        return output.getvalue()
+    return data.to_json(orient='records', force_ascii=False).encode('utf-8')
 
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                data.to_excel(writer, index=False, sheet_name='Données')
-            excel_data = output.getvalue()
 
-            st.download_button(
-                label="📊 Télécharger Excel",
-                data=excel_data,
-                file_name=f"{clean_filename(item_name)}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        except:
-            st.button("📊 Excel (non disponible)", disabled=True)
+def get_cached_export(fingerprint, export_format):
+    """Export déjà généré pour ces données et ce format, ou None"""
+    exports = st.session_state.setdefault('export_cache', OrderedDict())
+    key = (fingerprint, export_format)
+    if key in exports:
+        exports.move_to_end(key)
+        return exports[key]
+    return None
 
-    with col3:
-        # Export JSON
-        json_data = data.to_json(orient='records', force_ascii=False)
-        st.download_button(
-            label="📄 Télécharger JSON",
-            data=json_data.encode('utf-8'),
-            file_name=f"{clean_filename(item_name)}.json",
-            mime="application/json"
-        )
+
+def store_export(fingerprint, export_format, payload):
+    """Conserve un export généré (cache LRU de la session borné par EXPORT_CACHE_MAX_BYTES)"""
+    if len(payload) > EXPORT_CACHE_MAX_BYTES:
+        # Fichier plus gros que tout le budget: téléchargeable maintenant, régénéré à la prochaine demande
+        return
+    exports = st.session_state.setdefault('export_cache', OrderedDict())
+    key = (fingerprint, export_format)
+    total = st.session_state.get('export_cache_bytes', 0) + len(payload)
+    if key in exports:
+        total -= len(exports.pop(key))
+    exports[key] = payload
+    while exports and (total > EXPORT_CACHE_MAX_BYTES or len(exports) > EXPORT_CACHE_MAX_ENTRIES):
+        total -= len(exports.popitem(last=False)[1])
+    st.session_state['export_cache_bytes'] = total
+
+
+def display_export_options(data, item_name):
+    """Affiche les options d'export des données"""
+    st.markdown("#### 📥 Options d'export")
+
+    # Les fichiers ne sont générés qu'à la demande, puis conservés par empreinte des données et format
+    fingerprint = frame_fingerprint(data)
+    columns = st.columns(len(EXPORT_FORMATS))
+
+    for column, (export_format, (label, extension, mime)) in zip(columns, EXPORT_FORMATS.items()):
+        with column:
+            payload = get_cached_export(fingerprint, export_format)
+            if payload is None and st.button(f"{label} : préparer", key=f"prepare_{export_format}_{item_name}"):
+                try:
+                    with st.spinner(f"Génération du fichier {extension.upper()}..."):
+                        payload = serialize_export(data, export_format)
+                    store_export(fingerprint, export_format, payload)
+                except Exception:
+                    st.button(f"{label} (non disponible)", disabled=True,
+                              key=f"unavailable_{export_format}_{item_name}")
+            if payload is not None:
+                st.download_button(
+                    label=f"{label} : télécharger",
+                    data=payload,
+                    file_name=f"{clean_filename(item_name)}.{extension}",
+                    mime=mime,
+                    key=f"download_{export_format}_{item_name}"
+                )
 
     # Aperçu des données
     with st.expander("👁️ Aperçu des données exportées"):
         tab1, tab2, tab3 = st.tabs(["CSV", "JSON", "Tableau"])
+        preview = data.head(20)
 
         with tab1:
-            st.code(data.head(20).to_csv(index=False), language="csv")
+            st.code(preview.to_csv(index=False), language="csv")
 
         with tab2:
-            st.json(json.loads(json_data)[:10])  # Premier 10 enregistrements
+            st.json(json.loads(preview.head(10).to_json(orient='records', force_ascii=False)))  # Premier 10 enregistrements
 
         with tab3:
-            st.dataframe(data.head(20), use_container_width=True)
+            st.dataframe(preview, use_container_width=True)
 
 
 def clean_filename(filename):
@@ -1814,7 +5155,141 @@ def clean_filename(filename):
     # Limiter la longueur
     return cleaned[:50]
 
-def export_all_dashboard_items(dashboard):
+
+def excel_sheet_names(base_name, n_rows):
+    """Noms des feuilles d'un tableau, découpé au-delà de la limite de lignes d'Excel"""
+    n_parts = max(1, -(-n_rows // EXCEL_MAX_DATA_ROWS))
+    if n_parts == 1:
+        return [base_name[:31]]
+    return [f"{base_name[:25]}_{part}" for part in range(1, n_parts + 1)]
+
+
+def write_excel_sheet(workbook, sheet_name, data):
+    """Écrit un DataFrame dans une feuille d'un classeur openpyxl en écriture seule, par lots"""
+    sheet = workbook.create_sheet(title=sheet_name)
+    sheet.append([str(col) for col in data.columns])
+    for start in range(0, len(data), EXCEL_WRITE_BATCH):
+        block = data.iloc[start:start + EXCEL_WRITE_BATCH]
+        for row in block.astype(object).where(block.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+
+
+def write_excel_frames(workbook, base_name, data):
+    """Écrit un DataFrame sur autant de feuilles que nécessaire"""
+    for part, sheet_name in enumerate(excel_sheet_names(base_name, len(data))):
+        write_excel_sheet(workbook, sheet_name,
+                          data.iloc[part * EXCEL_MAX_DATA_ROWS:(part + 1) * EXCEL_MAX_DATA_ROWS])
+
+
+DASHBOARD_EXPORT_FORMATS = OrderedDict([('excel', "Excel")])
+if PYARROW_AVAILABLE:
+    DASHBOARD_EXPORT_FORMATS['parquet'] = "Parquet (zip)"
+    DASHBOARD_EXPORT_FORMATS['feather'] = "Feather (zip)"
+
+
+def remove_file_quietly(path):
+    """Supprime un fichier s'il existe encore"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class DashboardExportFile:
+    """Fichier d'export temporaire, supprimé à l'éviction, à la déconnexion ou à la disparition de la session"""
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.created_at = time.time()
+        # Appelé au plus une fois: par discard(), au ramassage de la session ou à l'arrêt du processus
+        self._remove = weakref.finalize(self, remove_file_quietly, path)
+
+    def is_fresh(self, key):
+        return self.key == key and os.path.exists(self.path) and time.time() - self.created_at < DATA_CACHE_TTL
+
+    def discard(self):
+        self._remove()
+
+
+def discard_dashboard_exports():
+    """Supprime les fichiers d'export de la session courante"""
+    exports = st.session_state.get('dashboard_exports') or {}
+    while exports:
+        exports.popitem()[1].discard()
+
+
+def discard_write_only_workbook(workbook):
+    """Ferme un classeur openpyxl en écriture seule abandonné et supprime les fichiers de travail de ses feuilles"""
+    for worksheet in workbook.worksheets:
+        writer = getattr(worksheet, '_writer', None)
+        if writer is None:
+            continue
+        try:
+            worksheet.close()
+        except Exception:
+            pass
+        # openpyxl ne supprime ces fichiers qu'à l'arrêt du processus
+        writer.cleanup()
+
+
+def build_dashboard_export(dashboard, metadata_df, export_items, export_format='excel', on_item_done=None):
+    """Export du dashboard écrit en flux dans un fichier temporaire; retourne son chemin
+
+    Excel : un classeur avec une feuille par élément. Parquet/Feather : une archive zip
+    contenant un fichier par élément et les métadonnées.
+    """
+    handle, path = tempfile.mkstemp(prefix=f"{clean_filename(dashboard.get('name', 'dashboard'))}_",
+                                    suffix='.xlsx' if export_format == 'excel' else '.zip')
+    os.close(handle)
+    output = None
+    try:
+        if export_format == 'excel':
+            from openpyxl import Workbook
+
+            output = workbook = Workbook(write_only=True)
+            write_excel_frames(workbook, 'Métadonnées', metadata_df)
+
+            def add_item(idx, data):
+                write_excel_frames(workbook, f"Élément_{idx + 1}", data)
+
+            def finish():
+                workbook.save(path)
+        else:
+            extension = EXPORT_FORMATS[export_format][1]
+            # Fichiers déjà compressés (zstd) : l'archive les stocke sans recompression
+            output = bundle = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED)
+            bundle.writestr(f"metadonnees.{extension}", serialize_export(metadata_df, export_format))
+
+            def add_item(idx, data):
+                bundle.writestr(f"element_{idx + 1:03d}.{extension}", serialize_export(data, export_format))
+
+            finish = bundle.close
+
+        # Les éléments sont écrits dans l'ordre du dashboard pendant que les suivants se téléchargent
+        items_data = get_data_client().iter_items_data([item for _, item in export_items])
+        for position, (data, _, _) in items_data:
+            idx = export_items[position][0]
+            if not data.empty:
+                add_item(idx, data)
+            if on_item_done:
+                on_item_done(position + 1, len(export_items))
+
+        finish()
+    except BaseException:
+        # Export interrompu (erreur, arrêt du script): ne laisser ni fichier partiel ni descripteur ouvert
+        if output is not None:
+            with contextlib.suppress(Exception):
+                if export_format == 'excel':
+                    discard_write_only_workbook(output)
+                else:
+                    output.close()
+        remove_file_quietly(path)
+        raise
+    return path
+
+
+def export_all_dashboard_items(dashboard, export_format='excel'):
     """Exporte tous les éléments du dashboard"""
     items = dashboard.get('dashboardItems', [])
 
@@ -1840,34 +5315,45 @@ def export_all_dashboard_items(dashboard):
 
     # Créer un fichier Excel avec plusieurs onglets
     try:
-        import io
-        from pandas import ExcelWriter
+        export_items = [(idx, item) for idx, item in enumerate(items) if has_visualizable_data(item)]
+
+        # Réutiliser le fichier déjà généré tant que le dashboard et le cache de données n'ont pas changé
+        exports = st.session_state.setdefault('dashboard_exports', OrderedDict())
+        export_key = (export_format, dashboard.get('lastUpdated'),
+                      tuple(get_item_id(item) for _, item in export_items))
+        previous = exports.get(dashboard.get('id'))
+        if previous and previous.is_fresh(export_key):
+            path = previous.path
+            exports.move_to_end(dashboard.get('id'))
+        else:
+            progress = st.progress(0.0, text=f"📡 Export de {len(export_items)} éléments...")
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Onglet métadonnées
-            metadata_df.to_excel(writer, index=False, sheet_name='Métadonnées')
-
-            # Onglets pour les données de chaque élément
-            for idx, item in enumerate(items):
-                if has_visualizable_data(item):
-                    data, _, _ = st.session_state.client.get_item_data(item)
-                    if not data.empty:
-                        sheet_name = f"Élément_{idx + 1}"
-                        if len(sheet_name) > 31:  # Limite Excel
-                            sheet_name = sheet_name[:31]
-                        data.to_excel(writer, index=False, sheet_name=sheet_name)
-
-        excel_data = output.getvalue()
+            def on_item_done(done, total):
+                progress.progress(done / total, text=f"📡 Élément {done}/{total} exporté")
+
+            path = build_dashboard_export(dashboard, metadata_df, export_items, export_format, on_item_done)
+            progress.empty()
+            if previous:
+                previous.discard()
+            exports[dashboard.get('id')] = DashboardExportFile(path, export_key)
+            while len(exports) > EXPORT_CACHE_MAX_ENTRIES:
+                exports.popitem(last=False)[1].discard()
 
         # Téléchargement
         dashboard_name = clean_filename(dashboard.get('name', 'dashboard'))
-        st.download_button(
-            label="📥 Télécharger l'export complet",
-            data=excel_data,
-            file_name=f"{dashboard_name}_export_complet.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        if export_format == 'excel':
+            file_name = f"{dashboard_name}_export_complet.xlsx"
+            mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        else:
+            file_name = f"{dashboard_name}_export_complet_{export_format}.zip"
+            mime = "application/zip"
+        with open(path, 'rb') as export_file:
+            st.download_button(
+                label="📥 Télécharger l'export complet",
+                data=export_file,
+                file_name=file_name,
+                mime=mime
+            )
 
         st.success(f"Prêt à exporter {len(items)} éléments")
 
@@ -1887,10 +5373,12 @@ def has_visualizable_data(item):
     return False
 
 
-def display_dashboard_item_with_transform(item, idx):
+def display_dashboard_item_with_transform(item, idx, item_data=None):
     """Affiche un élément du dashboard avec toutes ses transformations"""
     # Récupérer les données
-    data, info, item_type = st.session_state.client.get_item_data(item)
+    if item_data is None:
+        item_data = get_data_client().get_item_data(item)
+    data, info, item_type = item_data
     item_name = get_item_name(item, idx)
 
     # Afficher l'en-tête de l'élément
@@ -1908,7 +5396,7 @@ def display_dashboard_item_with_transform(item, idx):
     if not data.empty:
         # Afficher les données brutes
         with st.expander("📊 Données brutes", expanded=False):
-            display_raw_data(data)
+            display_raw_data(data, key=f"raw_{idx}_{item_name}")
 
         # Afficher les transformations disponibles
         if len(data) > 0:
@@ -1963,25 +5451,18 @@ def display_item_details(item):
         st.markdown(f"```\n{text_content}\n```")
 
 
-def display_raw_data(data):
+def display_raw_data(data, key="raw_data"):
     """Affiche les données brutes"""
     st.markdown(f"**Dimensions:** {data.shape[0]} lignes × {data.shape[1]} colonnes")
 
-    # Afficher un aperçu des données
-    st.dataframe(data.head(100), use_container_width=True)
-
-    if len(data) > 100:
-        st.info(f"Affiche les 100 premières lignes sur {len(data)} au total")
+    # Afficher les données page par page
+    fingerprint = frame_fingerprint(data)
+    display_paginated_table(data, key, fingerprint=fingerprint)
 
     # Afficher les informations sur les colonnes
     with st.expander("📋 Informations sur les colonnes"):
-        col_info = pd.DataFrame({
-            'Colonne': data.columns,
-            'Type': data.dtypes.values,
-            'Valeurs uniques': [data[col].nunique() for col in data.columns],
-            'Valeurs manquantes': [data[col].isnull().sum() for col in data.columns],
-            'Exemple': [str(data[col].iloc[0]) if len(data) > 0 else '' for col in data.columns]
-        })
+        col_info = get_data_profile(data, fingerprint).column_info()
+        col_info = col_info.drop(columns=['Dernière valeur']).rename(columns={'Première valeur': 'Exemple'})
         st.dataframe(col_info, use_container_width=True)
 
 
@@ -2004,7 +5485,7 @@ def display_data_transformations(data, item_name):
 
     with col2:
         if st.button("📊 Statistiques résumées", key=f"stats_{item_name}"):
-            display_summary_statistics(data)
+            display_summary_statistics(data, frame_fingerprint(data))
 
     with col3:
         if st.button("🎨 Visualisations rapides", key=f"quick_viz_{item_name}"):
@@ -2019,7 +5500,7 @@ def display_data_transformations(data, item_name):
     )
 
     if filter_col != "Aucun filtre":
-        if data[filter_col].dtype == 'object' or data[filter_col].nunique() < 20:
+        if not pd.api.types.is_numeric_dtype(data[filter_col]) or data[filter_col].nunique() < 20:
             unique_values = data[filter_col].dropna().unique()
             selected_values = st.multiselect(
                 f"Sélectionner les valeurs de {filter_col}",
@@ -2030,7 +5511,9 @@ def display_data_transformations(data, item_name):
             if selected_values:
                 filtered_data = data[data[filter_col].isin(selected_values)]
                 st.info(f"Filtré: {len(filtered_data)} lignes sur {len(data)}")
-                st.dataframe(filtered_data.head(50), use_container_width=True)
+                display_paginated_table(filtered_data, key=f"filtered_{item_name}", page_size=50,
+                                        fingerprint=derived_fingerprint(frame_fingerprint(data), 'isin',
+                                                                        filter_col, selected_values))
         else:
             min_val = float(data[filter_col].min())
             max_val = float(data[filter_col].max())
@@ -2044,35 +5527,36 @@ def display_data_transformations(data, item_name):
                 (data[filter_col] <= selected_range[1])
                 ]
             st.info(f"Filtré: {len(filtered_data)} lignes sur {len(data)}")
-            st.dataframe(filtered_data.head(50), use_container_width=True)
+            display_paginated_table(filtered_data, key=f"filtered_{item_name}", page_size=50,
+                                    fingerprint=derived_fingerprint(frame_fingerprint(data), 'range',
+                                                                    filter_col, selected_range))
 
 
-def display_summary_statistics(data):
+def display_summary_statistics(data, fingerprint=None):
     """Affiche les statistiques résumées"""
     st.markdown("##### 📊 Statistiques résumées")
 
+    profile = get_data_profile(data, fingerprint)
+
     # Statistiques pour les colonnes numériques
-    numeric_cols = data.select_dtypes(include=[np.number]).columns
-    if len(numeric_cols) > 0:
+    if profile.numeric_columns:
         st.markdown("**Colonnes numériques:**")
-        numeric_stats = data[numeric_cols].describe().T
+        numeric_stats = profile.describe.T
         numeric_stats['type'] = 'numérique'
         st.dataframe(numeric_stats, use_container_width=True)
 
-    # Statistiques pour les colonnes catégorielles
-    categorical_cols = data.select_dtypes(exclude=[np.number]).columns
-    if len(categorical_cols) > 0:
+    # Statistiques pour les colonnes catégorielles (profil limité aux faibles cardinalités)
+    if profile.categorical_columns:
         st.markdown("**Colonnes catégorielles:**")
         cat_stats = []
-        for col in categorical_cols:
-            if data[col].nunique() < 50:  # Éviter les colonnes avec trop de valeurs uniques
-                cat_stats.append({
-                    'colonne': col,
-                    'type': 'catégorielle',
-                    'valeurs_uniques': data[col].nunique(),
-                    'valeur_plus_fréquente': data[col].mode().iloc[0] if len(data[col].mode()) > 0 else None,
-                    'fréquence_valeur_plus_fréquente': data[col].value_counts().iloc[0] if len(data[col]) > 0 else 0
-                })
+        for col, (top_value, top_count) in profile.top_values.items():
+            cat_stats.append({
+                'colonne': col,
+                'type': 'catégorielle',
+                'valeurs_uniques': profile.n_unique[col],
+                'valeur_plus_fréquente': top_value,
+                'fréquence_valeur_plus_fréquente': top_count
+            })
         if cat_stats:
             st.dataframe(pd.DataFrame(cat_stats), use_container_width=True)
 
@@ -2093,7 +5577,7 @@ def display_quick_visualizations(data, item_name):
 
     if viz_type == "Histogramme" and numeric_cols:
         col = st.selectbox("Colonne numérique", numeric_cols, key=f"hist_{item_name}")
-        fig = px.histogram(data, x=col, nbins=30, title=f"Histogramme de {col}")
+        fig = make_histogram_chart(data, col, 30, title=f"Histogramme de {col}")
         st.plotly_chart(fig, use_container_width=True)
 
     elif viz_type == "Nuage de points" and len(numeric_cols) >= 2:
@@ -2105,16 +5589,14 @@ def display_quick_visualizations(data, item_name):
         else:
             color_col = "Aucun"
 
-        if color_col != "Aucun":
-            fig = px.scatter(data, x=col1, y=col2, color=color_col, title=f"{col2} vs {col1}")
-        else:
-            fig = px.scatter(data, x=col1, y=col2, title=f"{col2} vs {col1}")
+        fig = make_scatter_chart(data, col1, col2, title=f"{col2} vs {col1}",
+                                 color=color_col if color_col != "Aucun" else None)
         st.plotly_chart(fig, use_container_width=True)
 
     elif viz_type == "Boîte à moustaches" and numeric_cols and categorical_cols:
         num_col = st.selectbox("Colonne numérique", numeric_cols, key=f"box_num_{item_name}")
         cat_col = st.selectbox("Colonne catégorielle", categorical_cols, key=f"box_cat_{item_name}")
-        fig = px.box(data, x=cat_col, y=num_col, title=f"Boîte à moustaches de {num_col} par {cat_col}")
+        fig = make_box_chart(data, num_col, x=cat_col, title=f"Boîte à moustaches de {num_col} par {cat_col}")
         st.plotly_chart(fig, use_container_width=True)
 
     elif viz_type == "Graphique en barres" and categorical_cols:
@@ -2129,7 +5611,7 @@ def display_quick_visualizations(data, item_name):
             bar_data.columns = [cat_col, 'count']
             fig = px.bar(bar_data, x=cat_col, y='count', title=f"Nombre par {cat_col}")
         else:
-            bar_data = data.groupby(cat_col)[value_col].mean().reset_index()
+            bar_data = data.groupby(cat_col, observed=True)[value_col].mean().reset_index()
             fig = px.bar(bar_data, x=cat_col, y=value_col, title=f"Moyenne de {value_col} par {cat_col}")
         st.plotly_chart(fig, use_container_width=True)
 
@@ -2141,10 +5623,10 @@ def display_quick_visualizations(data, item_name):
             x_col = st.selectbox("Axe X (temporel)", date_cols, key=f"line_x_{item_name}")
             y_col = st.selectbox("Axe Y (valeur)", numeric_cols, key=f"line_y_{item_name}")
             try:
-                temp_data = data.copy()
+                temp_data = data[[x_col, y_col]].copy()
                 temp_data[x_col] = pd.to_datetime(temp_data[x_col])
                 temp_data = temp_data.sort_values(x_col)
-                fig = px.line(temp_data, x=x_col, y=y_col, title=f"Évolution de {y_col}")
+                fig = make_line_chart(temp_data, x_col, y_col, title=f"Évolution de {y_col}")
                 st.plotly_chart(fig, use_container_width=True)
             except:
                 st.warning("Impossible de créer un graphique en ligne avec ces colonnes")
@@ -2170,6 +5652,9 @@ def display_dashboard_by_type(items, item_types):
         tab_names.append("🔧 Autres")
 
     if tab_names:
+        with st.spinner(f"📡 Chargement des données de {len(items)} éléments..."):
+            items_data = get_data_client().get_items_data(items)
+
         tabs = st.tabs(tab_names)
 
         tab_index = 0
@@ -2181,7 +5666,7 @@ def display_dashboard_by_type(items, item_types):
                     for idx, item in enumerate(items):
                         if ('visualization' in item and item['visualization'] and
                                 item['visualization'].get('id') == viz['id']):
-                            display_dashboard_item_with_transform(item, idx)
+                            display_dashboard_item_with_transform(item, idx, items_data[idx])
                             st.markdown("---")
                             break
             tab_index += 1
@@ -2193,7 +5678,7 @@ def display_dashboard_by_type(items, item_types):
                     for idx, item in enumerate(items):
                         if ('chart' in item and item['chart'] and
                                 item['chart'].get('id') == chart['id']):
-                            display_dashboard_item_with_transform(item, idx)
+                            display_dashboard_item_with_transform(item, idx, items_data[idx])
                             st.markdown("---")
                             break
             tab_index += 1
@@ -2205,7 +5690,7 @@ def display_dashboard_by_type(items, item_types):
                     for idx, item in enumerate(items):
                         if ('map' in item and item['map'] and
                                 item['map'].get('id') == map_item['id']):
-                            display_dashboard_item_with_transform(item, idx)
+                            display_dashboard_item_with_transform(item, idx, items_data[idx])
                             st.markdown("---")
                             break
             tab_index += 1
@@ -2216,7 +5701,7 @@ def display_dashboard_by_type(items, item_types):
                 for text_item in item_types['texts']:
                     for idx, item in enumerate(items):
                         if 'text' in item and item.get('text') == text_item['content']:
-                            display_dashboard_item_with_transform(item, idx)
+                            display_dashboard_item_with_transform(item, idx, items_data[idx])
                             st.markdown("---")
                             break
             tab_index += 1
@@ -2227,7 +5712,7 @@ def display_dashboard_by_type(items, item_types):
                 for idx, item in enumerate(items):
                     item_type = get_item_type(item)
                     if item_type not in ['visualization', 'chart', 'map', 'text']:
-                        display_dashboard_item_with_transform(item, idx)
+                        display_dashboard_item_with_transform(item, idx, items_data[idx])
                         st.markdown("---")
     else:
         st.info("Aucun élément à afficher")
@@ -2289,8 +5774,8 @@ def display_all_dashboards():
     # Initialisation des variables de session si nécessaire
     if 'all_dashboards_complete' not in st.session_state:
         st.session_state.all_dashboards_complete = []
-    if 'last_search_query' not in st.session_state:
-        st.session_state.last_search_query = ''
+    if 'dashboard_catalogue' not in st.session_state:
+        st.session_state.dashboard_catalogue = DashboardCatalogue()
 
     # Section de recherche et filtres
     with st.container():
@@ -2318,27 +5803,27 @@ def display_all_dashboards():
                 key="sort_select"
             )
 
-    # Bouton de recherche
-    col1, col2 = st.columns([1, 5])
-    with col1:
-        if st.button("Rechercher", use_container_width=True):
-            st.session_state.search_query = search_query
-            st.rerun()
+    st.session_state.search_query = search_query
 
     # Récupération des dashboards
-    if (not st.session_state.all_dashboards_complete or
-            st.session_state.search_query != st.session_state.last_search_query):
+    if not st.session_state.all_dashboards_complete:
 
         with st.spinner("📡 Chargement des dashboards..."):
             try:
-                dashboards = st.session_state.client.get_all_dashboards_complete(
-                    st.session_state.search_query
-                )
+                lightweight = st.session_state.get('lightweight_listing', True)
+                catalogue = st.session_state.dashboard_catalogue
+
+                # Synchronisation incrémentale du catalogue local
+                dashboards = st.session_state.client.sync_dashboards(catalogue, lightweight=lightweight)
                 st.session_state.all_dashboards_complete = dashboards
-                st.session_state.last_search_query = st.session_state.search_query
 
                 if dashboards:
-                    st.success(f"✅ {len(dashboards)} dashboards chargés")
+                    sync_stats = catalogue.last_sync_stats
+                    if sync_stats.get('mode') == 'incrémentale':
+                        st.success(f"✅ {len(dashboards)} dashboards | Synchronisation: "
+                                   f"{sync_stats['changed']} modifié(s), {sync_stats['deleted']} supprimé(s)")
+                    else:
+                        st.success(f"✅ {len(dashboards)} dashboards chargés")
                 else:
                     st.warning("⚠️ Aucun dashboard trouvé")
 
@@ -2348,6 +5833,18 @@ def display_all_dashboards():
     else:
         dashboards = st.session_state.all_dashboards_complete
 
+    # Recherche locale, sans appel réseau
+    if dashboards and search_query.strip():
+        search_index = st.session_state.get('dashboard_search_index')
+        if search_index is None or search_index.dashboards is not dashboards:
+            search_index = DashboardSearchIndex(dashboards)
+            st.session_state.dashboard_search_index = search_index
+
+        search_started = time.perf_counter()
+        dashboards = search_index.search(search_query)
+        st.caption(f"🔍 {len(dashboards)} résultat(s) en "
+                   f"{(time.perf_counter() - search_started) * 1000:.1f} ms")
+
     # Filtrage des dashboards
     if dashboards:
         filtered_dashboards = []
@@ -2391,6 +5888,11 @@ def display_all_dashboards():
                     display_dashboard_card(dashboard, idx)
 
             st.markdown('</div>', unsafe_allow_html=True)
+
+            # Précharger en arrière-plan les dashboards susceptibles d'être ouverts
+            scheduler = get_prefetch_scheduler()
+            if scheduler:
+                scheduler.schedule(filtered_dashboards)
         else:
             st.info("Aucun dashboard ne correspond aux critères de filtrage")
     else:
@@ -2403,6 +5905,102 @@ def display_all_dashboards():
             st.rerun()
 
 
+def display_performance_stats():
+    """Affiche les compteurs de cache et de repli dans la barre latérale"""
+    cache_stats = get_data_cache().get_stats()
+
+    with st.expander("🗄️ Cache des données"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Hits", cache_stats['hits'])
+            st.metric("Entrées", cache_stats['entries'])
+        with col2:
+            st.metric("Misses", cache_stats['misses'])
+            st.metric("Taux de hit", f"{cache_stats['hit_rate']:.0f}%")
+        if cache_stats['disk_hits']:
+            st.caption(f"Dont {cache_stats['disk_hits']} depuis le disque")
+        if cache_stats['revalidations']:
+            st.caption(f"{cache_stats['revalidations']} revalidation(s) 304 sans retransfert")
+
+        # Le cache est partagé entre les sessions: on ne retire que les entrées de l'utilisateur courant
+        client = st.session_state.client
+        if client and st.button("🗑️ Vider mon cache", use_container_width=True):
+            get_data_cache().clear_user(client.base_url, client.username)
+            st.rerun()
+
+    listing_stats = st.session_state.client.listing_stats if st.session_state.client else {}
+    if listing_stats:
+        with st.expander("📦 Chargement du catalogue"):
+            for mode, mode_stats in listing_stats.items():
+                st.markdown(f"**Mode {mode}**")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Taille", f"{mode_stats['bytes'] / 1024:.0f} KB")
+                with col2:
+                    # Les premières cartes s'affichent dès la première page reçue
+                    st.metric("Première page", f"{mode_stats['first_page_seconds']:.2f} s")
+                st.caption(f"{mode_stats['dashboards']} dashboards en {mode_stats['seconds']:.2f} s")
+
+    transport_stats = get_transport_metrics().get_stats()
+    client = st.session_state.client
+    if transport_stats['endpoints'] or client:
+        with st.expander("⏱️ Latence HTTP"):
+            if client:
+                breaker = get_circuit_breaker(client.base_url)
+                icon = {CircuitBreaker.CLOSED: "🟢", CircuitBreaker.HALF_OPEN: "🟡"}.get(breaker.state, "🔴")
+                st.markdown(f"{icon} Disjoncteur {breaker.state}")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Reprises", transport_stats['retries'])
+            with col2:
+                st.metric("Échecs", transport_stats['failures'])
+            with col3:
+                st.metric("Rejetées", transport_stats['rejected'])
+
+            labels = get_transport_metrics().bucket_labels()
+            for endpoint, endpoint_stats in transport_stats['endpoints'].items():
+                st.markdown(f"**{endpoint}** · {endpoint_stats['count']} requêtes · "
+                            f"p50 ≤ {endpoint_stats['p50']:g} s · p95 ≤ {endpoint_stats['p95']:g} s")
+                fig = go.Figure(go.Bar(x=labels, y=endpoint_stats['counts']))
+                fig.update_layout(height=160, margin=dict(l=0, r=0, t=0, b=0))
+                st.plotly_chart(fig, use_container_width=True, key=f"latency_{endpoint}")
+
+    heaviest = get_payload_stats().heaviest(client.base_url, client.username) if client else []
+    if heaviest:
+        with st.expander("🏋️ Éléments les plus lourds"):
+            totals = get_payload_stats().totals(client.base_url, client.username)
+            st.caption(f"{totals['wire_bytes'] / 1024:.0f} KB reçus pour {totals['decoded_bytes'] / 1024:.0f} KB "
+                       f"décompressés sur {totals['requests']} réponse(s) · "
+                       f"décodage {totals['decode_seconds'] * 1000:.0f} ms")
+            st.dataframe(pd.DataFrame({
+                'Élément': [entry['name'] for entry in heaviest],
+                'Réseau (KB)': [round(entry['wire_bytes'] / 1024, 1) for entry in heaviest],
+                'Décompressé (KB)': [round(entry['decoded_bytes'] / 1024, 1) for entry in heaviest],
+                'Décodage (ms)': [round(entry['decode_seconds'] * 1000) for entry in heaviest],
+                'Encodage': [entry['encoding'] for entry in heaviest],
+                'Requêtes': [entry['requests'] for entry in heaviest]
+            }), hide_index=True, use_container_width=True)
+            st.caption("Moyennes par réponse; les éléments en tête sont ceux à alléger en priorité")
+
+    scheduler = st.session_state.get('prefetch_scheduler')
+    if scheduler:
+        with st.expander("⏩ Préchargement"):
+            st.markdown("🔄 En cours" if scheduler.is_running() else "⏸️ Inactif")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Dashboards", scheduler.dashboards_done)
+            with col2:
+                st.metric("Éléments", scheduler.items_done)
+            st.caption(f"{scheduler.bytes_fetched / 1024:.0f} KB téléchargés "
+                       f"(limite {scheduler.bytes_per_second / 1024:.0f} KB/s)")
+
+    endpoint_stats = get_endpoint_registry().get_stats()
+    with st.expander("🔀 Endpoints de données"):
+        st.metric("Requêtes de repli évitées", endpoint_stats['fallbacks_avoided'])
+        st.metric("Replis effectués", endpoint_stats['fallbacks_used'])
+        st.caption(f"{endpoint_stats['known_types']} type(s) de visualisation mémorisé(s)")
+
+
 def main():
     st.markdown('<h1 class="main-header">📊 DHIS2 Dashboard Viewer - Analyses Complètes</h1>', unsafe_allow_html=True)
 
@@ -2428,12 +6026,21 @@ def main():
 
         username = st.text_input("Nom d'utilisateur", key="username")
         password = st.text_input("Mot de passe", type="password", key="password")
+        use_async_client = st.checkbox(
+            "Client asynchrone (HTTP/2)" if HTTP2_AVAILABLE else "Client asynchrone",
+            key="use_async_client",
+            disabled=not HTTPX_AVAILABLE,
+            help="Requêtes concurrentes sur une boucle asyncio avec pool de connexions (nécessite httpx)"
+        )
 
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Se connecter", key="login_btn", use_container_width=True, type="primary"):
                 with st.spinner("Connexion..."):
-                    client = DHIS2Client(base_url, username, password)
+                    if use_async_client and HTTPX_AVAILABLE:
+                        client = SyncDHIS2Client(AsyncDHIS2Client(base_url, username, password))
+                    else:
+                        client = DHIS2Client(base_url, username, password)
                     success, user_info = client.test_connection()
 
                     if success:
@@ -2442,22 +6049,38 @@ def main():
                         st.session_state.user_info = user_info
 
                         st.session_state.all_dashboards_complete = []
-                        st.session_state.last_search_query = ''
+                        st.session_state.dashboard_catalogue = DashboardCatalogue()
                         st.session_state.search_query = ''
 
                         st.success(f"✅ Connecté: {user_info.get('name', username)}")
                         st.rerun()
                     else:
+                        client.close()
                         st.error("❌ Échec de connexion")
 
         with col2:
             if st.button("Déconnexion", key="logout_btn", use_container_width=True):
+                if st.session_state.get('prefetch_scheduler'):
+                    st.session_state.prefetch_scheduler.cancel()
+                if st.session_state.get('client'):
+                    st.session_state.client.close()
+                discard_dashboard_exports()
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
                 st.session_state.authenticated = False
                 st.session_state.search_query = ''
                 st.rerun()
 
+        if not st.session_state.authenticated and not st.session_state.get('offline_owner'):
+            if st.button("📦 Accès hors ligne", key="offline_btn", use_container_width=True,
+                         help="Ouvrir vos instantanés sans joindre le serveur (mot de passe vérifié localement)"):
+                server = base_url.rstrip('/')
+                if username and password and get_snapshot_store().unlock(server, username, password):
+                    st.session_state.offline_owner = (server, username)
+                    st.rerun()
+                else:
+                    st.error("❌ Aucun instantané accessible avec ces identifiants")
+
         if st.session_state.authenticated and st.session_state.user_info:
             st.markdown("---")
             user = st.session_state.user_info
@@ -2470,7 +6093,33 @@ def main():
                 st.session_state.all_dashboards_complete = []
                 st.rerun()
 
-    if not st.session_state.authenticated:
+            st.checkbox(
+                "Liste allégée des dashboards",
+                value=True,
+                key="lightweight_listing",
+                help="Ne télécharge que les champs affichés sur les cartes",
+                on_change=lambda: st.session_state.update(all_dashboards_complete=[],
+                                                          dashboard_catalogue=DashboardCatalogue())
+            )
+
+            st.number_input(
+                "Points max. par graphique",
+                min_value=500,
+                max_value=200000,
+                value=CHART_POINT_BUDGET,
+                step=500,
+                key="chart_point_budget",
+                help="Au-delà, les graphiques sont réduits (LTTB, échantillons, histogrammes et boîtes pré-calculés, densité)"
+            )
+
+            display_performance_stats()
+
+        st.markdown("---")
+        display_snapshot_list()
+
+    offline_dashboard = (st.session_state.get('offline_owner') and st.session_state.get('snapshot_client')
+                         and st.session_state.current_dashboard)
+    if not st.session_state.authenticated and not offline_dashboard:
         st.markdown("""
         <div style='text-align: center; padding: 40px;'>
             <h2>Bienvenue sur DHIS2 Dashboard Viewer - Analyses Complètes</h2>
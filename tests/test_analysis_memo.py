@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def clean_memo():
+    for key in ('analysis_memo', 'analysis_memo_bytes'):
+        st.session_state.pop(key, None)
+    yield
+
+
+def test_fingerprint_sees_every_row():
+    df = pd.DataFrame({'a': np.arange(10000, dtype=float), 'b': ['x'] * 10000})
+    changed = df.copy()
+    changed.loc[4321, 'a'] += 1
+    changed.loc[4322, 'a'] -= 1  # même somme, ligne hors de tout échantillon
+    assert main.dataframe_fingerprint(df) != main.dataframe_fingerprint(changed)
+
+    swapped = df.copy()
+    swapped.loc[1, 'b'], swapped.loc[2, 'b'] = 'y', 'x'
+    assert main.dataframe_fingerprint(df) != main.dataframe_fingerprint(swapped)
+
+
+def test_fingerprint_includes_index_and_unhashable_cells():
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    assert main.dataframe_fingerprint(df) != main.dataframe_fingerprint(df.set_axis([3, 4, 5]))
+    listy = pd.DataFrame({'a': [[1], [2]]})
+    assert main.dataframe_fingerprint(listy) == main.dataframe_fingerprint(listy.copy())
+
+
+def test_memo_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(main, 'ANALYSIS_MEMO_MAX_BYTES', 3 * 8000 + 1000)
+    frames = {i: pd.DataFrame({'v': np.zeros(1000)}) for i in range(5)}
+    for i, frame in frames.items():
+        assert main.memoize_analysis('fp', 'tab', (i,), lambda frame=frame: frame) is frame
+
+    memo = st.session_state['analysis_memo']
+    assert [key[2] for key in memo] == [(2,), (3,), (4,)]
+    assert st.session_state['analysis_memo_bytes'] == sum(size for _, size in memo.values())
+    assert st.session_state['analysis_memo_bytes'] <= main.ANALYSIS_MEMO_MAX_BYTES
+
+
+def test_memo_skips_results_larger_than_budget(monkeypatch):
+    monkeypatch.setattr(main, 'ANALYSIS_MEMO_MAX_BYTES', 1000)
+    main.memoize_analysis('fp', 'small', (), lambda: 1)
+    big = main.memoize_analysis('fp', 'big', (), lambda: np.zeros(1000))
+    assert big.shape == (1000,)
+    assert [key[1] for key in st.session_state['analysis_memo']] == ['small']
+
+
+def test_frame_fingerprint_is_computed_once_per_fetched_frame(monkeypatch):
+    calls = []
+    full_hash = main.dataframe_fingerprint
+    monkeypatch.setattr(main, 'dataframe_fingerprint', lambda df: calls.append(len(df)) or full_hash(df))
+
+    client = main.DHIS2Client.__new__(main.DHIS2Client)
+    viz_data = {'frame': pd.DataFrame({'periode': ['202401', '202402', '202403'], 'valeur': [1.0, 2.0, 3.0]})}
+    fetched, _ = client._parse_visualization_data(viz_data, "Cas")
+    assert calls == [3]
+
+    # Copie servie par le cache à chaque rerun: l'empreinte voyage dans attrs
+    served = fetched.copy()
+    assert main.frame_fingerprint(served) == main.frame_fingerprint(fetched) == full_hash(fetched)
+    assert calls == [3]
+
+
+def test_frame_fingerprint_ignores_fingerprint_inherited_by_derived_frames():
+    df = pd.DataFrame({'a': np.arange(6), 'b': list('xyzxyz')})
+    fingerprint = main.frame_fingerprint(df)
+
+    filtered = df[df['a'] > 2]
+    assert filtered.attrs.get('fingerprint') is not None
+    assert main.frame_fingerprint(filtered) == main.dataframe_fingerprint(filtered) != fingerprint
+
+    renamed = df.rename(columns={'b': 'c'})
+    assert main.frame_fingerprint(renamed) == main.dataframe_fingerprint(renamed) != fingerprint
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+import main
+
+
+def test_text_columns_are_not_coerced_to_numbers():
+    headers = [
+        {'name': 'code', 'valueType': 'TEXT'},
+        {'name': 'raw'},
+        {'name': 'value', 'valueType': 'NUMBER'},
+    ]
+    rows = [['007', '1', '1.5'], ['012', '2', '2.5'], ['100', '3', '']]
+    df = main.build_analytics_frame(headers, rows)
+
+    assert not pd.api.types.is_numeric_dtype(df['code'])
+    assert list(df['code'].astype(str)) == ['007', '012', '100']
+    assert pd.api.types.is_numeric_dtype(df['raw'])
+    assert df['value'].dtype == np.float64 and np.isnan(df['value'].iloc[2])
+
+
+def test_unknown_column_with_text_stays_text():
+    values = main.convert_analytics_column(['1', 'a', '2'], 'unknown')
+    assert not pd.api.types.is_numeric_dtype(pd.Series(values))
@@ -0,0 +1,540 @@
+import asyncio
+import gzip
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+import main
+
+pytest.importorskip('httpx')
+
+N_DASHBOARDS = 230
+N_ITEMS = 12
+
+
+def make_dashboard(i, last_updated='2024-01-01T00:00:00.000'):
+    return {'id': f'd{i:03d}', 'name': f'Dashboard {i:03d}', 'lastUpdated': last_updated,
+            'user': {'id': 'u1' if i % 3 else 'u2'}}
+
+
+def matches_filter(dashboard, expression):
+    """Filtres de l'API utilisés par les clients (lastUpdated:gt:, name:ilike:)"""
+    field, operator, value = expression.split(':', 2)
+    if operator == 'gt':
+        return dashboard.get(field, '') > value
+    return value.lower() in dashboard.get(field, '').lower()
+
+
+class FakeDHIS2Handler(BaseHTTPRequestHandler):
+    """Sous-ensemble de l'API DHIS2 utilisé par les clients, avec mesure de la concurrence"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.requests[urlparse(self.path).path] += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+        finally:
+            # Décompté avant l'envoi: un client qui a tout reçu peut déjà réutiliser son jeton
+            with server.lock:
+                server.in_flight -= 1
+        self._respond()
+
+    def _respond(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path in self.server.bodies:
+            return self._send(self.server.bodies[url.path])
+        if url.path == '/api/me':
+            body = {'id': 'u1', 'name': 'Utilisateur test'}
+        elif url.path == '/api/dashboards' and query.get('fields') == ['id']:
+            body = {'dashboards': [{'id': dashboard['id']} for dashboard in self.server.dashboards.values()]}
+        elif url.path == '/api/dashboards':
+            page = int(query.get('page', ['1'])[0])
+            size = int(query.get('pageSize', ['50'])[0])
+            listed = sorted((dashboard for dashboard in self.server.dashboards.values()
+                             if all(matches_filter(dashboard, f) for f in query.get('filter', []))),
+                            key=lambda dashboard: dashboard['name'])
+            body = {
+                'pager': {'page': page, 'pageCount': -(-len(listed) // size), 'total': len(listed)},
+                'dashboards': [dict(dashboard, dashboardItems=[]) for dashboard in listed[(page - 1) * size:page * size]]
+            }
+        elif url.path.startswith('/api/dashboards/'):
+            dashboard_id = url.path.rsplit('/', 1)[-1]
+            body = {
+                'id': dashboard_id, 'name': f'Dashboard {dashboard_id}',
+                'dashboardItems': [
+                    {'id': f'i{k}', 'visualization': {'id': f'v{k}', 'name': f'Visualisation {k}', 'type': 'PIVOT_TABLE'}}
+                    for k in range(N_ITEMS)
+                ] + [{'id': 'txt', 'type': 'TEXT', 'text': 'Bonjour'}]
+            }
+        elif url.path.startswith('/api/visualizations/') and url.path.endswith('/data.json'):
+            visualization_id = url.path.split('/')[-2]
+            version = self.server.versions.get(visualization_id, 0)
+            etag = f'"{visualization_id}-{version}"'
+            if self.headers.get('If-None-Match') == etag:
+                with self.server.lock:
+                    self.server.not_modified += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            body = {
+                'headers': [{'name': 'dx', 'meta': True}, {'name': 'pe', 'meta': True},
+                            {'name': 'value', 'valueType': 'NUMBER'}],
+                'metaData': {'items': {visualization_id: {'name': f'Indicateur {visualization_id}'}}},
+                'rows': [[visualization_id, f'2023{m % 12 + 1:02d}', str(m * 1.5 + version)] for m in range(300)],
+                'width': 3, 'height': 300,
+            }
+            return self._send(json.dumps(body).encode(), etag)
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        self._send(json.dumps(body).encode())
+
+    def _send(self, payload, etag=None):
+        path = urlparse(self.path).path
+        with self.server.lock:
+            drop = self.server.drops.get(path, 0)
+            if drop:
+                self.server.drops[path] = drop - 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if etag:
+            self.send_header('ETag', etag)
+        if self.server.gzip and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            payload = gzip.compress(payload, mtime=0)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        # Connexion coupée au milieu du corps annoncé
+        self.wfile.write(payload[:len(payload) // 2] if drop else payload)
+
+
+@pytest.fixture
+def dhis2_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeDHIS2Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    server.requests = Counter()
+    server.latency = 0.0
+    # Corps pré-sérialisés par chemin (grandes réponses)
+    server.bodies = {}
+    # Nombre de réponses à interrompre en cours de corps, par chemin
+    server.drops = {}
+    server.gzip = False
+    # Version des données par visualisation (ETag) et réponses 304 servies
+    server.versions = {}
+    server.not_modified = 0
+    server.dashboards = {dashboard['id']: dashboard for dashboard in map(make_dashboard, range(N_DASHBOARDS))}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_clients(server, suffix):
+    # Utilisateurs distincts: aucune réponse partagée par le cache de données
+    url = base_url(server)
+    sync_client = main.DHIS2Client(url, f'sync-{suffix}', 'secret')
+    async_client = main.SyncDHIS2Client(main.AsyncDHIS2Client(url, f'async-{suffix}', 'secret'))
+    return sync_client, async_client
+
+
+def test_async_adapter_matches_sync_client(dhis2_server):
+    sync_client, async_client = make_clients(dhis2_server, 'parity')
+    try:
+        assert sync_client.test_connection() == async_client.test_connection()
+
+        dashboards = sync_client.get_all_dashboards_complete()
+        assert len(dashboards) == N_DASHBOARDS
+        assert dashboards == async_client.get_all_dashboards_complete()
+        assert sync_client.get_dashboard_ids() == async_client.get_dashboard_ids()
+
+        details = sync_client.get_dashboard_details('d007')
+        assert details == async_client.get_dashboard_details('d007')
+
+        items = details['dashboardItems']
+        expected = sync_client.get_items_data(items)
+        actual = async_client.get_items_data(items)
+        assert len(expected) == len(actual) == N_ITEMS + 1
+        for (expected_df, expected_info, expected_type), (df, info, item_type) in zip(expected, actual):
+            pd.testing.assert_frame_equal(df, expected_df)
+            assert (info, item_type) == (expected_info, expected_type)
+    finally:
+        async_client.close()
+
+
+def test_adapters_share_one_event_loop(dhis2_server):
+    threads_before = {t.name for t in threading.enumerate()}
+    first = main.SyncDHIS2Client(main.AsyncDHIS2Client(base_url(dhis2_server), 'a', 'secret'))
+    second = main.SyncDHIS2Client(main.AsyncDHIS2Client(base_url(dhis2_server), 'b', 'secret'))
+    try:
+        assert first._loop is second._loop is main.get_async_loop()
+        assert first.test_connection()[0] and second.test_connection()[0]
+    finally:
+        first.close()
+        second.close()
+
+    # Fermer un client ne doit pas arrêter la boucle des autres sessions
+    assert main.get_async_loop().is_running()
+    new_threads = {t.name for t in threading.enumerate()} - threads_before
+    assert sum(name == 'dhis2-async' for name in new_threads) <= 1
+
+
+def test_async_and_sync_clients_share_the_server_budget(dhis2_server, monkeypatch):
+    url = base_url(dhis2_server)
+    budget = 3
+    monkeypatch.setitem(main._server_semaphores, url, main.threading.BoundedSemaphore(budget))
+    dhis2_server.latency = 0.02
+
+    sync_client, async_client = make_clients(dhis2_server, 'budget')
+    other_async = main.SyncDHIS2Client(main.AsyncDHIS2Client(url, 'async-budget-2', 'secret'))
+    items = [{'id': f'i{k}', 'visualization': {'id': f'v{k}', 'name': f'V{k}', 'type': 'PIVOT_TABLE'}}
+             for k in range(N_ITEMS)]
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            runs = [executor.submit(client.get_items_data, items)
+                    for client in (sync_client, async_client, other_async)]
+            results = [run.result() for run in runs]
+    finally:
+        async_client.close()
+        other_async.close()
+
+    assert all(len(result) == N_ITEMS for result in results)
+    assert all(item_type != 'Erreur' for result in results for _, _, item_type in result)
+    assert 1 < dhis2_server.max_in_flight <= budget
+
+
+def test_held_slot_is_not_acquired_twice(dhis2_server, monkeypatch):
+    url = base_url(dhis2_server)
+    semaphore = main.threading.BoundedSemaphore(1)
+    monkeypatch.setitem(main._server_semaphores, url, semaphore)
+    client = main.SyncDHIS2Client(main.AsyncDHIS2Client(url, 'prefetch', 'secret'))
+    try:
+        # Comme le préchargement: l'appelant détient l'unique jeton pendant la requête
+        assert semaphore.acquire(timeout=1)
+        client._throttle.holds_server_slot = True
+        try:
+            future, _ = client._submit(client.async_client.test_connection)
+            assert future.result(timeout=5)[0]
+        finally:
+            client._throttle.holds_server_slot = False
+            semaphore.release()
+    finally:
+        client.close()
+
+
+def test_async_errors_are_rendered_on_the_calling_session_thread(dhis2_server, monkeypatch):
+    shown = []
+    monkeypatch.setattr(main.st, 'error', lambda message: shown.append((threading.current_thread().name, message)))
+    client = main.SyncDHIS2Client(main.AsyncDHIS2Client(base_url(dhis2_server), 'errors', 'secret'))
+    both_started = threading.Barrier(2)
+
+    async def failing(tag):
+        main.report_async_error(f"erreur {tag}")
+        # Les deux tâches sont entrelacées sur la boucle partagée
+        await asyncio.get_running_loop().run_in_executor(None, both_started.wait)
+        return tag
+
+    def session(tag):
+        assert client._run(failing, tag) == tag
+
+    threads = [threading.Thread(target=session, args=(tag,), name=f"session-{tag}") for tag in 'ab']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert sorted(shown) == [('session-a', 'erreur a'), ('session-b', 'erreur b')]
+
+
+def large_visualization_body(n_rows):
+    return json.dumps({
+        'headers': [{'name': 'dx', 'meta': True}, {'name': 'ou', 'meta': True},
+                    {'name': 'value', 'valueType': 'NUMBER'}],
+        'metaData': {'items': {}},
+        'rows': [[f'dx{i % 40}', f'ou{i % 3000}', str(i * 0.5)] for i in range(n_rows)],
+        'width': 3, 'height': n_rows,
+    }).encode()
+
+
+def test_large_decode_does_not_stall_other_sessions(dhis2_server):
+    dhis2_server.bodies['/api/visualizations/big/data.json'] = large_visualization_body(300000)
+    url = base_url(dhis2_server)
+    heavy = main.SyncDHIS2Client(main.AsyncDHIS2Client(url, 'heavy', 'secret'))
+    light = main.SyncDHIS2Client(main.AsyncDHIS2Client(url, 'light', 'secret'))
+    try:
+        assert light.test_connection()[0]
+        result = {}
+
+        def load_big():
+            started = time.perf_counter()
+            result['data'] = heavy.get_visualization_data('big', 'Grande visualisation', 'PIVOT_TABLE')[0]
+            result['seconds'] = time.perf_counter() - started
+
+        loader = threading.Thread(target=load_big)
+        loader.start()
+        latencies = []
+        while loader.is_alive():
+            started = time.perf_counter()
+            assert light.test_connection()[0]
+            latencies.append(time.perf_counter() - started)
+        loader.join()
+    finally:
+        heavy.close()
+        light.close()
+
+    data = result['data']
+    assert len(data) == 300000 and data['value'].iloc[-1] == 299999 * 0.5
+    # Décodage hors de la boucle: l'autre session reste servie pendant tout le chargement
+    # (sur la boucle, chaque lot de lignes décodé la bloquait: une dizaine de requêtes par seconde)
+    median = sorted(latencies)[len(latencies) // 2]
+    assert len(latencies) >= 20
+    assert median < result['seconds'] / 20
+
+
+def test_body_cut_mid_stream_is_retried_and_counted_as_a_failure(dhis2_server):
+    sync_client, async_client = make_clients(dhis2_server, 'drop')
+    metrics = main.get_transport_metrics()
+    item = {'id': 'i3', 'visualization': {'id': 'v3', 'name': 'Visualisation 3', 'type': 'PIVOT_TABLE'}}
+    path = '/api/visualizations/v3/data.json'
+    try:
+        for client in (sync_client, async_client):
+            dhis2_server.drops[path] = 1
+            failures, retries = metrics.failures, metrics.retries
+            data, info, _ = client.get_item_data(item)
+            assert dhis2_server.drops[path] == 0
+            # Données réelles après reprise, pas de données de repli
+            assert info.startswith("Données récupérées (300 lignes)") and len(data) == 300
+            assert (metrics.failures, metrics.retries) == (failures + 1, retries + 1)
+    finally:
+        async_client.close()
+
+
+def test_prefetch_bandwidth_is_charged_in_wire_bytes(dhis2_server):
+    dhis2_server.gzip = True
+    path = '/api/visualizations/v5/data.json'
+    payload = large_visualization_body(2000)
+    dhis2_server.bodies[path] = payload
+    wire_bytes = len(gzip.compress(payload, mtime=0))
+    assert wire_bytes < len(payload) // 3
+
+    sync_client, async_client = make_clients(dhis2_server, 'wire')
+    item = {'id': 'i5', 'visualization': {'id': 'v5', 'name': 'Visualisation 5', 'type': 'PIVOT_TABLE'}}
+    try:
+        for client in (sync_client, async_client):
+            limiter = client._throttle.limiter = main.BandwidthLimiter(10 ** 9)
+            data, _, _ = client.get_item_data(item)
+            assert len(data) == 2000
+            assert limiter.total_bytes == wire_bytes
+    finally:
+        async_client.close()
+
+
+# Revalidation des données en cache (ETag, 304)
+
+def expired_cache(**kwargs):
+    # Entrées toujours expirées: chaque lecture passe par une requête conditionnelle
+    return main.DataCache(ttl=0, stale_ttl=3600, **kwargs)
+
+
+@pytest.fixture(params=['sync', 'async'])
+def make_revalidating_client(request, dhis2_server):
+    opened = []
+
+    def make(cache):
+        url = base_url(dhis2_server)
+        username = f'{request.param}-revalidate'
+        if request.param == 'sync':
+            client = main.DHIS2Client(url, username, 'secret')
+            client.cache = cache
+        else:
+            client = main.SyncDHIS2Client(main.AsyncDHIS2Client(url, username, 'secret'))
+            client.async_client.cache = cache
+            opened.append(client)
+        return client
+
+    yield make
+    for client in opened:
+        client.close()
+
+
+def visualization_items(*visualization_ids):
+    return [{'id': f'i-{vid}', 'visualization': {'id': vid, 'name': f'Visualisation {vid}', 'type': 'PIVOT_TABLE'}}
+            for vid in visualization_ids]
+
+
+def test_not_modified_reuses_the_stale_frame(make_revalidating_client, dhis2_server):
+    cache = expired_cache()
+    client = make_revalidating_client(cache)
+    first, info = client.get_visualization_data('v1', 'Visualisation 1')
+    assert info.startswith("Données récupérées")
+
+    again, again_info = client.get_visualization_data('v1', 'Visualisation 1')
+    assert dhis2_server.not_modified == 1 and cache.revalidations == 1
+    pd.testing.assert_frame_equal(again, first)
+    assert again_info == info
+
+
+def test_changed_data_replaces_the_cache_entry(make_revalidating_client, dhis2_server):
+    cache = expired_cache()
+    client = make_revalidating_client(cache)
+    first, _ = client.get_visualization_data('v1', 'Visualisation 1')
+
+    dhis2_server.versions['v1'] = 1
+    changed, _ = client.get_visualization_data('v1', 'Visualisation 1')
+    assert not changed.equals(first)
+    assert dhis2_server.not_modified == 0 and cache.revalidations == 0
+
+    (cached, _), validators = cache.get_stale(cache.make_key(client.base_url, client.username, 'visualization', 'v1'))
+    pd.testing.assert_frame_equal(cached, changed)
+    assert validators['etag'] == '"v1-1"'
+
+
+def test_unreachable_server_serves_stale_data_not_synthetic_data(make_revalidating_client, dhis2_server,
+                                                                 monkeypatch):
+    monkeypatch.setattr(main, 'retry_delay', lambda attempt, retry_after=None: 0)
+    monkeypatch.setitem(main._circuit_breakers, base_url(dhis2_server), main.CircuitBreaker())
+    client = make_revalidating_client(expired_cache())
+    first, info = client.get_visualization_data('v1', 'Visualisation 1')
+
+    dhis2_server.shutdown()
+    dhis2_server.server_close()
+    stale, stale_info = client.get_visualization_data('v1', 'Visualisation 1')
+    pd.testing.assert_frame_equal(stale, first)
+    assert stale_info == info
+
+
+def test_revalidate_items_counts_each_outcome(make_revalidating_client, dhis2_server):
+    client = make_revalidating_client(expired_cache())
+    items = visualization_items('v0', 'v1', 'v2', 'v3')
+    client.get_items_data(items)
+
+    dhis2_server.versions['v2'] = 1
+    assert client.revalidate_items(items + [{'id': 'txt', 'type': 'TEXT', 'text': 'Bonjour'}]) == \
+        {'inchangé': 3, 'modifié': 1}
+    assert dhis2_server.not_modified == 3
+
+
+def test_disk_cache_without_validators_column_is_migrated(make_revalidating_client, dhis2_server, tmp_path):
+    disk_path = str(tmp_path / 'data_cache.sqlite')
+    client = make_revalidating_client(expired_cache())
+    key = client.cache.make_key(client.base_url, client.username, 'visualization', 'v1')
+    # Base écrite par une version sans validateurs HTTP
+    with sqlite3.connect(disk_path) as conn:
+        conn.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, stored_at REAL, value BLOB)")
+        conn.execute("INSERT INTO entries VALUES (?, ?, ?)",
+                     (key, time.time(), pickle.dumps((pd.DataFrame({'ancien': [1]}), "Ancien"))))
+
+    client = make_revalidating_client(expired_cache(disk_path=disk_path))
+    with sqlite3.connect(disk_path) as conn:
+        assert 'validators' in [column[1] for column in conn.execute("PRAGMA table_info(entries)")]
+    fresh, info = client.get_visualization_data('v1', 'Visualisation 1')
+    assert info.startswith("Données récupérées") and dhis2_server.not_modified == 0
+
+    # Nouveau processus: les validateurs sont relus sur disque et la requête devient conditionnelle
+    client = make_revalidating_client(expired_cache(disk_path=disk_path))
+    again, _ = client.get_visualization_data('v1', 'Visualisation 1')
+    assert dhis2_server.not_modified == 1
+    pd.testing.assert_frame_equal(again, fresh)
+
+
+# Synchronisation incrémentale du catalogue
+
+def test_sync_dashboards_applies_changes_additions_and_deletions(dhis2_server):
+    sync_client, async_client = make_clients(dhis2_server, 'catalogue')
+    try:
+        for client in (sync_client, async_client):
+            dhis2_server.dashboards = {d['id']: d for d in map(make_dashboard, range(N_DASHBOARDS))}
+            catalogue = main.DashboardCatalogue()
+            assert len(client.sync_dashboards(catalogue)) == N_DASHBOARDS
+            assert catalogue.last_sync_stats['mode'] == 'complète'
+
+            dashboards = dhis2_server.dashboards
+            dashboards['d005'] = dict(dashboards['d005'], name='Dashboard 005 (révisé)',
+                                      lastUpdated='2024-02-01T08:00:00.000')
+            dashboards['d999'] = make_dashboard(999, '2024-02-02T09:30:00.000')
+            del dashboards['d010']
+
+            listed = client.sync_dashboards(catalogue)
+            assert catalogue.last_sync_stats == {'mode': 'incrémentale', 'changed': 2, 'deleted': 1}
+            assert catalogue.last_updated == '2024-02-02T09:30:00.000'
+            assert listed == client.get_all_dashboards_complete()
+            assert client.listing_stats['incrémental']['dashboards'] == 2
+
+            client.sync_dashboards(catalogue)
+            assert catalogue.last_sync_stats == {'mode': 'incrémentale', 'changed': 0, 'deleted': 0}
+            assert catalogue.to_list() == listed
+    finally:
+        async_client.close()
+
+
+# Choix de l'endpoint de données
+
+def test_endpoint_registry_prefers_the_endpoint_that_answered(dhis2_server, tmp_path):
+    sync_client, async_client = make_clients(dhis2_server, 'endpoints')
+    try:
+        for client in (sync_client, async_client):
+            registry = main.EndpointRegistry(path=str(tmp_path / f'{client.username}.json'))
+            getattr(client, 'async_client', client).endpoints = registry
+            dhis2_server.requests.clear()
+
+            # Type inconnu: l'endpoint EVENT (absent ici) est essayé d'abord, puis data.json
+            client.get_visualization_data('v1', 'Visualisation 1', 'PIVOT_TABLE')
+            assert dhis2_server.requests['/api/visualizations/v1/data'] == 1
+            assert registry.get(client.base_url, 'PIVOT_TABLE') == main.EndpointRegistry.DATA_JSON
+            assert (registry.fallbacks_used, registry.fallbacks_avoided) == (1, 0)
+
+            # Même type: data.json directement, le détour est évité
+            client.get_visualization_data('v2', 'Visualisation 2', 'PIVOT_TABLE')
+            assert dhis2_server.requests['/api/visualizations/v2/data'] == 0
+            assert (registry.fallbacks_used, registry.fallbacks_avoided) == (1, 1)
+
+            # Autre type: nouvelle découverte
+            client.get_visualization_data('v3', 'Visualisation 3', 'COLUMN')
+            assert dhis2_server.requests['/api/visualizations/v3/data'] == 1
+            assert registry.fallbacks_used == 2
+
+            reloaded = main.EndpointRegistry(path=registry.path)
+            assert reloaded.get(client.base_url, 'PIVOT_TABLE') == main.EndpointRegistry.DATA_JSON
+            assert reloaded.get(client.base_url, 'COLUMN') == main.EndpointRegistry.DATA_JSON
+            assert reloaded.get(client.base_url, 'MAP') is None
+    finally:
+        async_client.close()
+
+
+def test_listing_stats_time_the_first_page_separately(dhis2_server):
+    dhis2_server.latency = 0.05
+    sync_client, async_client = make_clients(dhis2_server, 'listing')
+    try:
+        for client in (sync_client, async_client):
+            assert len(client.get_all_dashboards_complete()) == N_DASHBOARDS
+            stats = client.listing_stats['allégé']
+            # Deux pages de 200: la seconde n'est demandée qu'après la première
+            assert dhis2_server.latency <= stats['first_page_seconds'] < stats['seconds']
+            assert stats['seconds'] - stats['first_page_seconds'] >= dhis2_server.latency
+    finally:
+        async_client.close()
@@ -0,0 +1,112 @@
+import main
+
+
+def dashboard(dashboard_id, name, last_updated):
+    return {'id': dashboard_id, 'name': name, 'lastUpdated': last_updated}
+
+
+def full_catalogue():
+    catalogue = main.DashboardCatalogue()
+    catalogue.replace([
+        dashboard('a', "Paludisme", '2024-01-03T10:00:00.000'),
+        dashboard('b', "Vaccination", '2024-01-05T10:00:00.000'),
+        dashboard('c', "Nutrition", '2024-01-04T10:00:00.000'),
+    ])
+    return catalogue
+
+
+def test_replace_sets_watermark_and_sorts_by_name():
+    catalogue = full_catalogue()
+    assert catalogue.last_updated == '2024-01-05T10:00:00.000'
+    assert [d['id'] for d in catalogue.to_list()] == ['c', 'a', 'b']
+    assert catalogue.last_sync_stats == {'mode': 'complète', 'changed': 3, 'deleted': 0}
+
+
+def test_merge_applies_changed_added_and_deleted_dashboards():
+    catalogue = full_catalogue()
+    catalogue.merge(
+        [dashboard('a', "Paludisme (révisé)", '2024-02-01T08:00:00.000'),
+         dashboard('d', "Écoles", '2024-02-02T08:00:00.000')],
+        existing_ids=['a', 'c', 'd']
+    )
+    assert {d['id']: d['name'] for d in catalogue.to_list()} == {
+        'a': "Paludisme (révisé)", 'c': "Nutrition", 'd': "Écoles"
+    }
+    assert catalogue.last_updated == '2024-02-02T08:00:00.000'
+    assert catalogue.last_sync_stats == {'mode': 'incrémentale', 'changed': 2, 'deleted': 1}
+
+
+def test_merge_without_id_list_keeps_everything_and_never_moves_watermark_back():
+    catalogue = full_catalogue()
+    # Liste des identifiants indisponible: aucune suppression déduite
+    catalogue.merge([dashboard('c', "Nutrition", '2023-12-01T00:00:00.000')], existing_ids=None)
+    assert len(catalogue.to_list()) == 3
+    assert catalogue.last_updated == '2024-01-05T10:00:00.000'
+    assert catalogue.last_sync_stats['deleted'] == 0
+
+
+# Recherche
+
+SEARCH_DASHBOARDS = [
+    {'id': 'd1', 'name': "Paludisme - Thiès", 'description': "Cas confirmés par district",
+     'user': {'name': "Aïssatou Ndiaye"},
+     'dashboardItems': [{'visualization': {'name': "Incidence hebdomadaire"}}]},
+    {'id': 'd2', 'name': "Vaccination PEV", 'description': "Couverture DTC3 et rougeole",
+     'user': {'name': "Moussa Diop"},
+     'dashboardItems': [{'chart': {'name': "Abandons Penta1-Penta3"}}, {'map': {'name': "Couverture régionale"}}]},
+    {'id': 'd3', 'name': "Santé maternelle", 'description': "",
+     'user': {'name': "Fatou Sène"}, 'dashboardItems': [{'text': "Consultations prénatales"}]},
+    {'id': 'd4', 'name': "Nutrition Kédougou", 'description': "Malnutrition aiguë sévère"},
+]
+
+
+def found(index, query):
+    return [d['id'] for d in index.search(query)]
+
+
+def test_search_ignores_accents_and_case():
+    index = main.DashboardSearchIndex(SEARCH_DASHBOARDS)
+    assert found(index, "thies") == found(index, "THIÈS") == ['d1']
+    assert found(index, "sante") == ['d3']
+    assert found(index, "kédougou") == found(index, "kedougou") == ['d4']
+    assert found(index, "aissatou") == ['d1']
+
+
+def test_search_matches_prefixes_and_substrings():
+    index = main.DashboardSearchIndex(SEARCH_DASHBOARDS)
+    assert found(index, "vacc") == ['d2']
+    assert found(index, "pe") == ['d2']
+    # Sous-chaîne au milieu d'un mot (trigrammes), y compris dans les noms d'éléments
+    assert found(index, "nutri") == ['d4']
+    assert found(index, "utrition") == ['d4']
+    assert found(index, "hebdo") == ['d1']
+    assert found(index, "regionale") == ['d2']
+    # Deux lettres: préfixe uniquement
+    assert found(index, "ut") == []
+
+
+def test_search_requires_every_term_and_keeps_catalogue_order():
+    index = main.DashboardSearchIndex(SEARCH_DASHBOARDS)
+    assert found(index, "couverture") == ['d2']
+    assert found(index, "ma") == ['d3', 'd4']
+    assert found(index, "ma sévère") == ['d4']
+    assert found(index, "paludisme rougeole") == []
+    assert found(index, "  ") == ['d1', 'd2', 'd3', 'd4']
+    # Le texte libre des éléments n'est pas indexé
+    assert found(index, "prénatales") == []
+
+
+def test_search_agrees_with_a_linear_scan():
+    index = main.DashboardSearchIndex(SEARCH_DASHBOARDS)
+    documents = [main.DashboardSearchIndex._TOKEN_PATTERN.findall(
+        main.normalize_search_text(main.DashboardSearchIndex._document(d))) for d in SEARCH_DASHBOARDS]
+
+    def term_matches(term, tokens):
+        return any(token.startswith(term) or (len(term) >= 3 and term in token) for token in tokens)
+
+    vocabulary = sorted({token for tokens in documents for token in tokens})
+    queries = [token[start:start + length] for token in vocabulary
+               for start in range(len(token)) for length in (2, 3, 5) if start + length <= len(token)]
+    for query in queries:
+        expected = [d['id'] for d, tokens in zip(SEARCH_DASHBOARDS, documents) if term_matches(query, tokens)]
+        assert found(index, query) == expected, query
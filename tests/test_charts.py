@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+import main
+
+BUDGET = 500
+
+
+@pytest.fixture(autouse=True)
+def point_budget():
+    st.session_state['chart_point_budget'] = BUDGET
+    yield
+    st.session_state.pop('chart_point_budget', None)
+
+
+def scatter_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'x': rng.normal(size=n), 'y': rng.normal(size=n),
+                         'groupe': pd.Categorical(rng.choice(['A', 'B', 'C'], n))})
+
+
+def points_sent(fig):
+    return sum(len(trace.x) for trace in fig.data if trace.type in ('scatter', 'scattergl') and trace.mode != 'lines')
+
+
+@pytest.mark.parametrize('n', [BUDGET // 2, BUDGET + 1, 4 * BUDGET, main.SCATTER_DENSITY_FACTOR * BUDGET])
+def test_scatter_never_sends_more_than_the_budget(n):
+    fig = main.make_scatter_chart(scatter_frame(n), 'x', 'y', "Nuage", color='groupe')
+    assert points_sent(fig) == min(n, BUDGET)
+
+
+def test_sampled_scatter_keeps_extremes_and_is_reproducible():
+    data = scatter_frame(3 * BUDGET)
+    data.loc[7, 'x'] = np.nan
+    keep = main.scatter_sample_indices(data['x'].to_numpy(), data['y'].to_numpy(), BUDGET)
+    assert len(keep) == BUDGET and 7 not in keep
+    for column in ('x', 'y'):
+        assert data[column].idxmin() in keep and data[column].idxmax() in keep
+    np.testing.assert_array_equal(keep, main.scatter_sample_indices(data['x'].to_numpy(), data['y'].to_numpy(),
+                                                                    BUDGET))
+
+
+def test_very_large_scatter_becomes_a_density_map():
+    n = main.SCATTER_DENSITY_FACTOR * BUDGET + 1
+    fig = main.make_scatter_chart(scatter_frame(n), 'x', 'y', "Nuage")
+    assert [trace.type for trace in fig.data] == ['heatmap']
+    assert np.nansum(fig.data[0].z) == n
+    assert np.size(fig.data[0].z) <= 2 * BUDGET
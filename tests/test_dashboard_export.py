@@ -0,0 +1,104 @@
+import gc
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+import main
+
+
+class FakeDataClient:
+    """Client de données qui renvoie des frames fixes et peut échouer au milieu de l'export"""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+
+    def iter_items_data(self, items):
+        for position, item in enumerate(items):
+            if position == self.fail_at:
+                raise RuntimeError("connexion perdue")
+            yield position, (pd.DataFrame({'ou': ['A', 'B'], 'value': [1.0, 2.0]}), "ok", "PIVOT_TABLE")
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.tempfile, 'tempdir', str(tmp_path))
+    return tmp_path
+
+
+def export_args():
+    items = [(idx, {'id': f'i{idx}', 'visualization': {'id': f'v{idx}'}}) for idx in range(3)]
+    metadata = pd.DataFrame({'index': [1, 2, 3], 'nom': ['a', 'b', 'c']})
+    return {'name': 'Paludisme'}, metadata, items
+
+
+FORMATS = ['excel'] + (['parquet', 'feather'] if main.PYARROW_AVAILABLE else [])
+
+
+@pytest.mark.parametrize('export_format', FORMATS)
+def test_export_is_written_completely(export_dir, monkeypatch, export_format):
+    monkeypatch.setattr(main, 'get_data_client', lambda: FakeDataClient())
+    path = main.build_dashboard_export(*export_args(), export_format=export_format)
+    assert os.path.dirname(path) == str(export_dir)
+    if export_format == 'excel':
+        assert pd.read_excel(path, sheet_name=None).keys() >= {'Métadonnées', 'Élément_1', 'Élément_3'}
+    else:
+        with zipfile.ZipFile(path) as bundle:
+            assert len(bundle.namelist()) == 4
+
+
+@pytest.mark.parametrize('export_format', FORMATS)
+def test_failed_export_leaves_no_file(export_dir, monkeypatch, export_format):
+    monkeypatch.setattr(main, 'get_data_client', lambda: FakeDataClient(fail_at=2))
+    with pytest.raises(RuntimeError):
+        main.build_dashboard_export(*export_args(), export_format=export_format)
+    assert list(export_dir.iterdir()) == []
+
+
+def test_export_files_are_removed_on_discard_and_when_dropped(tmp_path):
+    kept, dropped = tmp_path / 'kept.zip', tmp_path / 'dropped.zip'
+    kept.write_bytes(b'x')
+    dropped.write_bytes(b'x')
+
+    export = main.DashboardExportFile(str(kept), key=('excel',))
+    assert export.is_fresh(('excel',)) and not export.is_fresh(('parquet',))
+    export.discard()
+    export.discard()
+    assert not kept.exists()
+
+    main.DashboardExportFile(str(dropped), key=None)
+    gc.collect()
+    assert not dropped.exists()
+
+
+def test_logout_cleanup_discards_session_exports(tmp_path):
+    paths = []
+    st.session_state['dashboard_exports'] = main.OrderedDict()
+    for idx in range(3):
+        path = tmp_path / f'export_{idx}.xlsx'
+        path.write_bytes(b'x')
+        paths.append(path)
+        st.session_state['dashboard_exports'][f'd{idx}'] = main.DashboardExportFile(str(path), key=idx)
+
+    main.discard_dashboard_exports()
+    assert not st.session_state['dashboard_exports']
+    assert not any(path.exists() for path in paths)
+
+
+def test_export_cache_is_bounded_by_bytes(monkeypatch):
+    for key in ('export_cache', 'export_cache_bytes'):
+        st.session_state.pop(key, None)
+    monkeypatch.setattr(main, 'EXPORT_CACHE_MAX_BYTES', 2500)
+    for i in range(4):
+        main.store_export(f'fp{i}', 'csv', b'x' * 1000)
+    assert [key[0] for key in st.session_state['export_cache']] == ['fp2', 'fp3']
+    assert st.session_state['export_cache_bytes'] == 2000
+
+    # Un export relu redevient le plus récent; un export trop gros n'évince rien
+    assert main.get_cached_export('fp2', 'csv') == b'x' * 1000
+    main.store_export('fp4', 'csv', b'x' * 1000)
+    main.store_export('big', 'csv', b'x' * 3000)
+    assert [key[0] for key in st.session_state['export_cache']] == ['fp2', 'fp4']
+    assert main.get_cached_export('big', 'csv') is None
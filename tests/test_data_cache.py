@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+import main
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(main.time, 'time', lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = main.DataCache(ttl=60, stale_ttl=600)
+    cache.put('k', 'valeur', validators={'etag': '"1"'})
+    clock[0] += 60
+    assert cache.get('k') == 'valeur'
+    clock[0] += 1
+    assert cache.get('k') is None
+    # Expirée mais encore revalidable jusqu'à stale_ttl
+    assert cache.get_stale('k') == ('valeur', {'etag': '"1"'})
+    clock[0] += 600
+    assert cache.get_stale('k') is None
+    assert cache.get_stats()['hits'] == 1 and cache.get_stats()['misses'] == 1
+
+
+def test_refresh_makes_an_entry_fresh_again(clock):
+    cache = main.DataCache(ttl=60, stale_ttl=600)
+    cache.put('k', 'valeur', validators={'etag': '"1"'})
+    clock[0] += 120
+    cache.refresh('k')
+    assert cache.get('k') == 'valeur'
+    assert cache.get_stale('k')[1] == {'etag': '"1"'}
+    assert cache.revalidations == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = main.DataCache(ttl=60, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_evicted_entries_are_served_from_disk(clock, tmp_path):
+    disk_path = str(tmp_path / 'cache' / 'data_cache.sqlite')
+    cache = main.DataCache(ttl=60, max_entries=1, disk_path=disk_path)
+    frame = pd.DataFrame({'valeur': [1.0, 2.0]})
+    cache.put('a', (frame, "info"), validators={'etag': '"a"'})
+    cache.put('b', 'autre')
+
+    value, info = cache.get('a')
+    pd.testing.assert_frame_equal(value, frame)
+    assert cache.disk_hits == 1
+
+    # Autre processus: seul le disque est partagé
+    other = main.DataCache(ttl=60, max_entries=1, disk_path=disk_path)
+    assert other.get('b') == 'autre'
+    assert other.get_stale('a')[1] == {'etag': '"a"'}
+
+    clock[0] += 61
+    assert other.get('a') is None
+
+
+def test_clear_empties_memory_and_disk(clock, tmp_path):
+    disk_path = str(tmp_path / 'data_cache.sqlite')
+    cache = main.DataCache(ttl=60, disk_path=disk_path)
+    cache.put('a', 1)
+    cache.clear()
+    assert cache.get('a') is None
+    assert main.DataCache(ttl=60, disk_path=disk_path).get('a') is None
+
+
+def test_clear_user_keeps_other_users_entries(clock, tmp_path):
+    disk_path = str(tmp_path / 'data_cache.sqlite')
+    cache = main.DataCache(ttl=60, disk_path=disk_path)
+    mine = cache.make_key('https://a', 'alice', 'visualization', 'v1')
+    other_user = cache.make_key('https://a', 'bob', 'visualization', 'v1')
+    other_server = cache.make_key('https://b', 'alice', 'visualization', 'v1')
+    prefixed_name = cache.make_key('https://a', 'alice2', 'visualization', 'v1')
+    for key in (mine, other_user, other_server, prefixed_name):
+        cache.put(key, key)
+
+    cache.clear_user('https://a', 'alice')
+    assert cache.get(mine) is None
+    reopened = main.DataCache(ttl=60, disk_path=disk_path)
+    assert reopened.get(mine) is None
+    for key in (other_user, other_server, prefixed_name):
+        assert cache.get(key) == key
+        assert reopened.get(key) == key
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def clean_memo():
+    for key in ('analysis_memo', 'analysis_memo_bytes', 'table_indexes', 'table_index_bytes'):
+        st.session_state.pop(key, None)
+    yield
+
+
+def sample_frame(n=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'cas': rng.integers(0, 50, n),
+        'taux': rng.normal(70, 12, n),
+        'rare': np.where(rng.random(n) < 0.9, np.nan, rng.normal(size=n)),
+        'region': rng.choice(['Dakar', 'Thiès', 'Kaolack', None], n),
+        'periode': pd.Categorical(rng.choice(['202401', '202402', '202403'], n)),
+    })
+    df.loc[5, 'taux'] = np.nan
+    return pd.concat([df, df.iloc[:40]], ignore_index=True)
+
+
+def test_profile_matches_pandas():
+    df = sample_frame()
+    profile = main.DataProfile(df)
+
+    pd.testing.assert_frame_equal(profile.describe, df.describe(), check_dtype=False)
+    pd.testing.assert_series_equal(profile.n_unique, df.nunique())
+    pd.testing.assert_series_equal(profile.null_counts, df.isna().sum())
+    assert profile.duplicate_rows == df.duplicated().sum() >= 40
+    assert profile.numeric_columns == ['cas', 'taux', 'rare']
+    for col, (top_value, top_count) in profile.top_values.items():
+        counts = df[col].value_counts()
+        assert (top_value, top_count) == (counts.index[0], counts.iloc[0])
+
+
+def test_profile_of_single_valued_and_empty_columns_matches_pandas():
+    df = pd.DataFrame({'un': [4.0], 'vide': [np.nan], 'texte': ['a']})
+    profile = main.DataProfile(df)
+    pd.testing.assert_frame_equal(profile.describe, df.describe(), check_dtype=False)
+    pd.testing.assert_series_equal(profile.n_unique, df.nunique())
+
+
+def test_profile_falls_back_to_text_for_unhashable_cells():
+    df = pd.DataFrame({'liste': [[1], [1], [2]], 'valeur': [1, 1, 2]})
+    profile = main.DataProfile(df)
+    assert profile.n_unique['liste'] == 2
+    assert profile.duplicate_rows == 1
+
+
+def test_data_views_share_the_fetched_frame_fingerprint(monkeypatch):
+    calls = []
+    full_hash = main.dataframe_fingerprint
+    monkeypatch.setattr(main, 'dataframe_fingerprint', lambda df: calls.append(len(df)) or full_hash(df))
+    fetched = sample_frame()
+    main.frame_fingerprint(fetched)
+    calls.clear()
+
+    for _ in range(2):
+        # Chaque rerun reçoit une copie de la frame en cache
+        data = fetched.copy()
+        main.display_data_content(data, key="contenu")
+        main.display_raw_data(data, key="brutes")
+        main.display_summary_statistics(data, main.frame_fingerprint(data))
+    assert calls == []
+    assert sum(key[1] == 'profile' for key in st.session_state['analysis_memo']) == 1
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+scipy_stats = pytest.importorskip('scipy.stats')
+
+
+def grouped_frame(seed=5):
+    rng = np.random.default_rng(seed)
+    sizes = {'Dakar': 400, 'Thiès': 150, 'Kaolack': 60, 'Louga': 25}
+    spreads = {'Dakar': 1.0, 'Thiès': 3.0, 'Kaolack': 0.5, 'Louga': 6.0}
+    shifts = {'Dakar': 0.0, 'Thiès': 0.4, 'Kaolack': -0.3, 'Louga': 1.0}
+    frames = [pd.DataFrame({'region': name, 'valeur': np.round(rng.normal(shifts[name], spreads[name], n), 1)})
+              for name, n in sizes.items()]
+    df = pd.concat(frames, ignore_index=True)
+    # Valeurs et catégories manquantes, et une région sans aucune valeur
+    df.loc[df.sample(frac=0.05, random_state=1).index, 'valeur'] = np.nan
+    df.loc[df.sample(frac=0.02, random_state=2).index, 'region'] = None
+    return with_row(df, 'Matam', np.nan)
+
+
+def with_row(df, region, value):
+    return pd.concat([df, pd.DataFrame({'region': [region], 'valeur': [value]})], ignore_index=True)
+
+
+def samples(df):
+    clean = df.dropna()
+    return [group['valeur'].to_numpy() for _, group in clean.groupby('region')]
+
+
+def test_group_statistics_match_pandas():
+    df = grouped_frame()
+    group_stats, _ = main.compute_group_comparison(df, 'region', 'valeur')
+    expected = df.groupby('region')['valeur'].agg(['mean', 'std', 'min', 'max', 'count'])
+    expected = expected[expected['count'] > 0].round(2)
+    pd.testing.assert_frame_equal(group_stats, expected, check_dtype=False)
+
+
+def test_tests_match_scipy():
+    df = grouped_frame()
+    _, tests = main.compute_group_comparison(df, 'region', 'valeur')
+    groups = samples(df)
+    assert len(groups) == 4
+
+    references = {
+        'ANOVA': scipy_stats.f_oneway(*groups),
+        'ANOVA de Welch': scipy_stats.f_oneway(*groups, equal_var=False),
+        'Kruskal-Wallis': scipy_stats.kruskal(*groups),
+    }
+    for name, reference in references.items():
+        assert tests[name].statistic == pytest.approx(reference.statistic, rel=1e-9), name
+        assert tests[name].pvalue == pytest.approx(reference.pvalue, rel=1e-6, abs=1e-15), name
+
+
+def test_welch_ignores_groups_without_variance():
+    df = with_row(grouped_frame(), 'Matam', 2.0)
+    _, tests = main.compute_group_comparison(df, 'region', 'valeur')
+    groups = samples(df)
+    assert [len(group) for group in groups].count(1) == 1
+
+    welch = scipy_stats.f_oneway(*[group for group in groups if len(group) > 1], equal_var=False)
+    assert tests['ANOVA de Welch'].statistic == pytest.approx(welch.statistic, rel=1e-9)
+    assert tests['ANOVA de Welch'].df[0] == 3
+    # ANOVA classique et Kruskal-Wallis gardent le groupe d'une seule valeur
+    assert tests['ANOVA'].statistic == pytest.approx(scipy_stats.f_oneway(*groups).statistic, rel=1e-9)
+    assert tests['Kruskal-Wallis'].statistic == pytest.approx(scipy_stats.kruskal(*groups).statistic, rel=1e-9)
+
+
+def test_tests_need_three_groups_and_enough_rows():
+    df = grouped_frame()
+    two_groups = df[df['region'].isin(['Dakar', 'Thiès'])]
+    assert main.compute_group_comparison(two_groups, 'region', 'valeur')[1] == {}
+    assert main.compute_group_comparison(df.head(30), 'region', 'valeur')[1] == {}
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+import main
+
+scipy_stats = pytest.importorskip('scipy.stats')
+
+NumpyStats = main.NumpyStats
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(20240611)
+
+
+@pytest.mark.parametrize('df', [1, 2, 3, 5, 10, 30, 100, 1000])
+def test_t_sf_matches_scipy(df):
+    for value in [-6.0, -2.5, -0.3, 0.0, 0.1, 1.0, 1.96, 4.0, 12.0]:
+        assert NumpyStats.t.sf(value, df) == pytest.approx(scipy_stats.t.sf(value, df), rel=1e-9, abs=1e-14)
+
+
+@pytest.mark.parametrize('dfn,dfd', [(1, 1), (1, 10), (2, 3), (4, 20), (10, 100), (50, 2)])
+def test_f_sf_matches_scipy(dfn, dfd):
+    for value in [0.0, 0.05, 0.5, 1.0, 2.5, 10.0, 200.0]:
+        assert NumpyStats.f.sf(value, dfn, dfd) == pytest.approx(scipy_stats.f.sf(value, dfn, dfd),
+                                                                rel=1e-9, abs=1e-14)
+
+
+@pytest.mark.parametrize('df', [1, 2, 3, 7, 20, 150])
+def test_chi2_sf_matches_scipy(df):
+    for value in [0.0, 0.01, 0.5, 1.0, 3.84, 10.0, 50.0, 300.0]:
+        assert NumpyStats.chi2.sf(value, df) == pytest.approx(scipy_stats.chi2.sf(value, df),
+                                                             rel=1e-9, abs=1e-14)
+
+
+def assert_linregress_close(x, y):
+    ours, ref = NumpyStats.linregress(x, y), scipy_stats.linregress(x, y)
+    for field in ('slope', 'intercept', 'rvalue', 'pvalue', 'stderr', 'intercept_stderr'):
+        assert getattr(ours, field) == pytest.approx(getattr(ref, field), rel=1e-8, abs=1e-12, nan_ok=True), field
+
+
+def test_linregress_matches_scipy_on_random_inputs(rng):
+    for n in [3, 4, 10, 100, 5000]:
+        x = rng.normal(size=n)
+        y = 2.5 * x - 1.0 + rng.normal(scale=rng.uniform(0.1, 5.0), size=n)
+        assert_linregress_close(x, y)
+        assert_linregress_close(x, rng.normal(size=n))
+
+
+def test_linregress_edge_cases_match_scipy():
+    assert_linregress_close([1.0, 2.0], [3.0, 5.0])
+    assert_linregress_close([1.0, 2.0], [4.0, 4.0])
+    assert_linregress_close([1.0, 2.0, 3.0], [2.0, 4.0, 6.0])
+    assert_linregress_close([1.0, 2.0, 3.0, 4.0], [7.0, 7.0, 7.0, 7.0])
+
+
+def test_linregress_constant_x_is_reported_as_undefined():
+    # scipy lève ValueError; le moteur NumPy renvoie une pente nulle et une p-value de 1
+    with pytest.raises(ValueError):
+        scipy_stats.linregress([2.0, 2.0, 2.0], [1.0, 2.0, 3.0])
+    result = NumpyStats.linregress([2.0, 2.0, 2.0], [1.0, 2.0, 3.0])
+    assert result.slope == 0.0 and result.pvalue == 1.0 and np.isnan(result.stderr)
+
+
+def assert_f_oneway_close(*samples):
+    ours, ref = NumpyStats.f_oneway(*samples), scipy_stats.f_oneway(*samples)
+    for field in ('statistic', 'pvalue'):
+        expected = float(getattr(ref, field))
+        value = float(getattr(ours, field))
+        if np.isnan(expected):
+            assert np.isnan(value), field
+        else:
+            assert value == pytest.approx(expected, rel=1e-8, abs=1e-12), field
+
+
+def test_f_oneway_matches_scipy_on_random_inputs(rng):
+    for k in [2, 3, 6]:
+        groups = [rng.normal(loc=rng.uniform(-1, 1), size=rng.integers(2, 200)) for _ in range(k)]
+        assert_f_oneway_close(*groups)
+
+
+def test_f_oneway_tiny_groups_match_scipy():
+    assert_f_oneway_close([1.0, 2.0], [3.0, 5.0])
+    assert_f_oneway_close([1.0], [2.0, 3.0], [4.0, 6.0, 5.0])
+    assert_f_oneway_close([1.0, 1.5], [9.0, 9.5], [4.0, 4.5])
@@ -0,0 +1,123 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def usage(tmp_path, monkeypatch):
+    usage = main.DashboardUsage(path=str(tmp_path / 'usage.json'))
+    monkeypatch.setattr(main, 'get_dashboard_usage', lambda: usage)
+    return usage
+
+
+def test_usage_counts_are_scoped_to_server_and_user(usage, tmp_path):
+    usage.record_open('https://a', 'alice', 'd1')
+    usage.record_open('https://a', 'alice', 'd1')
+    usage.record_open('https://a', 'bob', 'd2')
+
+    assert usage.get_count('https://a', 'alice', 'd1') == 2
+    assert usage.get_count('https://a', 'bob', 'd1') == 0
+    assert usage.get_count('https://b', 'alice', 'd1') == 0
+
+    reloaded = main.DashboardUsage(path=str(tmp_path / 'usage.json'))
+    assert reloaded.get_count('https://a', 'alice', 'd1') == 2
+
+
+def test_prefetch_selection_ignores_other_users_habits(usage):
+    for _ in range(5):
+        usage.record_open('https://a', 'bob', 'popular-with-bob')
+    usage.record_open('https://a', 'alice', 'alice-favourite')
+
+    dashboards = [
+        {'id': dashboard_id, 'dashboardItems': [{'id': 'i'}]}
+        for dashboard_id in ('popular-with-bob', 'alice-favourite', 'unused')
+    ]
+    scheduler = main.PrefetchScheduler(SimpleNamespace(base_url='https://a', username='alice'))
+    assert [d['id'] for d in scheduler.select(dashboards)] == ['alice-favourite']
+
+
+def test_prefetched_details_are_returned_as_copies():
+    scheduler = main.PrefetchScheduler(SimpleNamespace(base_url='https://a', username='alice'))
+    scheduler._details['d1'] = (time.time(), {'id': 'd1', 'dashboardItems': [{'id': 'i1'}]})
+
+    details = scheduler.get_details('d1')
+    details['is_owner'] = True
+    details['dashboardItems'].append({'id': 'i2'})
+
+    assert scheduler.get_details('d1') == {'id': 'd1', 'dashboardItems': [{'id': 'i1'}]}
+
+
+class SlotClient:
+    """Client minimal: budget d'un créneau et limiteur propre au thread, comme DHIS2Client"""
+
+    base_url = 'https://a'
+    username = 'alice'
+
+    def __init__(self):
+        self.server_slots = threading.BoundedSemaphore(1)
+        self._throttle = threading.local()
+
+
+def test_bandwidth_limiter_delay_follows_recorded_bytes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    limiter = main.BandwidthLimiter(1000)
+    assert limiter.delay() == 0
+    limiter.record(2500)
+    assert limiter.delay() == pytest.approx(2.5)
+    now[0] += 2
+    assert limiter.delay() == pytest.approx(0.5)
+    now[0] += 10
+    assert limiter.delay() < 0
+
+
+def test_prefetch_throttles_between_requests_with_the_slot_released(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    client = SlotClient()
+    limiter = client._throttle.limiter = main.BandwidthLimiter(1000)
+    sleeps = []
+
+    def sleep(seconds):
+        # Pendant l'attente du débit, le créneau reste libre pour le premier plan
+        assert client.server_slots.acquire(blocking=False)
+        client.server_slots.release()
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(main.time, 'sleep', sleep)
+    scheduler = main.PrefetchScheduler(client, bytes_per_second=1000)
+    assert scheduler._with_slot(0, lambda: limiter.record(3000) or 'ok') == 'ok'
+    assert sum(sleeps) == pytest.approx(3.0)
+    assert max(sleeps) <= main.PREFETCH_PAUSE
+
+
+def test_cancel_stops_the_prefetch_thread_during_its_pause(usage):
+    client = SlotClient()
+    fetched = []
+    started, release = threading.Event(), threading.Event()
+
+    def get_dashboard_details(dashboard_id):
+        fetched.append(dashboard_id)
+        # Réponse énorme pour le débit: la pause qui suit durerait des heures
+        client._throttle.limiter.record(10 ** 9)
+        started.set()
+        release.wait(5)
+        return {'id': dashboard_id, 'dashboardItems': []}
+
+    client.get_dashboard_details = get_dashboard_details
+    scheduler = main.PrefetchScheduler(client, bytes_per_second=1000)
+    dashboards = [{'id': f'd{i}', 'is_owner': True, 'dashboardItems': [{'id': 'i'}]} for i in range(3)]
+    scheduler.schedule(dashboards)
+    assert started.wait(5)
+
+    scheduler.cancel()
+    release.set()
+    scheduler._thread.join(5)
+    assert not scheduler._thread.is_alive()
+    assert fetched == ['d0']
+    assert not scheduler.is_running()
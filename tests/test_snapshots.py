@@ -0,0 +1,77 @@
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+import main
+
+SERVER = 'https://dhis2.example'
+
+
+@pytest.fixture
+def store(tmp_path):
+    return main.SnapshotStore(directory=str(tmp_path / 'snapshots'))
+
+
+def save_dashboard(store, dashboard_id, password, username='alice'):
+    dashboard = {'id': dashboard_id, 'name': f"Dashboard {dashboard_id}",
+                 'dashboardItems': [{'id': f"{dashboard_id}-1", 'type': 'VISUALIZATION'}]}
+    data = pd.DataFrame({'Période': ['2024-01'], 'Valeur': [1.0]})
+    return store.save(SERVER, username, dashboard, [(data, "Cas", 'VISUALIZATION')], password=password)
+
+
+@pytest.fixture
+def checks(monkeypatch):
+    calls = []
+    check_credential = main.check_credential
+
+    def counting(password, verifier):
+        calls.append(password)
+        return check_credential(password, verifier)
+
+    monkeypatch.setattr(main, 'check_credential', counting)
+    return calls
+
+
+def test_unlock_checks_only_the_newest_verifier_once(store, checks):
+    save_dashboard(store, 'd1', 'ancien')
+    save_dashboard(store, 'd2', 'ancien')
+    save_dashboard(store, 'd3', 'nouveau')
+
+    assert store.unlock(SERVER, 'alice', 'nouveau')
+    assert not store.unlock(SERVER, 'alice', 'ancien')
+    assert checks == ['nouveau', 'ancien']
+
+
+def test_manifests_no_longer_carry_the_verifier(store):
+    path = save_dashboard(store, 'd1', 'secret')
+    with zipfile.ZipFile(path) as bundle:
+        assert 'verifier' not in json.loads(bundle.read('manifest.json'))
+
+
+def test_unlock_is_scoped_to_the_owner_and_needs_a_snapshot(store):
+    save_dashboard(store, 'd1', 'secret')
+    assert not store.unlock(SERVER, 'bob', 'secret')
+    assert not store.unlock('https://autre.example', 'alice', 'secret')
+
+    store.delete(SERVER, 'alice', 'd1')
+    assert not store.unlock(SERVER, 'alice', 'secret')
+
+
+def test_legacy_manifest_verifier_is_still_accepted(store, checks):
+    save_dashboard(store, 'd1', 'secret')
+    verifier = main.credential_verifier('secret')
+    path = store.path_for(SERVER, 'alice', 'd1')
+    with zipfile.ZipFile(path) as bundle:
+        files = {name: bundle.read(name) for name in bundle.namelist()}
+    manifest = json.loads(files['manifest.json'])
+    manifest.update(version=2, verifier=verifier)
+    files['manifest.json'] = json.dumps(manifest).encode()
+    with zipfile.ZipFile(path, 'w') as bundle:
+        for name, payload in files.items():
+            bundle.writestr(name, payload)
+    main.os.remove(store.verifier_path(SERVER, 'alice'))
+
+    assert store.unlock(SERVER, 'alice', 'secret')
+    assert checks == ['secret']
@@ -0,0 +1,68 @@
+import json
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+import main
+
+HEADERS = [
+    {'name': 'dx', 'meta': True},
+    {'name': 'pe', 'meta': True},
+    {'name': 'ou', 'meta': True},
+    {'name': 'code', 'valueType': 'TEXT'},
+    {'name': 'value', 'valueType': 'NUMBER'},
+]
+META = {'items': {f'dx{i}': {'name': f'Indicateur é{i}'} for i in range(20)}}
+
+
+def make_row(i):
+    return [f'dx{i % 20}', f'2023{i % 12 + 1:02d}', f'ou{i % 500}', f'C{i % 7:03d}',
+            '' if i % 97 == 0 else str(i * 0.5)]
+
+
+def body_chunks(n_rows, rows_per_chunk=1000):
+    """Génère le corps JSON par morceaux sans jamais le matérialiser en entier"""
+    yield ('{"headers":' + json.dumps(HEADERS) + ',"metaData":' + json.dumps(META) + ',"rows":[').encode()
+    for start in range(0, n_rows, rows_per_chunk):
+        rows = ','.join(json.dumps(make_row(i)) for i in range(start, min(n_rows, start + rows_per_chunk)))
+        yield ((',' if start else '') + rows).encode()
+    yield b'],"width":5,"height":' + str(n_rows).encode() + b'}'
+
+
+def stream_frame(chunks):
+    decoder = main.StreamingAnalyticsDecoder()
+    for chunk in chunks:
+        decoder.feed(chunk)
+    return decoder.close()
+
+
+def test_streaming_parse_matches_full_parse(monkeypatch):
+    monkeypatch.setattr(main, 'STREAM_ROWS_BATCH', 300)
+    body = b''.join(body_chunks(2500, rows_per_chunk=400))
+    payload = json.loads(body)
+    expected = main.build_analytics_frame(payload['headers'], payload['rows'], payload['metaData']['items'])
+
+    # Découpage à des positions arbitraires, y compris au milieu des caractères UTF-8
+    for size in (3, 7, 4096):
+        result = stream_frame(body[i:i + size] for i in range(0, len(body), size))
+        pd.testing.assert_frame_equal(result['frame'], expected)
+        assert result['width'] == 5 and result['height'] == 2500
+        assert result['metaData'] == payload['metaData']
+
+
+def test_streaming_peak_memory_is_proportional_to_the_frame(monkeypatch):
+    monkeypatch.setattr(main, 'STREAM_ROWS_BATCH', 1000)
+    n_rows = 50000
+
+    tracemalloc.start()
+    try:
+        frame = stream_frame(body_chunks(n_rows))['frame']
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(frame) == n_rows
+    frame_size = frame.memory_usage(deep=True).sum()
+    # Buffers colonne (doublés à la demande) + DataFrame final: jamais le corps ni toutes les lignes
+    assert peak < 6 * frame_size
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def clean_indexes():
+    for key in ('table_indexes', 'table_index_bytes'):
+        st.session_state.pop(key, None)
+    yield
+
+
+def sorted_state(key, n_rows, fingerprint='fp'):
+    state = main.get_table_index(key, fingerprint)
+    order = np.arange(n_rows, dtype=np.int64)
+    state['order'] = (('valeur', True), order)
+    state['view'] = ((None, ('valeur', True)), order)
+    main.store_table_index(key, state)
+    return state
+
+
+def test_view_sharing_the_sort_order_is_counted_once():
+    sorted_state('t', 1000)
+    assert st.session_state['table_index_bytes'] == 8000
+
+
+def test_table_indexes_are_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(main, 'TABLE_INDEX_MAX_BYTES', 3 * 8000 + 100)
+    for i in range(5):
+        sorted_state(f"t{i}", 1000)
+    indexes = st.session_state['table_indexes']
+    assert list(indexes) == ['t2', 't3', 't4']
+    assert st.session_state['table_index_bytes'] == 3 * 8000
+
+    # Un tableau réaffiché redevient le plus récent
+    main.store_table_index('t2', main.get_table_index('t2', 'fp'))
+    sorted_state('t5', 1000)
+    assert list(indexes) == ['t4', 't2', 't5']
+
+
+def test_index_larger_than_budget_is_not_kept(monkeypatch):
+    monkeypatch.setattr(main, 'TABLE_INDEX_MAX_BYTES', 4000)
+    state = sorted_state('big', 1000)
+    assert state['order'] is not None
+    assert 'big' not in st.session_state['table_indexes']
+
+
+def test_new_data_resets_the_table_index():
+    sorted_state('t', 10, fingerprint='avant')
+    assert main.get_table_index('t', 'avant')['order'] is not None
+    assert main.get_table_index('t', 'après')['order'] is None
+
+
+def test_paginated_table_uses_the_given_fingerprint(monkeypatch):
+    monkeypatch.setattr(main, 'dataframe_fingerprint', lambda df: pytest.fail("empreinte recalculée"))
+    data = pd.DataFrame({'valeur': np.arange(300)})
+    main.display_paginated_table(data, 'tableau', fingerprint='fp')
+    assert st.session_state['table_indexes']['tableau']['fingerprint'] == 'fp'
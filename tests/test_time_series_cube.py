@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+def quarter_labels(dates):
+    return dates.dt.year.astype('Int64').astype(str) + '-Q' + dates.dt.quarter.astype('Int64').astype(str)
+
+
+# Libellés de référence calculés par pandas, comme avant le cube
+REFERENCE_LABELS = {
+    'Journalier': lambda dates: dates.dt.strftime('%Y-%m-%d'),
+    'Hebdomadaire': lambda dates: dates.dt.strftime('%Y-%U'),
+    'Mensuel': lambda dates: dates.dt.strftime('%Y-%m'),
+    'Trimestriel': quarter_labels,
+    'Annuel': lambda dates: dates.dt.strftime('%Y'),
+}
+
+
+def sample_data(n=5000, seed=11):
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(pd.Timestamp('2021-12-20') + pd.to_timedelta(rng.integers(0, 800, n), unit='D')
+                      + pd.to_timedelta(rng.integers(0, 86400, n), unit='s'))
+    dates[rng.random(n) < 0.02] = pd.NaT
+    numeric = pd.DataFrame({
+        'cas': rng.integers(0, 100, n).astype(float),
+        'taux': np.where(rng.random(n) < 0.3, np.nan, rng.normal(50, 10, n)),
+    })
+    # Une variable absente certains jours: groupes sans valeur
+    numeric['rare'] = np.where(rng.random(n) < 0.97, np.nan, rng.normal(size=n))
+    return dates, numeric
+
+
+def reference_series(dates, numeric, agg_type, value_col):
+    labels = REFERENCE_LABELS[agg_type](dates)
+    frame = pd.DataFrame({'periode': labels, 'valeur': numeric[value_col]})[dates.notna()]
+    return frame.groupby('periode')['valeur'].agg(['mean', 'sum', 'std', 'count'])
+
+
+@pytest.mark.parametrize('agg_type', list(main.TimeSeriesCube.LEVELS))
+@pytest.mark.parametrize('value_col', ['cas', 'taux', 'rare'])
+def test_cube_matches_pandas_groupby(agg_type, value_col):
+    dates, numeric = sample_data()
+    cube = main.TimeSeriesCube(dates, numeric)
+    series, display_col = cube.series(agg_type, value_col)
+
+    expected = reference_series(dates, numeric, agg_type, value_col)
+    actual = series.set_index(series[display_col].astype(str))[['mean', 'sum', 'std', 'count']]
+    actual.index.name = 'periode'
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_weeks_follow_strftime_across_year_boundaries():
+    dates = pd.Series(pd.date_range('2022-12-25', '2023-01-08', freq='D'))
+    numeric = pd.DataFrame({'valeur': np.arange(len(dates), dtype=float)})
+    series, display_col = main.TimeSeriesCube(dates, numeric).series('Hebdomadaire', 'valeur')
+    assert series[display_col].tolist() == sorted(dates.dt.strftime('%Y-%U').unique())
+
+
+def test_timezone_aware_dates_are_grouped_on_local_calendar():
+    dates, numeric = sample_data(500)
+    aware = dates.dt.tz_localize('Africa/Dakar')
+    expected, _ = main.TimeSeriesCube(dates, numeric).series('Journalier', 'cas')
+    actual, _ = main.TimeSeriesCube(aware, numeric).series('Journalier', 'cas')
+    pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+
+import pytest
+import requests
+
+import main
+
+_server_ids = itertools.count()
+
+
+def unique_server():
+    # Disjoncteurs partagés par serveur dans le processus: un serveur fictif par test
+    return f"http://test-{next(_server_ids)}.invalid"
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ScriptedSession:
+    """Session requests qui rejoue une suite de réponses ou d'exceptions"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(main.time, 'sleep', delays.append)
+    return delays
+
+
+def make_transport(*outcomes, max_retries=main.HTTP_MAX_RETRIES):
+    return main.DHIS2Transport(unique_server(), session=ScriptedSession(*outcomes), max_retries=max_retries)
+
+
+# Disjoncteur
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = main.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == main.CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == main.CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_consecutive_failures():
+    breaker = main.CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == main.CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_allows_a_single_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    breaker = main.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.allow()
+    assert breaker.state == main.CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == main.CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    breaker = main.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    now[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == main.CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_released_probe_can_be_retried(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    breaker = main.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    now[0] += 30
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+# Reprises et backoff
+
+def test_retry_delay_uses_capped_full_jitter(monkeypatch):
+    monkeypatch.setattr(main.random, 'uniform', lambda low, high: high)
+    assert main.retry_delay(0) == main.HTTP_RETRY_BASE_DELAY
+    assert main.retry_delay(2) == main.HTTP_RETRY_BASE_DELAY * 4
+    assert main.retry_delay(20) == main.HTTP_RETRY_MAX_DELAY
+
+    monkeypatch.setattr(main.random, 'uniform', lambda low, high: low)
+    assert main.retry_delay(3) == 0
+
+
+def test_retry_delay_honours_retry_after():
+    assert main.retry_delay(0, "2") == 2.0
+    assert main.retry_delay(0, "3600") == main.HTTP_RETRY_MAX_DELAY
+    assert 0 <= main.retry_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT") <= main.HTTP_RETRY_BASE_DELAY
+
+
+def test_get_retries_transient_statuses_then_succeeds(sleeps):
+    first, second = FakeResponse(503), FakeResponse(429, {'Retry-After': '1'})
+    transport = make_transport(first, second, FakeResponse(200))
+    response = transport.get("http://x/api/me")
+    assert response.status_code == 200
+    assert transport.session.calls == 3
+    assert first.closed and second.closed
+    assert len(sleeps) == 2 and sleeps[1] == 1.0
+
+
+def test_get_retries_connection_errors_and_reraises_the_last(sleeps):
+    transport = make_transport(*[requests.exceptions.ConnectionError("down")] * 3, max_retries=2)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.get("http://x/api/me")
+    assert transport.session.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_get_returns_last_response_when_retries_are_exhausted(sleeps):
+    transport = make_transport(FakeResponse(502), FakeResponse(502), max_retries=1)
+    assert transport.get("http://x/api/me").status_code == 502
+
+
+def test_get_does_not_retry_client_errors(sleeps):
+    transport = make_transport(FakeResponse(404))
+    assert transport.get("http://x/api/me").status_code == 404
+    assert transport.session.calls == 1
+    assert transport.breaker.state == main.CircuitBreaker.CLOSED
+
+
+def test_open_circuit_fails_fast_without_sending(sleeps):
+    transport = make_transport(*[FakeResponse(503)] * 10, max_retries=0)
+    transport.breaker.failure_threshold = 2
+    transport.get("http://x/data")
+    transport.get("http://x/data")
+    with pytest.raises(main.CircuitOpenError):
+        transport.get("http://x/data")
+    assert transport.session.calls == 2
+
+
+def test_unexpected_error_on_probe_does_not_wedge_the_breaker(monkeypatch, sleeps):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    transport = make_transport(requests.exceptions.TooManyRedirects("boucle"), FakeResponse(200))
+    transport.breaker.record_failure()
+    transport.breaker.state = main.CircuitBreaker.OPEN
+    transport.breaker.opened_at = now[0]
+
+    now[0] += transport.breaker.reset_timeout
+    with pytest.raises(requests.exceptions.TooManyRedirects):
+        transport.get("http://x/data")
+    assert transport.breaker.state == main.CircuitBreaker.OPEN
+
+    now[0] += transport.breaker.reset_timeout
+    assert transport.get("http://x/data").status_code == 200
+    assert transport.breaker.state == main.CircuitBreaker.CLOSED
+
+
+def test_async_get_retries_and_releases_probe_on_cancellation(monkeypatch):
+    httpx = pytest.importorskip('httpx')
+
+    async def no_sleep(delay):
+        return None
+
+    monkeypatch.setattr(main.asyncio, 'sleep', no_sleep)
+    statuses = [503, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0))
+
+    async def scenario():
+        transport = main.DHIS2Transport(unique_server())
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            response = await transport.aget(http, "http://x/api/me")
+            assert response.status_code == 200
+
+        async def cancelled(request):
+            raise asyncio.CancelledError()
+
+        transport.breaker.state = main.CircuitBreaker.HALF_OPEN
+        async with httpx.AsyncClient(transport=httpx.MockTransport(cancelled)) as http:
+            with pytest.raises(asyncio.CancelledError):
+                await transport.aget(http, "http://x/api/me")
+        assert transport.breaker.allow()
+
+    asyncio.run(scenario())
+
+
+# Rapport des réponses les plus lourdes
+
+def test_payload_report_is_scoped_to_the_user():
+    payloads = main.PayloadStats()
+    payloads.record('https://a', 'alice', 'v1', "Cas de paludisme", 1000, 4000, 0.01, 'gzip')
+    payloads.record('https://a', 'alice', 'v1', "Cas de paludisme", 3000, 8000, 0.03, 'gzip')
+    payloads.record('https://a', 'bob', 'v2', "Rapport confidentiel", 90000, 90000, 0.5)
+    payloads.record('https://b', 'alice', 'v3', "Autre serveur", 5000, 5000, 0.1)
+
+    heaviest = payloads.heaviest('https://a', 'alice')
+    assert [entry['name'] for entry in heaviest] == ["Cas de paludisme"]
+    assert heaviest[0]['wire_bytes'] == 2000 and heaviest[0]['requests'] == 2
+    assert payloads.totals('https://a', 'alice')['wire_bytes'] == 4000
+    assert payloads.heaviest('https://a', 'carol') == []